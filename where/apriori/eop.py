@@ -67,6 +67,7 @@ import numpy as np
 # Where imports
 from where.lib import cache
 from where.lib import config
+from where.lib import dependencies
 from where.lib import files
 from where.ext import iers_2010 as iers
 from where import parsers
@@ -75,12 +76,13 @@ from where.lib.exceptions import MissingDataError
 from where.lib.time import Time
 from where.lib.unit import unit
 
-# Cache for EOP data read from file
-_EOP_DATA = dict()
-
 # List of files to read for EOP data, last file is prioritized for overlapping data
 _EOP_FILE_KEYS = {"c04": ("eop_c04_extended", "eop_c04"), "bulletin_a": ("eop_bulletin_a",)}
 
+# Sampling interval in seconds and margin in number of samples of the time grid used to evaluate correction models
+CORRECTION_SAMPLING = 300
+CORRECTION_MARGIN = 3
+
 
 @plugins.register
 def get_eop(time, models=None, window=4, source=None):
@@ -98,23 +100,42 @@ def get_eop(time, models=None, window=4, source=None):
 
     """
     # Read the extended and the regular EOP data file (overlapping dates are overwritten by the latter)
-    if not _EOP_DATA:
-        source = config.tech.get("eop_source", value=source).str
-        for file_key in _EOP_FILE_KEYS[source]:
-            _EOP_DATA.update(parsers.parse_key(file_key=file_key).as_dict())
+    source = config.tech.get("eop_source", value=source).str
+    file_paths = [files.path(k, download_missing=True) for k in _EOP_FILE_KEYS[source]]
+    dependencies.add(*file_paths)
+    eop_data = _read_eop_data(source, tuple(files.get_md5(p) for p in file_paths))
+
+    return Eop(eop_data, time, models=models, window=window)
+
+
+@cache.function(shared=True)
+def _read_eop_data(source, checksums):
+    """Read EOP data from the files of the given source
+
+    The data are shared between sessions, and must not be changed. The checksums of the files are part of the cache
+    key, so that the data are read again when the files change.
 
-    return Eop(_EOP_DATA, time, models=models, window=window)
+    Args:
+        source (String):    EOP source, key in _EOP_FILE_KEYS.
+        checksums (Tuple):  Checksums of the EOP files.
+
+    Returns:
+        Dict: Tabular EOP data indexed by MJD dates.
+    """
+    eop_data = dict()
+    for file_key in _EOP_FILE_KEYS[source]:
+        eop_data.update(parsers.parse_key(file_key=file_key).as_dict())
+    return eop_data
 
 
 class Eop:
     """A class that can calculate EOP corrections.
 
     One instance of the `Eop`-class calculates corrections for a given set of time epochs (specified when the instance
-    is created). However, all instances share a cache of results from the various functions calculating corrections.
+    is created). Results from the functions calculating corrections are cached, since some correction functions are
+    used by several EOP-values.
     """
 
-    _correction_cache = dict()
-
     def __init__(self, eop_data, time, models=None, window=4):
         """Create an Eop-instance that calculates EOP corrections for the given time epochs
 
@@ -137,6 +158,7 @@ class Eop:
         if "rg_zont2" in self.models:
             self.remove_low_frequency_tides()
 
+        self._correction_cache = dict()
         self._mean_pole_cache = dict()
 
     @staticmethod
@@ -296,24 +318,7 @@ class Eop:
 
         # low frequency tides
         if "rg_zont2" in self.models:
-            correction_cache = self._correction_cache.setdefault("rg_zont2", dict())
-            # Julian centuries since J2000
-            t_julian_centuries = (self.time.tt.jd - 2451545.0) / 36525
-
-            if self.time.isscalar:
-                mjd = self.time.tt.mjd
-                if mjd not in correction_cache:
-                    correction_cache[mjd] = iers.rg_zont2(t_julian_centuries)[0]
-                dut1_corr = correction_cache[mjd]
-            else:
-                dut1_corr = list()
-                for t in self.time.tt:
-                    if t.mjd not in correction_cache:
-                        t_julian_centuries = (t.tt.jd - 2451545.0) / 36525
-                        correction_cache[t.mjd] = iers.rg_zont2(t_julian_centuries)[0]
-                    dut1_corr.append(correction_cache[t.mjd])
-
-            values += dut1_corr
+            values += self._corrections(("rg_zont2", _rg_zont2, 0, 1))
         return values
 
     @cache.property
@@ -404,7 +409,9 @@ class Eop:
     def _interpolate_table(self, key, leap_second_correction=False, derivative_order=0):
         """Interpolate daily values to the given time epochs
 
-        Uses Lagrange interpolation with the given interpolation window.
+        Uses Lagrange interpolation with the given interpolation window. The coefficients of the Lagrange polynomials
+        for all days are found by solving one Vandermonde system, and the polynomials are evaluated for all epochs at
+        once.
 
         We have observed that the Lagrange interpolation introduces instabilities when the EOP data are constant (as
         for instance in the VASCC-data). In this case, we force the Lagrange polynomial to be constant.
@@ -412,52 +419,41 @@ class Eop:
         Args:
             key (String):                   Name of data to be interpolated, key in `self.data`.
             leap_second_correction (Bool):  Whether data should be corrected for leap seconds before interpolation.
+            derivative_order (Int):         Order of derivative of the Lagrange polynomial to evaluate.
 
         Returns:
             Array: Interpolated values, one value for each time epoch.
         """
-        days = np.unique(self.time.utc.mjd_int)
-        offsets = range(-math.ceil(self.window / 2) + 1, math.floor(self.window / 2) + 1)
+        mjd_int = np.atleast_1d(self.time.utc.mjd_int)
+        mjd_frac = np.atleast_1d(self.time.utc.mjd_frac)
+        days, day_idx = np.unique(mjd_int, return_inverse=True)
+        offsets = np.arange(-math.ceil(self.window / 2) + 1, math.floor(self.window / 2) + 1)
 
+        # Table values in the interpolation window of each day, shape (num_days, window)
+        table_values = np.array([[self.data[d + o][key] for o in offsets] for d in days])
         if leap_second_correction:
-            leap = {
-                d: np.array(
-                    [self.data[d + o].get("leap_offset", np.nan) - self.data[d]["leap_offset"] for o in offsets]
-                )
-                for d in days
-            }
-            for lo in leap.values():
-                lo[np.isnan(lo)] = 0
-        else:
-            leap = {d: 0 for d in days}
+            leap = np.array([[self.data[d + o].get("leap_offset", np.nan) for o in offsets] for d in days])
+            table_values += np.nan_to_num(leap - leap[:, offsets == 0])
 
-        table_values = {d: np.array([self.data[d + o][key] for o in offsets]) + leap[d] for d in days}
-        interpolators = {d: interpolate.lagrange(offsets, v) for d, v in table_values.items()}
-        for poly in interpolators.values():
-            poly.c[np.abs(poly.c) < 1e-15] = 0  # Avoid numerical instabilities for constant values
+        # Polynomial coefficients of each day, highest power first as in numpy.polyval
+        coefficients = np.linalg.solve(np.vander(offsets), table_values.T).T
+        coefficients[np.abs(coefficients) < 1e-15] = 0  # Avoid numerical instabilities for constant values
+        for _ in range(derivative_order):
+            coefficients = coefficients[:, :-1] * np.arange(coefficients.shape[1] - 1, 0, -1)
 
-        if derivative_order:
-            interp_values = {
-                d: np.polyder(ip, derivative_order)(self.time.utc.mjd_frac) for d, ip in interpolators.items()
-            }
-        else:
-            interp_values = {d: ip(self.time.utc.mjd_frac) for d, ip in interpolators.items()}
-
-        if self.time.isscalar:
-            return interp_values[self.time.utc.mjd_int]
+        # Evaluate the polynomials using Horner's scheme
+        values = np.zeros(mjd_frac.size)
+        for column in coefficients[day_idx].T:
+            values = values * mjd_frac + column
 
-        values = np.empty(self.time.size)
-        for day in days:
-            idx = self.time.utc.mjd_int == day
-            values[idx] = interp_values[day][idx]
-
-        return values
+        return values[0] if self.time.isscalar else values
 
     def _corrections(self, *correction_models):
         """Calculate corrections to tabular values
 
-        The correction models are specified as tuples with name, function, output column and scale factor. Calls to the
-        correction functions are cached since some correction functions are used by several EOP-values.
+        The correction models are specified as tuples with name, function, output column and scale factor. The
+        correction functions are evaluated for all epochs by `_evaluate_model`. Results are cached since some
+        correction functions are used by several EOP-values.
 
         Args:
             correction_models (Tuple): Specification of correction models (see above)
@@ -465,25 +461,16 @@ class Eop:
         Returns:
             Array: Corrections to tabular values, one value for each time epoch.
         """
-        corrections = 0 if self.time.isscalar else np.zeros(self.time.size)
+        corrections = np.zeros(np.size(self.time.tt.mjd))
         for name, correction_func, out_idx, factor in correction_models:
             if name not in self.models:
                 continue
 
-            correction_cache = self._correction_cache.setdefault(name, dict())
-            if self.time.isscalar:
-                mjd = self.time.tt.mjd
-                if mjd not in correction_cache:
-                    correction_cache[mjd] = correction_func(mjd)
-                corrections += factor * correction_cache[mjd][out_idx]
-            else:
-                for idx, mjd in enumerate(self.time.tt.mjd):
-                    if mjd not in correction_cache:
-                        correction_cache[mjd] = correction_func(mjd)
-
-                    corrections[idx] += factor * correction_cache[mjd][out_idx]
+            if name not in self._correction_cache:
+                self._correction_cache[name] = _evaluate_model(correction_func, self.time.tt.mjd)
+            corrections += factor * self._correction_cache[name][:, out_idx]
 
-        return corrections
+        return corrections[0] if self.time.isscalar else corrections
 
     def _get_mean_pole(self, coord):
         """Calculate mean pole and cache results
@@ -496,17 +483,70 @@ class Eop:
         version = config.tech.mean_pole_version.str
         key = coord + "_" + str(version)
         if key not in self._mean_pole_cache:
-            mean_xp = np.empty(self.time.size)
-            mean_yp = np.empty(self.time.size)
-            # Calculate correction
-            for obs, time in enumerate(self.time.tt):
-                # Equation (7.25) IERS Conventions 2010
-                mean_xp[obs], mean_yp[obs], _ = iers.iers_cmp_2015(version, time.jyear)
-            self._mean_pole_cache["x_" + str(version)] = mean_xp
-            self._mean_pole_cache["y_" + str(version)] = mean_yp
+            # Equation (7.25) IERS Conventions 2010
+            mean_pole = _evaluate_model(lambda mjd: iers.iers_cmp_2015(version, _jyear(mjd))[:2], self.time.tt.mjd)
+            if self.time.isscalar:
+                mean_pole = mean_pole[0]
+            self._mean_pole_cache["x_" + str(version)] = mean_pole[..., 0]
+            self._mean_pole_cache["y_" + str(version)] = mean_pole[..., 1]
         return self._mean_pole_cache[key]
 
     # Add methods to deal with units for Eop-properties (set by @unit.register)
     convert_to = unit.convert_factory(__name__)
     unit_factor = staticmethod(unit.factor_factory(__name__))
     unit = staticmethod(unit.unit_factory(__name__))
+
+
+def _evaluate_model(func, mjd):
+    """Evaluate a correction model for many epochs
+
+    The IERS routines calculating corrections only accept one epoch per call. If there are fewer unique epochs than
+    samples in a regular time grid with spacing `CORRECTION_SAMPLING` covering all epochs, the routine is called once
+    for each unique epoch. Otherwise, the routine is called for each point in the time grid and the values are
+    interpolated to the epochs with a cubic spline. The corrections have periods longer than 12 hours, so the
+    interpolation error is negligible.
+
+    Args:
+        func (Function):       Correction model taking a Modified Julian Date in TT as the only argument.
+        mjd (numpy.ndarray):   Epochs as Modified Julian Dates in TT.
+
+    Returns:
+        Numpy array with the outputs of the correction model, shape (len(mjd), num_outputs).
+    """
+    mjd = np.atleast_1d(mjd)
+    unique_mjd, mjd_idx = np.unique(mjd, return_inverse=True)
+
+    step = CORRECTION_SAMPLING / unit.day2seconds
+    start = unique_mjd[0] - CORRECTION_MARGIN * step
+    num_samples = int(np.ceil((unique_mjd[-1] - start) / step)) + CORRECTION_MARGIN + 1
+    if unique_mjd.size <= num_samples:
+        return np.array([func(m) for m in unique_mjd]).reshape(unique_mjd.size, -1)[mjd_idx]
+
+    grid = np.arange(num_samples) * step
+    samples = np.array([func(start + t) for t in grid]).reshape(num_samples, -1)
+    return interpolate.CubicSpline(grid, samples)(mjd - start)
+
+
+def _rg_zont2(mjd):
+    """Effect of zonal Earth tides on the rotation of the Earth, see RG_ZONT2 in the IERS software library
+
+    Args:
+        mjd (Float):   Epoch as Modified Julian Date in TT.
+
+    Returns:
+        Tuple: Corrections to UT1 [seconds], length of day [seconds] and angular velocity [radians per second].
+    """
+    # Julian centuries since J2000
+    return iers.rg_zont2((mjd - 51544.5) / 36525)
+
+
+def _jyear(mjd):
+    """Convert a Modified Julian Date to a Julian epoch
+
+    Args:
+        mjd (Float):   Epoch as Modified Julian Date.
+
+    Returns:
+        Float: Julian epoch in years.
+    """
+    return 2000 + (mjd - 51544.5) / 365.25
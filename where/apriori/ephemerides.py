@@ -171,6 +171,21 @@ def get_ephemerides(time=None, ephemerides=None):
     return Ephemerides(time, ephemerides)
 
 
+@cache.function(shared=True)
+def _open_spk(eph_filepath):
+    """Open an SPK-file
+
+    The opened file is shared between sessions, so that the ephemerides are only read once in long running processes.
+
+    Args:
+        eph_filepath (Path):   Path to SPK-file.
+
+    Returns:
+        SPK:  The opened SPK-file.
+    """
+    return SPK.open(eph_filepath)  # TODO: Close file
+
+
 class Ephemerides:
     """A class for doing ephemerides calculations
 
@@ -196,7 +211,7 @@ class Ephemerides:
 
         # Open the SPK-file corresponding to the ephemerides
         eph_filepath = files.path("ephemerides", file_vars=dict(ephemerides=ephemerides), download_missing=True)
-        self._spk = SPK.open(eph_filepath)  # TODO: Close file in destructor
+        self._spk = _open_spk(eph_filepath)
         dependencies.add(eph_filepath)
 
         # Parse segments in SPK file
@@ -310,44 +310,16 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         dset.add_text("satellite", val=self.satellite)
         dset.add_text("system", val=self.system)
 
-        sat_pos = np.zeros((dset.num_obs, 3))
-        sat_vel = np.zeros((dset.num_obs, 3))
-
         # Get correct navigation block for given observations times by determining the indices to broadcast
         # ephemeris Dataset
         dset_brdc_idx = self._get_brdc_block_idx()
 
-        # Loop over all observations
-        # TODO: Generation of vectorized solution, if possible?
-
+        # Calculate satellite position and velocity for all observations at once
         # BUG: Use of GPSSEC does not work for GPS WEEK crossovers. MJD * unit.day2second() would a better solution. The
         #     problem is that use of GPSSEC compared to MJD * unit.day2second() is not consistent!!!!
-        for obs_idx, (time_gpsweek, time_gpssec, brdc_idx, sys) in enumerate(
-            zip(self.time.gps.gpsweek, self.time.gps.gpssec, dset_brdc_idx, self.system)
-        ):
-
-            # TODO: get_row() function needed for brdc -> brdc.get_row(kk)
-            sat_pos[obs_idx], sat_vel[obs_idx] = self._get_satellite_position_velocity(
-                time_gpsweek, time_gpssec, brdc_idx, sys
-            )
-
-            # +DEBUG
-            # print("DEBUG: {} obs_idx: {:>5d} brdc_idx: {:>5d} toc: {:>5.0f} {:>6.0f} toe: {:>6.0f} trans_time: {:>6.0f}"
-            #      " tk: {:>16.10f} iode: {:>3d} sqrt_a: {:>17.10f} sat_pos: {:>21.10f} {:>21.10f} {:>21.10f} "
-            #      "sat_vel: {:>17.10f} {:>17.10f} {:>17.10f} sat_clk_bias: {:>17.10f}, sat_clk_drft: {:>17.10f} "
-            #      ''.format(self.dset_edit.satellite[brdc_idx], obs_idx, brdc_idx,
-            #                dset.time.gps.jd_frac[obs_idx] * 86400,
-            #                dset.time.gps.gpssec[obs_idx],
-            #                self.dset_edit.toe.gps.gpssec[brdc_idx],
-            #                self.dset_edit.transmission_time.gps.gpssec[brdc_idx],
-            #                dset.time.gps.jd_frac[obs_idx]-self.dset_edit.toe.gps.gpssec[brdc_idx],
-            #                int(self.dset_edit.iode[brdc_idx]),
-            #                self.dset_edit.sqrt_a[brdc_idx],
-            #                sat_pos[obs_idx][0], sat_pos[obs_idx][1], sat_pos[obs_idx][2],
-            #                sat_vel[obs_idx][0], sat_vel[obs_idx][1], sat_vel[obs_idx][2],
-            #                self.dset_edit.sat_clock_bias[brdc_idx],
-            #                self.dset_edit.sat_clock_drift[brdc_idx],))
-            # -DEBUG
+        sat_pos, sat_vel = self._get_satellite_position_velocity(
+            self.time.gps.gpsweek, self.time.gps.gpssec, dset_brdc_idx, np.array(self.system)
+        )
 
         # Add information about choosed broadcast ephemeris block
         dset.add_float("used_iode", val=self.dset_edit.iode[dset_brdc_idx])
@@ -456,7 +428,7 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         =============================  =================================================================================
 
         Returns:
-            List: Broadcast ephemeris block indices for given observation epochs.
+            numpy.ndarray: Broadcast ephemeris block indices for given observation epochs.
         """
 
         brdc_block_nearest_to_options = [
@@ -467,7 +439,6 @@ class BroadcastOrbit(orbit.AprioriOrbit):
             "transmission_time",
             "transmission_time:positive",
         ]
-        brdc_idx = list()
 
         # Get configuration option
         brdc_block_nearest_to = config.tech.get("brdc_block_nearest_to", default="toe:positive").str.rsplit(":", 1)
@@ -493,24 +464,41 @@ class BroadcastOrbit(orbit.AprioriOrbit):
                 ", ".join(sorted(not_available_sat)),
             )
 
-        # Determine broadcast ephemeris block index for a given satellite and observation epoch
-        for sat, time in zip(self.satellite, self.time):
-
-            idx = self.dset_edit.filter(satellite=sat)
-            diff = time.gps.mjd - self.dset_edit[time_key].gps.mjd[idx]
+        # Determine broadcast ephemeris block index for each satellite and observation epoch. The broadcast blocks of
+        # each satellite are sorted by the selected time, and the nearest block is found by a binary search. If several
+        # blocks have the same time, the first one in the broadcast ephemeris Dataset is used.
+        satellites = np.array(self.satellite)
+        obs_time = self.time.gps.mjd
+        brdc_time = self.dset_edit[time_key].gps.mjd
+        brdc_idx = np.zeros(len(satellites), dtype=int)
+        for sat in np.unique(satellites):
+            obs_idx = satellites == sat
+            sat_idx = self.dset_edit.filter(satellite=sat).nonzero()[0]
+            sat_idx = sat_idx[np.argsort(brdc_time[sat_idx], kind="stable")]
+            sat_time = brdc_time[sat_idx]
+
+            # Last broadcast block before (or at) the observation epoch, and the first block after it
+            num_before = np.searchsorted(sat_time, obs_time[obs_idx], side="right")
+            before = np.searchsorted(sat_time, sat_time[np.maximum(num_before - 1, 0)], side="left")
+            after = np.minimum(num_before, len(sat_idx) - 1)
             if positive:
-                nearest_idx = np.array([99999 if v < 0 else v for v in diff]).argmin()
+                # The first block in the Dataset is used, if there is no block before the observation epoch
+                nearest = np.where(num_before > 0, sat_idx[before], sat_idx.min())
             else:
-                nearest_idx = np.array([abs(diff)]).argmin()
+                diff_before = np.abs(obs_time[obs_idx] - sat_time[before])
+                diff_after = np.abs(sat_time[after] - obs_time[obs_idx])
+                is_tie = (diff_after == diff_before) & (sat_idx[after] < sat_idx[before])
+                nearest = np.where((diff_after < diff_before) | is_tie, sat_idx[after], sat_idx[before])
 
-            brdc_idx.append(idx.nonzero()[0][nearest_idx])
+            brdc_idx[obs_idx] = nearest
 
         return brdc_idx
 
     def _get_corrected_broadcast_ephemeris(self, t_sat_gpsweek, t_sat_gpssec, idx, sys):
         """Apply correction for broadcast ephemeris for given time tk
 
-        Following equations are based on Table 20-IV. in :cite:`is-gps-200h`.
+        Following equations are based on Table 20-IV. in :cite:`is-gps-200h`. The arguments can be given either as
+        scalars or as arrays with one element for each observation.
 
         Args:
             t_sat_gpsweek (float):   GPS week of satellite transmission time.
@@ -545,14 +533,15 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         e = self.dset_edit.e[idx]  # Eccentricity of the orbit
         a = self.dset_edit.sqrt_a[idx] ** 2  # Semimajor axis in [m]
         omega = self.dset_edit.omega[idx]  # Argument of perigee in [rad]
-        n0 = np.sqrt(GM[sys] / a ** 3)  # Mean motion of Keplerian orbit in [rad/s]
+        gm, omega_e = _system_constant(GM, sys), _system_constant(OMEGA, sys)
+        n0 = np.sqrt(gm / a ** 3)  # Mean motion of Keplerian orbit in [rad/s]
         n = n0 + self.dset_edit.delta_n[idx]  # Corrected mean motion in [rad/s]
 
         M = self.dset_edit.m0[idx] + n * tk  # Mean anomaly in [rad]
         E = self._get_eccentric_anomaly(M, e)  # Eccentric anomaly in [rad]
         vega = np.arctan2(np.sqrt(1.0 - e ** 2) * np.sin(E), np.cos(E) - e)  # True anomaly in [rad]
         u0 = omega + vega  # Initial argument of latitude
-        lambda_ = self.dset_edit.Omega[idx] + (self.dset_edit.Omega_dot[idx] - OMEGA[sys]) * tk - OMEGA[sys] * toe
+        lambda_ = self.dset_edit.Omega[idx] + (self.dset_edit.Omega_dot[idx] - omega_e) * tk - omega_e * toe
         # Instantaneous Greenwich longitude of the ascending node in [rad]
 
         # Determine argument of latitude, orbit radius and inclination
@@ -572,6 +561,7 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         r""" Computes the eccentric anomaly for elliptic orbits
 
         Newton's method used for determination of eccentric anomaly E as shown in Eq. 2.42 in :cite:`montenbruck2012`.
+        The iteration is done for all elements of M and e at the same time, until all of them have converged.
 
         Args:
             M (float):        Mean anomaly in [rad].
@@ -591,12 +581,9 @@ class BroadcastOrbit(orbit.AprioriOrbit):
 
         # For small eccentriciy (e < 0.8) is it enough to start with E = M. For high eccentric orbits (e > 0.8) the
         # iteration should start with E = PI to avoid convergence problems during the iteration (see p. 24 in [1]).
-        if e < 0.8:
-            E = M
-        else:
-            E = np.pi
+        E = np.where(e < 0.8, M, np.pi)
 
-        while np.fabs(f) > limit:
+        while np.max(np.fabs(f)) > limit:
             f = E - e * np.sin(E) - M
             E = E - f / (1.0 - e * np.cos(E))
             num_iter += 1
@@ -604,7 +591,7 @@ class BroadcastOrbit(orbit.AprioriOrbit):
             if num_iter == max_iter:
                 log.fatal("Convergence problem by determination of eccentric anomaly (max_iter = {}).", max_iter)
 
-        return E
+        return E[()]
 
     def _get_satellite_position_vector(self, bdict):
         """Determine satellite position vector in Earth centered Earth fixed (ECEF) coordinate system.
@@ -643,11 +630,12 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         # TODO: What should be done for GEO satellites (e.g. see in gLAB function getPositionBRDC() in model.c)?
 
         # Transformation from spherical to cartesian orbital coordinate system
-        r_orb = np.array([bdict["r"] * np.cos(bdict["u"]), bdict["r"] * np.sin(bdict["u"]), 0.0])
+        r = bdict["r"]
+        r_orb = np.stack((r * np.cos(bdict["u"]), r * np.sin(bdict["u"]), np.zeros(np.shape(r))), axis=-1)
 
         # Transformation from cartesian orbital to Earth centered Earth fixed (ECEF) geocentric equatorial coordinate
         # system
-        r_ecef = rotation.R3(-bdict["lambda_"]).dot(rotation.R1(-bdict["i"])).dot(r_orb.T)
+        r_ecef = (rotation.R3(-bdict["lambda_"]) @ rotation.R1(-bdict["i"]) @ r_orb[..., None])[..., 0]
 
         bdict.update({"r_ecef": r_ecef, "r_orb": r_orb})
 
@@ -738,8 +726,8 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         )
         # Time derivative of true anomaly in [rad/s]
         u0_dot = v_dot  # Time derivative of initial argument of latitude in [rad/s]
-        lambda_dot = self.dset_edit.Omega_dot[idx] - OMEGA[sys]  # Time derivative of instantaneous Greenwich longitude
-        # of the ascending node in [rad]
+        lambda_dot = self.dset_edit.Omega_dot[idx] - _system_constant(OMEGA, sys)
+        # Time derivative of instantaneous Greenwich longitude of the ascending node in [rad]
 
         # Determine time derivatives of argument of latitude, orbit radius and inclination
         sin2u = np.sin(2 * bdict["u"])
@@ -753,32 +741,33 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         i_dot = self.dset_edit.idot[idx] + di_dot  # Time derivative of inclination in [rad/s]
 
         # Determine satellite velocity vector in the orbital plane coordinate system
-        v_orb = np.array(
-            [
+        v_orb = np.stack(
+            (
                 r_dot * np.cos(bdict["u"]) - bdict["r"] * u_dot * np.sin(bdict["u"]),
                 r_dot * np.sin(bdict["u"]) + bdict["r"] * u_dot * np.cos(bdict["u"]),
-                0.0,
-            ]
+                np.zeros(np.shape(r_dot)),
+            ),
+            axis=-1,
         )
 
         # Satellite velocity vector in Earth centered Earth-fixed coordinate system
         x_dot = (
-            v_orb[0] * np.cos(bdict["lambda_"])
-            - v_orb[1] * np.cos(bdict["i"]) * np.sin(bdict["lambda_"])
-            + bdict["r_orb"][1] * i_dot * np.sin(bdict["i"]) * np.sin(bdict["lambda_"])
-            - bdict["r_ecef"][1] * lambda_dot
+            v_orb[..., 0] * np.cos(bdict["lambda_"])
+            - v_orb[..., 1] * np.cos(bdict["i"]) * np.sin(bdict["lambda_"])
+            + bdict["r_orb"][..., 1] * i_dot * np.sin(bdict["i"]) * np.sin(bdict["lambda_"])
+            - bdict["r_ecef"][..., 1] * lambda_dot
         )
 
         y_dot = (
-            v_orb[0] * np.sin(bdict["lambda_"])
-            + v_orb[1] * np.cos(bdict["i"]) * np.cos(bdict["lambda_"])
-            - bdict["r_orb"][1] * i_dot * np.sin(bdict["i"]) * np.cos(bdict["lambda_"])
-            + bdict["r_ecef"][0] * lambda_dot
+            v_orb[..., 0] * np.sin(bdict["lambda_"])
+            + v_orb[..., 1] * np.cos(bdict["i"]) * np.cos(bdict["lambda_"])
+            - bdict["r_orb"][..., 1] * i_dot * np.sin(bdict["i"]) * np.cos(bdict["lambda_"])
+            + bdict["r_ecef"][..., 0] * lambda_dot
         )
 
-        z_dot = v_orb[1] * np.sin(bdict["i"]) + bdict["r_orb"][1] * i_dot * np.cos(bdict["i"])
+        z_dot = v_orb[..., 1] * np.sin(bdict["i"]) + bdict["r_orb"][..., 1] * i_dot * np.cos(bdict["i"])
 
-        v_ecef = np.array([x_dot, y_dot, z_dot])
+        v_ecef = np.stack((x_dot, y_dot, z_dot), axis=-1)
 
         bdict.update({"v_ecef": v_ecef, "v_orb": v_orb})
 
@@ -799,4 +788,25 @@ class BroadcastOrbit(orbit.AprioriOrbit):
         bdict = self._get_corrected_broadcast_ephemeris(t_sat_gpsweek, t_sat_gpssec, idx, sys)
 
         # Compute relativistic orbit eccentricity in [m]
-        return -2 / constant.c * np.sqrt(bdict["a"] * GM[sys]) * self.dset_edit.e[idx] * np.sin(bdict["E"])
+        gm = _system_constant(GM, sys)
+        return -2 / constant.c * np.sqrt(bdict["a"] * gm) * self.dset_edit.e[idx] * np.sin(bdict["E"])
+
+
+def _system_constant(constants, sys):
+    """Look up a constant for each GNSS identifier
+
+    Args:
+        constants (dict):   Values of the constant for each GNSS identifier.
+        sys (str):          GNSS identifier, or array of GNSS identifiers.
+
+    Returns:
+        Float or numpy.ndarray:  Value of the constant for each GNSS identifier.
+    """
+    if np.ndim(sys) == 0:
+        return constants[str(sys)]
+
+    sys = np.asarray(sys)
+    values = np.empty(sys.shape)
+    for system in np.unique(sys):
+        values[sys == system] = constants[system]
+    return values
@@ -21,7 +21,6 @@ Example:
 from datetime import timedelta
 
 # External library imports
-from midgard.math import interpolation
 import numpy as np
 import pandas as pd
 from scipy import interpolate
@@ -30,6 +29,7 @@ from scipy import interpolate
 from where import apriori
 from where import data
 from where.apriori import orbit
+from where.lib import cache
 from where.lib import config
 from where.lib import files
 from where.lib import log
@@ -37,6 +37,9 @@ from where.lib import mathp
 from where.lib import plugins
 from where import parsers
 
+# Number of orbit epochs used for each Lagrange interpolation polynomial
+INTERPOLATION_WINDOW = 10
+
 
 @plugins.register
 class PreciseOrbit(orbit.AprioriOrbit):
@@ -46,8 +49,7 @@ class PreciseOrbit(orbit.AprioriOrbit):
     relativistic clock correction can be calculated for given observation epochs based on precise orbits.
 
     The satellite position is determined for each observation epoch by interpolating within the given SP3 orbit time
-    entries. The satellite velocities are calculated based on satellite positions 0.5 second before and after the
-    observation epoch.
+    entries. The satellite velocities are calculated as the time derivative of the interpolation polynomial.
 
     Attributes:
         day_offset (int):       Day offset used to calculate the number of days to read.
@@ -203,8 +205,7 @@ class PreciseOrbit(orbit.AprioriOrbit):
         """Calculate precise orbits and satellite clock correction for given observation epochs
 
         The satellite position is determined for each observation epoch by interpolating within the given SP3 orbit time
-        entries. The satellite velocities are calculated based on satellite positions 0.5 second before and after the
-        observation epoch.
+        entries. The satellite velocities are calculated as the time derivative of the interpolation polynomial.
 
         Args:
             dset (Dataset): Dataset representing calculated precise orbits with following fields:
@@ -242,50 +243,18 @@ class PreciseOrbit(orbit.AprioriOrbit):
         dset.add_text("satellite", val=self.satellite)
         dset.add_text("system", val=self.system)
 
-        sat_pos = np.zeros((dset.num_obs, 3))
-        sat_vel = np.zeros((dset.num_obs, 3))
-        ref_time = dset.time[0]  # Reference epoch used for interpolation
-
-        # Loop over all given satellites
-        for sat in set(self.satellite):
-
-            log.debug("Interpolation for satellite: {}", sat)
-
-            # Get array with information about, when observation are available for the given satellite (indicated by
-            # True)
-            idx = dset.filter(satellite=sat)
-            orb_idx = self.dset_edit.filter(satellite=sat)
-
-            if np.min(dset.time[idx].gps.mjd) < np.min(self.dset_edit.time[orb_idx].mjd):
-                log.fatal(
-                    "Interpolation range is exceeded by satellite {} ( {} [epoch] < {} [precise orbit])."
-                    "".format(
-                        sat, np.max(dset.time[idx].gps.datetime), np.max(self.dset_edit.time[orb_idx].gps.datetime)
-                    )
-                )
-
-            if np.max(dset.time[idx].gps.mjd) > np.max(self.dset_edit.time[orb_idx].mjd):
-                log.fatal(
-                    "Interpolation range is exceeded by satellite {} ({} [epoch] > {} [precise orbit])."
-                    "".format(
-                        sat, np.max(dset.time[idx].gps.datetime), np.max(self.dset_edit.time[orb_idx].gps.datetime)
-                    )
-                )
-
-            # Interpolation for given observation epochs (transmission time)
-            sat_pos[idx], sat_vel[idx] = interpolation.interpolate_with_derivative(
-                self.dset_edit.time[orb_idx].gps.sec_to_reference(ref_time),
-                self.dset_edit.sat_pos.itrs[orb_idx],
-                dset.time[idx].gps.sec_to_reference(ref_time),
-                kind="lagrange",
-                window=10,
-                dx=0.5,
-            )
+        # Interpolation for given observation epochs (transmission time)
+        ref_time, interpolator = self.interpolator
+        sat_pos, sat_vel = interpolator(dset.time.gps.sec_to_reference(ref_time), dset.satellite)
 
-            if np.isnan(np.sum(sat_pos[idx])) or np.isnan(np.sum(sat_vel[idx])):
-                log.fatal(
-                    "NaN occurred by determination of precise satellite position and velocity for satellite {}.", sat
-                )
+        not_interpolated = np.isnan(sat_pos).any(axis=1) | np.isnan(sat_vel).any(axis=1)
+        if np.any(not_interpolated):
+            log.fatal(
+                "Interpolation range of precise orbit file is exceeded by satellites {} ({} - {} [epoch]).",
+                ", ".join(np.unique(dset.satellite[not_interpolated])),
+                np.min(dset.time.gps.datetime[not_interpolated]),
+                np.max(dset.time.gps.datetime[not_interpolated]),
+            )
 
         # Add satellite clock correction to Dataset
         dset.add_float("gnss_satellite_clock", val=self.satellite_clock_correction(), unit="meter")
@@ -308,6 +277,21 @@ class PreciseOrbit(orbit.AprioriOrbit):
 
         return dset
 
+    @property
+    def interpolator(self):
+        """Interpolator of satellite positions in the precise orbit files
+
+        The interpolator is set up once for each set of orbit files, and reused for later calls with other epochs,
+        satellites, stages or sessions. The interpolators are looked up by the checksums of the orbit files.
+
+        Returns:
+            Tuple: Reference epoch of the interpolator and SegmentInterpolator-object.
+        """
+        checksums = tuple(files.get_md5(p) for p in self.dset_edit.meta["parser"]["file_path"])
+        return _interpolator(
+            self.__class__, self.dset_edit.rundate, self.file_key, self.file_path, self.day_offset, checksums
+        )
+
     def satellite_clock_correction(self):
         """Determine satellite clock correction based on precise satellite clock product
 
@@ -378,3 +362,129 @@ class PreciseOrbit(orbit.AprioriOrbit):
             correction[idx] = sat_clock_bias_ip(sat_transmission_time[idx])
 
         return correction
+
+
+@cache.function(shared=True)
+def _interpolator(orbit_cls, rundate, file_key, file_path, day_offset, checksums):
+    """Set up the interpolator of satellite positions in precise orbit files
+
+    The orbit files are read and edited by a new orbit object, so that the interpolator only depends on the arguments.
+    The interpolator is shared between sessions, and must not be changed. The checksums of the orbit files are part of
+    the cache key, so that a new interpolator is set up when the files change.
+
+    Args:
+        orbit_cls (Class):               PreciseOrbit or a subclass of it.
+        rundate (date):                  Date of model run.
+        file_key (str):                  Key to the precise orbit file that will be read.
+        file_path (pathlib.PosixPath):   File path to SP3 orbit file.
+        day_offset (int):                Day offset used to calculate the number of days to read.
+        checksums (Tuple):               Checksums of the orbit files.
+
+    Returns:
+        Tuple: Reference epoch of the interpolator and SegmentInterpolator-object.
+    """
+    orbit = orbit_cls(rundate, time=None, satellite=(), file_key=file_key, file_path=file_path, day_offset=day_offset)
+    dset_edit = orbit.dset_edit
+    log.debug("Set up precise orbit interpolation for {}", ", ".join(dset_edit.meta["parser"]["file_path"]))
+
+    ref_time = dset_edit.time[0]
+    interpolator = SegmentInterpolator(
+        dset_edit.time.gps.sec_to_reference(ref_time),
+        dset_edit.satellite,
+        dset_edit.sat_pos.itrs,
+        window=INTERPOLATION_WINDOW,
+    )
+    return ref_time, interpolator
+
+
+class SegmentInterpolator:
+    """Lagrange interpolation of satellite positions with precomputed coefficients
+
+    A Lagrange polynomial is fitted through each window of consecutive orbit epochs of each satellite when the
+    interpolator is created. The polynomials are stored as coefficients of the time normalized to [-1, 1] over the
+    window, so that positions and velocities for any epochs are found by looking up the window of each epoch and
+    evaluating the polynomial and its derivative with Horner's scheme.
+
+    As far as possible the window is centered on the epoch to interpolate, as in
+    `midgard.math.interpolation.lagrange`. Epochs outside the orbit epochs of a satellite are given as NaN.
+
+    Attributes:
+        window (int):       Number of orbit epochs used for each polynomial.
+        segments (dict):    Orbit epochs, window centers, window half-widths and polynomial coefficients for each
+                            satellite.
+    """
+
+    def __init__(self, sec, satellite, pos, window=10):
+        """Fit interpolation polynomials for all satellites
+
+        Args:
+            sec (numpy.ndarray):        Orbit epochs in seconds since a reference epoch, sorted for each satellite.
+            satellite (numpy.ndarray):  Satellite of each orbit epoch.
+            pos (numpy.ndarray):        Satellite positions for each orbit epoch, (num_epochs x 3).
+            window (int):               Number of orbit epochs used for each polynomial.
+        """
+        self.window = window
+        self.segments = dict()
+        satellite = np.asarray(satellite)
+        for sat in np.unique(satellite):
+            idx = satellite == sat
+            self.segments[sat] = self._fit(sec[idx], pos[idx], min(window, np.sum(idx)))
+
+    @staticmethod
+    def _fit(x, y, window):
+        """Fit a polynomial through each window of consecutive epochs
+
+        Args:
+            x (numpy.ndarray):   Epochs for one satellite in seconds.
+            y (numpy.ndarray):   Positions for one satellite, (num_epochs x 3).
+            window (int):        Number of epochs used for each polynomial.
+
+        Returns:
+            Tuple: Epochs, center and half-width of each window and polynomial coefficients with decreasing degree,
+                   (num_windows x window x 3).
+        """
+        idx = np.arange(len(x) - window + 1)[:, None] + np.arange(window)
+        center = (x[idx[:, 0]] + x[idx[:, -1]]) / 2
+        scale = np.maximum((x[idx[:, -1]] - x[idx[:, 0]]) / 2, 1)
+        t = (x[idx] - center[:, None]) / scale[:, None]
+        vander = t[:, :, None] ** np.arange(window - 1, -1, -1)
+        return x, center, scale, np.linalg.solve(vander, y[idx])
+
+    def __call__(self, sec, satellite):
+        """Interpolate satellite positions and velocities
+
+        Args:
+            sec (numpy.ndarray):        Epochs in seconds since the reference epoch of the orbit epochs.
+            satellite (numpy.ndarray):  Satellite of each epoch.
+
+        Returns:
+            Tuple: Satellite positions and velocities, each (num_epochs x 3).
+        """
+        sec = np.asarray(sec, dtype=float)
+        satellite = np.asarray(satellite)
+        pos = np.full((len(sec), 3), np.nan)
+        vel = np.full((len(sec), 3), np.nan)
+
+        for sat in np.unique(satellite):
+            if sat not in self.segments:
+                continue
+            idx = np.flatnonzero(satellite == sat)
+            x, center, scale, coeffs = self.segments[sat]
+            window = coeffs.shape[1]
+
+            # Window of each epoch, centered on the epoch except at the ends of the orbit
+            seg = np.clip(np.searchsorted(x, sec[idx]) - window // 2, 0, len(center) - 1)
+            t = ((sec[idx] - center[seg]) / scale[seg])[:, None]
+
+            # Evaluate polynomial and derivative with Horner's scheme
+            seg_pos = coeffs[seg, 0]
+            seg_vel = np.zeros_like(seg_pos)
+            for degree in range(1, window):
+                seg_vel = seg_vel * t + seg_pos
+                seg_pos = seg_pos * t + coeffs[seg, degree]
+
+            in_range = (sec[idx] >= x[0]) & (sec[idx] <= x[-1])
+            pos[idx[in_range]] = seg_pos[in_range]
+            vel[idx[in_range]] = seg_vel[in_range] / scale[seg[in_range], None]
+
+        return pos, vel
@@ -9,7 +9,7 @@ $LastChangedBy: dahmic $
 
 """
 # Standard library imports
-from datetime import datetime
+from datetime import date, datetime
 import unittest
 
 # External library imports
@@ -18,6 +18,9 @@ import pytest
 
 # Where imports
 from where import apriori
+from where import data
+from where.apriori.orbit import broadcast
+from where.lib import config
 from where.lib.time import Time
 
 TEST = "test_2"
@@ -86,6 +89,7 @@ class TestBroadcast(unittest.TestCase):
             self.system = "G"  # GNSS identifier
 
             # Satellite transmission time
+            self.t_sat_gpsweek = 1124
             self.t_sat = 86400.00
 
         elif TEST == "test_2":
@@ -100,6 +104,7 @@ class TestBroadcast(unittest.TestCase):
             self.system = "G"  # GNSS identifier
 
             # Satellite transmission time
+            self.t_sat_gpsweek = 1886
             self.t_sat = 172799.92312317
 
         elif TEST == "test_3":
@@ -114,6 +119,7 @@ class TestBroadcast(unittest.TestCase):
             self.system = "E"  # GNSS identifier
 
             # Satellite transmission time
+            self.t_sat_gpsweek = 1886
             self.t_sat = 173699.999
 
         rundate = datetime(year, month, day, hour, minute)
@@ -144,7 +150,7 @@ class TestBroadcast(unittest.TestCase):
         """
         The test is based on the bc_velo.c program, which is published in :cite:`remondi2004`.
         """
-        brdc_dict = self.brdc._get_corrected_broadcast_ephemeris(self.t_sat, self.idx, self.system)
+        brdc_dict = self.brdc._get_corrected_broadcast_ephemeris(self.t_sat_gpsweek, self.t_sat, self.idx, self.system)
 
         if TEST == "test_1":
             expected_a = np.array([26561612.084130041])  # Semimajor axis
@@ -219,7 +225,9 @@ class TestBroadcast(unittest.TestCase):
         """
         The test is based on the bc_velo.c program, which is published in :cite:`remondi2004`.
         """
-        sat_pos, sat_vel = self.brdc._get_satellite_position_velocity(self.t_sat, self.idx, self.system)
+        sat_pos, sat_vel = self.brdc._get_satellite_position_velocity(
+            self.t_sat_gpsweek, self.t_sat, self.idx, self.system
+        )
 
         if TEST == "test_1":
             expected_sat_pos = np.array([-12611434.19782218677, -13413103.97797041245, 19062913.07357876940])
@@ -259,7 +267,9 @@ class TestBroadcast(unittest.TestCase):
         np.testing.assert_allclose(sat_clk_corr, expected_sat_clk_corr, rtol=0, atol=1e-5)
 
     def test_get_relativistic_clock_correction(self):
-        rel_clk_corr = self.brdc._get_relativistic_clock_correction(self.t_sat, self.idx, self.system)
+        rel_clk_corr = self.brdc._get_relativistic_clock_correction(
+            self.t_sat_gpsweek, self.t_sat, self.idx, self.system
+        )
 
         if TEST == "test_1":
             expected_rel_clk_corr = -0.012570413426601913
@@ -271,5 +281,140 @@ class TestBroadcast(unittest.TestCase):
         np.testing.assert_allclose(rel_clk_corr, expected_rel_clk_corr, rtol=0, atol=1e-6)
 
 
+# Keplerian elements of the G20 and E11 broadcast messages of the test files 'test0610.16n' and 'tgal0610.16n'
+ELEMENTS = {
+    "G20": dict(
+        e=0.483385741245e-02,
+        sqrt_a=0.515369705963e04,
+        omega=0.133849764271e01,
+        delta_n=0.530236372187e-08,
+        m0=0.253477496869e00,
+        Omega=0.304306271006e00,
+        Omega_dot=-0.843427989304e-08,
+        cus=0.810064375401e-05,
+        cuc=-0.111199915409e-05,
+        crs=-0.231562500000e02,
+        crc=0.207250000000e03,
+        cis=0.372529029846e-08,
+        cic=-0.141561031342e-06,
+        i0=0.926615731710e00,
+        idot=-0.164292557730e-09,
+    ),
+    "E11": dict(
+        e=3.306962316856e-04,
+        sqrt_a=5.440621692657e03,
+        omega=-6.590241211713e-01,
+        delta_n=3.015839907552e-09,
+        m0=2.397505637802e00,
+        Omega=-1.259905024101e00,
+        Omega_dot=-5.572732126661e-09,
+        cus=8.240342140198e-06,
+        cuc=-1.462176442146e-06,
+        crs=-3.243750000000e01,
+        crc=1.663125000000e02,
+        cis=5.960464477539e-08,
+        cic=9.313225746155e-09,
+        i0=9.679475503522e-01,
+        idot=2.775115594704e-10,
+    ),
+}
+
+
+@pytest.mark.quick
+class TestBroadcastVectorized(unittest.TestCase):
+    """Compare the propagation of all observations at once to the propagation of each observation
+
+    The broadcast ephemeris Dataset is set up with several navigation messages for each satellite, which are not sorted
+    by time. Two of the messages have the same time of ephemeris.
+    """
+
+    def setUp(self):
+        rng = np.random.RandomState(2016)
+        config.analysis.update("config", "tech", "gnss", source=__name__)
+        config.analysis.master_section = "config"
+
+        # Navigation messages every two hours on 2016-03-01, with an extra message for G20 at 04:00
+        mjd_start = 57448.0
+        brdc_sat = ["G20"] * 13 + ["E11"] * 12
+        brdc_hours = np.concatenate((np.arange(0, 24, 2), [4], np.arange(0, 24, 2)))
+        order = rng.permutation(len(brdc_sat))
+        brdc_sat, brdc_hours = [brdc_sat[i] for i in order], brdc_hours[order]
+
+        dset_edit = data.Dataset(date(2016, 3, 1), "gnss", "broadcast", "edit", 0, empty=True, session="")
+        dset_edit.num_obs = len(brdc_sat)
+        dset_edit.add_text("satellite", val=brdc_sat)
+        dset_edit.add_text("system", val=[s[0] for s in brdc_sat])
+        dset_edit.add_time("toe", val=mjd_start + brdc_hours / 24, scale="gps", format="mjd")
+        dset_edit.add_time("time", val=mjd_start + brdc_hours / 24, scale="gps", format="mjd")
+        dset_edit.add_time("transmission_time", val=mjd_start + (brdc_hours - 0.5) / 24, scale="gps", format="mjd")
+        dset_edit.add_float("iode", val=np.arange(dset_edit.num_obs))
+        for field in ELEMENTS["G20"]:
+            values = np.array([ELEMENTS[sat][field] for sat in brdc_sat])
+            dset_edit.add_float(field, val=values * (1 + 1e-6 * rng.randn(dset_edit.num_obs)))
+
+        # Observation epochs over the day, including epochs before the first message and exactly between two messages
+        obs_hours = np.concatenate((rng.rand(200) * 25 - 0.5, [-0.25, 3, 5, 15]))
+        satellite = [("G20", "E11")[i] for i in rng.randint(2, size=len(obs_hours))]
+        satellite[-4:] = ["G20", "G20", "G20", "E11"]
+        time = Time(mjd_start + obs_hours / 24, scale="gps", format="mjd")
+
+        self.brdc = broadcast.BroadcastOrbit(
+            date(2016, 3, 1), time=time, satellite=satellite, system=[s[0] for s in satellite], station="test"
+        )
+        self.brdc._dset_edit = dset_edit
+
+    def tearDown(self):
+        config.analysis.master_section = None
+        config.tech.master_section = None
+        config.reset_config()
+
+    def _nearest_block_per_observation(self, time_key, positive):
+        """Broadcast block indices found by searching the broadcast blocks for each observation"""
+        brdc_idx = list()
+        for sat, time in zip(self.brdc.satellite, self.brdc.time):
+            idx = self.brdc.dset_edit.filter(satellite=sat)
+            diff = time.gps.mjd - self.brdc.dset_edit[time_key].gps.mjd[idx]
+            if positive:
+                nearest_idx = np.array([99999 if v < 0 else v for v in diff]).argmin()
+            else:
+                nearest_idx = np.array([abs(diff)]).argmin()
+            brdc_idx.append(idx.nonzero()[0][nearest_idx])
+        return brdc_idx
+
+    def test_brdc_block_idx(self):
+        for nearest_to in ("toe", "toe:positive", "transmission_time", "transmission_time:positive"):
+            with self.subTest(brdc_block_nearest_to=nearest_to):
+                config.tech.update("test", "brdc_block_nearest_to", nearest_to, source=__name__)
+                config.tech.master_section = "test"
+                time_key, _, positive = nearest_to.partition(":")
+                expected = self._nearest_block_per_observation(time_key, positive == "positive")
+                np.testing.assert_equal(self.brdc._get_brdc_block_idx(), expected)
+
+    def test_propagation(self):
+        config.tech.update("test", "brdc_block_nearest_to", "toe", source=__name__)
+        config.tech.master_section = "test"
+        brdc_idx = self.brdc._get_brdc_block_idx()
+        gpsweek, gpssec = self.brdc.time.gps.gpsweek, self.brdc.time.gps.gpssec
+        system = np.array(self.brdc.system)
+
+        brdc_dict = self.brdc._get_corrected_broadcast_ephemeris(gpsweek, gpssec, brdc_idx, system)
+        sat_pos, sat_vel = self.brdc._get_satellite_position_velocity(gpsweek, gpssec, brdc_idx, system)
+        rel_clk_corr = self.brdc._get_relativistic_clock_correction(gpsweek, gpssec, brdc_idx, system)
+        self.assertEqual(sat_pos.shape, (len(brdc_idx), 3))
+        self.assertEqual(sat_vel.shape, (len(brdc_idx), 3))
+
+        for obs, args in enumerate(zip(gpsweek, gpssec, brdc_idx, self.brdc.system)):
+            expected_dict = self.brdc._get_corrected_broadcast_ephemeris(*args)
+            for key, expected in expected_dict.items():
+                np.testing.assert_allclose(brdc_dict[key][obs], expected, rtol=1e-14, atol=0, err_msg=key)
+
+            expected_pos, expected_vel = self.brdc._get_satellite_position_velocity(*args)
+            np.testing.assert_allclose(sat_pos[obs], expected_pos, rtol=0, atol=1e-6)
+            np.testing.assert_allclose(sat_vel[obs], expected_vel, rtol=0, atol=1e-9)
+
+            expected_rel = self.brdc._get_relativistic_clock_correction(*args)
+            np.testing.assert_allclose(rel_clk_corr[obs], expected_rel, rtol=0, atol=1e-12)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+""" Test :mod:`where.apriori.orbit.precise`.
+
+The precomputed Lagrange interpolation is compared against Lagrange interpolation through the window of orbit epochs
+around each epoch, using a synthetic orbit sampled every 15 minutes.
+
+"""
+
+# Standard library imports
+from datetime import date
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+# External library imports
+import numpy as np
+from scipy.interpolate import BarycentricInterpolator
+
+# Where imports
+from where.apriori.orbit.precise import PreciseOrbit, SegmentInterpolator, _interpolator
+from where.data.dataset import Dataset
+from where.lib import cache
+from where.lib import config
+
+# Orbital period of GPS satellites in seconds
+PERIOD = 43082.0
+
+
+def _orbit(sec):
+    angle = 2 * np.pi * sec / PERIOD
+    return 26.56e6 * np.stack((np.cos(angle), 0.9 * np.sin(angle), 0.3 * np.sin(angle)), axis=-1)
+
+
+class TestSegmentInterpolator(unittest.TestCase):
+    def setUp(self):
+        self.sec = np.arange(0, 86400 + 1, 900.0)
+        self.pos = _orbit(self.sec)
+        satellite = np.repeat(["G01", "G02"], len(self.sec))
+        self.interpolator = SegmentInterpolator(
+            np.hstack((self.sec, self.sec)), satellite, np.vstack((self.pos, 1.1 * self.pos)), window=10
+        )
+        self.sec_new = np.random.RandomState(2018).uniform(0, 86400, 200)
+
+    def test_position(self):
+        pos, _ = self.interpolator(self.sec_new, np.full(len(self.sec_new), "G01"))
+        for epoch, pos_epoch in zip(self.sec_new, pos):
+            start = np.clip(np.searchsorted(self.sec, epoch) - 5, 0, len(self.sec) - 10)
+            window = slice(start, start + 10)
+            expected = BarycentricInterpolator(self.sec[window], self.pos[window])(epoch)
+            np.testing.assert_allclose(pos_epoch, expected, rtol=0, atol=1e-6)
+
+    def test_velocity(self):
+        _, vel = self.interpolator(self.sec_new, np.full(len(self.sec_new), "G02"))
+        expected = 1.1 * (_orbit(self.sec_new + 0.25) - _orbit(self.sec_new - 0.25)) / 0.5
+        np.testing.assert_allclose(vel, expected, rtol=0, atol=1e-4)
+
+    def test_out_of_range(self):
+        pos, vel = self.interpolator(np.array([-1.0, 86401.0, 100.0]), np.array(["G01", "G01", "G03"]))
+        self.assertTrue(np.all(np.isnan(pos)))
+        self.assertTrue(np.all(np.isnan(vel)))
+
+
+class FilePreciseOrbit(PreciseOrbit):
+    """Precise orbit with synthetic orbit data, read from a file with a given path"""
+
+    def _edit(self, dset_edit):
+        sec = np.arange(0, 86400 + 1, 900.0)
+        dset_edit.num_obs = len(sec)
+        dset_edit.add_time("time", val=58119 + sec / 86400, scale="gps", format="mjd")
+        dset_edit.add_text("satellite", val=["G01"] * len(sec))
+        dset_edit.add_position("sat_pos", time="time", itrs=_orbit(sec), unit="meter")
+        dset_edit.add_to_meta("parser", "file_path", [str(self.file_path)])
+        return dset_edit
+
+
+class TestInterpolatorCache(unittest.TestCase):
+    def setUp(self):
+        cache.clear(include_shared=True)
+        config.analysis.update("config", "tech", "gnss", source=__name__)
+        config.analysis.master_section = "config"
+        self.work_dir = tempfile.mkdtemp()
+        self.file_path = pathlib.Path(self.work_dir) / "orbit.sp3"
+        self.file_path.write_text("orbit 1")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        cache.clear(include_shared=True)
+        config.analysis.master_section = None
+        config.reset_config()
+
+    def _interpolator(self):
+        return FilePreciseOrbit(date(2018, 1, 1), time=None, satellite=("G01",), file_path=self.file_path).interpolator
+
+    def test_shared_between_sessions(self):
+        ref_time, interpolator = self._interpolator()
+        self.assertEqual(ref_time.gps.mjd, 58119)
+
+        # Interpolators are kept when a new session clears the cache
+        cache.clear()
+        self.assertIs(self._interpolator()[1], interpolator)
+
+        # A new interpolator is set up when the orbit file changes
+        self.file_path.write_text("orbit 2")
+        self.assertIsNot(self._interpolator()[1], interpolator)
+
+    def test_cached_size(self):
+        # The cache holds the interpolator itself, so that its size is known when it is cached
+        _, interpolator = self._interpolator()
+        coefficient_bytes = sum(array.nbytes for segment in interpolator.segments.values() for array in segment)
+        self.assertGreater(coefficient_bytes, 0)
+        self.assertGreaterEqual(cache.info()[_interpolator.cache_namespace].nbytes, coefficient_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
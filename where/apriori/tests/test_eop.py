@@ -0,0 +1,108 @@
+""" Test :mod:`where.apriori.eop`.
+
+The interpolation of the daily EOP values is compared against Lagrange polynomials from `scipy.interpolate.lagrange`,
+and the evaluation of correction models on a regular time grid is compared against evaluating the models for each
+epoch. The EOP table is synthetic, and contains the leap second at the end of 2016.
+
+"""
+
+# Standard library imports
+import math
+import unittest
+
+# External library imports
+import numpy as np
+from scipy import interpolate
+
+# Where imports
+from where.apriori import eop
+from where.lib.time import Time
+
+# Days around the leap second 2017-01-01 (MJD 57754)
+DAYS = np.arange(57745, 57765)
+
+
+def _eop_data():
+    rng = np.random.RandomState(2018)
+    ut1_utc = 0.4 - 0.0015 * (DAYS - DAYS[0]) + (DAYS >= 57754)
+    return {
+        d: dict(x=0.05 + 0.01 * rng.randn(), y=0.4 + 0.01 * rng.randn(), ut1_utc=u, lod=0.001, dx=0.0, dy=0.0)
+        for d, u in zip(DAYS, ut1_utc)
+    }
+
+
+def _lagrange(eop_object, key, leap_second_correction=False, derivative_order=0):
+    """Interpolate daily values with one Lagrange polynomial per day, like earlier versions of Where"""
+    offsets = range(-math.ceil(eop_object.window / 2) + 1, math.floor(eop_object.window / 2) + 1)
+    values = list()
+    time = eop_object.time.utc
+    for mjd_int, mjd_frac in zip(np.atleast_1d(time.mjd_int), np.atleast_1d(time.mjd_frac)):
+        table_values = np.array([eop_object.data[mjd_int + o][key] for o in offsets])
+        if leap_second_correction:
+            leap = np.array([eop_object.data[mjd_int + o]["leap_offset"] for o in offsets])
+            table_values += leap - eop_object.data[mjd_int]["leap_offset"]
+        poly = interpolate.lagrange(offsets, table_values)
+        poly.c[np.abs(poly.c) < 1e-15] = 0
+        values.append(np.polyder(poly, derivative_order)(mjd_frac))
+    return np.array(values)
+
+
+class TestInterpolateTable(unittest.TestCase):
+    def setUp(self):
+        mjd = np.random.RandomState(2019).uniform(57750, 57759, 500)
+        self.eop = eop.Eop(_eop_data(), Time(mjd, format="mjd", scale="utc"), models=("none",))
+
+    def test_values(self):
+        for key in ("x", "y"):
+            expected = _lagrange(self.eop, key)
+            np.testing.assert_allclose(self.eop._interpolate_table(key), expected, rtol=0, atol=1e-12)
+
+    def test_derivatives(self):
+        for derivative_order in (1, 2):
+            expected = _lagrange(self.eop, "x", derivative_order=derivative_order)
+            interpolated = self.eop._interpolate_table("x", derivative_order=derivative_order)
+            np.testing.assert_allclose(interpolated, expected, rtol=0, atol=1e-12)
+
+    def test_leap_second(self):
+        for derivative_order in (0, 1):
+            expected = _lagrange(self.eop, "ut1_utc", leap_second_correction=True, derivative_order=derivative_order)
+            interpolated = self.eop._interpolate_table(
+                "ut1_utc", leap_second_correction=True, derivative_order=derivative_order
+            )
+            np.testing.assert_allclose(interpolated, expected, rtol=0, atol=1e-12)
+
+    def test_constant_values(self):
+        for day in self.eop.data.values():
+            day["lod"] = 0.001
+        np.testing.assert_equal(self.eop._interpolate_table("lod"), 0.001)
+        np.testing.assert_equal(self.eop._interpolate_table("lod", derivative_order=1), 0)
+
+    def test_scalar(self):
+        time = Time(57752.25, format="mjd", scale="utc")
+        eop_scalar = eop.Eop(_eop_data(), time, models=("none",))
+        self.assertTrue(np.isscalar(eop_scalar._interpolate_table("x")))
+        self.assertAlmostEqual(eop_scalar._interpolate_table("x"), _lagrange(eop_scalar, "x")[0], delta=1e-12)
+
+
+class TestEvaluateModel(unittest.TestCase):
+    @staticmethod
+    def _model(mjd):
+        """Smooth model with tidal periods of 12.42 hours, 1 day and 13.66 days"""
+        angles = 2 * np.pi * mjd / np.array([12.42 / 24, 1.0, 13.66])
+        return np.array([np.sin(angles) @ [1.0, 0.5, 2.0], np.cos(angles) @ [0.3, 1.0, 0.1]])
+
+    def test_grid(self):
+        mjd = 57750 + np.sort(np.random.RandomState(2018).uniform(0, 1, 2000))
+        values = eop._evaluate_model(self._model, mjd)
+        expected = np.array([self._model(m) for m in mjd])
+        self.assertEqual(values.shape, (len(mjd), 2))
+        np.testing.assert_allclose(values, expected, rtol=0, atol=1e-7)
+
+    def test_few_epochs(self):
+        mjd = np.array([57750.5, 57750.25, 57750.5, 57752.0])
+        values = eop._evaluate_model(self._model, mjd)
+        np.testing.assert_equal(values, np.array([self._model(m) for m in mjd]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+""" Test :mod:`where.apriori.trf._trf`.
+
+Reference frames read from files share their data between sessions, until the files change.
+
+"""
+
+# Standard library imports
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+# Where imports
+from where.apriori.trf import _trf
+from where.lib import cache
+
+
+class FileTrf(_trf.TrfFactory):
+    """Reference frame reading the name of one site from a file"""
+
+    num_reads = 0
+
+    @property
+    def file_paths(self):
+        return dict(sites=pathlib.Path(self.version))
+
+    def _read_data(self):
+        FileTrf.num_reads += 1
+        return {self.file_paths["sites"].read_text(): dict(pos=[0, 0, 0])}
+
+
+class TestTrfFactory(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.file_path = pathlib.Path(self.work_dir) / "sites.txt"
+        self.file_path.write_text("NYALES20")
+        cache.clear(include_shared=True)
+        FileTrf.num_reads = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        cache.clear(include_shared=True)
+
+    def test_shared_data(self):
+        self.assertEqual(list(FileTrf(None, str(self.file_path)).data), ["NYALES20"])
+        self.assertEqual(list(FileTrf(None, str(self.file_path)).data), ["NYALES20"])
+
+        # Data are kept when a new session clears the cache
+        cache.clear()
+        self.assertEqual(list(FileTrf(None, str(self.file_path)).data), ["NYALES20"])
+        self.assertEqual(FileTrf.num_reads, 1)
+
+        # Data are read again when the file changes
+        self.file_path.write_text("ONSALA60")
+        self.assertEqual(list(FileTrf(None, str(self.file_path)).data), ["ONSALA60"])
+        self.assertEqual(FileTrf.num_reads, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
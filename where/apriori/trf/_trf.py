@@ -18,8 +18,11 @@ import collections
 import numpy as np
 
 # Where imports
+from where.lib import cache
 from where.lib import config
+from where.lib import dependencies
 from where.lib import exceptions
+from where.lib import files
 from where.lib import log
 from where.apriori import trf
 from where.lib import util
@@ -142,12 +145,30 @@ class TrfFactory:
     @property
     def data(self):
         """Data needed by this Reference Frame, lazily read by self._read_data when needed
+
+        Reference frames that only depend on the files listed in `file_paths` share their data between sessions. The
+        data are read again if the checksum of one of the files changes.
         """
         if self._data is None:
-            self._data = self._read_data()
+            file_paths = self.file_paths
+            if file_paths is None:
+                self._data = self._read_data()
+            else:
+                dependencies.add(*file_paths.values())
+                checksums = tuple(files.get_md5(p) for p in file_paths.values())
+                self._data = _read_shared_data(self.__class__, self.version, checksums)
 
         return self._data
 
+    @property
+    def file_paths(self):
+        """Paths to the files the data of this Reference Frame are read from
+
+        Returns:
+            Dict:  File paths, or None if the data do not only depend on files.
+        """
+        return None
+
     @property
     def sites(self):
         """List of all sites known by this reference frame
@@ -209,6 +230,24 @@ class TrfFactory:
         return "{}({!r}, '{}')".format(self.__class__.__name__, self.time, self.version)
 
 
+@cache.function(shared=True)
+def _read_shared_data(factory_cls, version, checksums):
+    """Read the data of a reference frame that only depends on files
+
+    The data are shared between sessions, and must not be changed. The checksums of the files are part of the cache
+    key, so that the data are read again when the files change.
+
+    Args:
+        factory_cls (Class):  Subclass of TrfFactory.
+        version (String):     Version of the reference frame.
+        checksums (Tuple):    Checksums of the files the data are read from.
+
+    Returns:
+        Dict:  Dictionary containing data about each site defined in the reference frame.
+    """
+    return factory_cls(time=None, version=version)._read_data()
+
+
 class TrfSite:
     def __init__(self, key, time, itrs, source, real=True, name=None, **meta_args):
         """Constructor
@@ -16,6 +16,7 @@ import numpy as np
 
 # Where imports
 from where.apriori import trf
+from where.lib import files
 from where.lib import plugins
 from where.lib.time import Time
 from where.lib.unit import unit
@@ -27,6 +28,11 @@ class Vascc(trf.TrfFactory):
     """A class for representing apriori station positions and velocities from SSC
     """
 
+    @property
+    def file_paths(self):
+        """File paths used to read VASCC data"""
+        return dict(ssc=files.path("vascc_trf", download_missing=True))
+
     def _read_data(self):
         return parsers.parse_key(file_key="vascc_trf").as_dict()
 
@@ -0,0 +1,229 @@
+"""Handling of categorical text data inside the Where Dataset
+
+Description:
+
+Categorical text fields are text fields taking only a few distinct values, like station names, sources or satellites.
+Each field is stored as a small, sorted array of the distinct values (the categories) and an array of integer codes
+pointing into the categories. Filtering, finding unique values, subsetting and extending work directly on the codes.
+
+The values of a field are returned as a read-only Numpy array of strings, so they can be used like regular text
+fields. Values of categorical fields can not be changed in place.
+
+Example:
+
+    > dset.add_categorical("station", val=["NYALES20", "WETTZELL", "NYALES20"])
+    > dset.station
+    array(['NYALES20', 'WETTZELL', 'NYALES20'], dtype='<U8')
+    > dset.filter(station="NYALES20")
+    array([ True, False,  True])
+
+"""
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.data.table import Table
+
+
+class CategoricalTable(Table):
+    """Table of text fields stored as integer codes into a small list of categories"""
+
+    datatype = "categorical"
+
+    def __init__(self, name, num_obs, dataset):
+        super().__init__(name, num_obs, dataset)
+        self._data = dict()
+        self._categories = dict()
+        self._values = dict()
+
+    @classmethod
+    def get_default_tablename(cls, fieldname):
+        """Default name of table
+
+        Categorical data are by default stored in one table called 'categorical_data'.
+
+        Returns:
+            String with default name of table.
+        """
+        return "{}_{}".format(cls.datatype, "data")
+
+    def add(self, fieldname, val, unit="", write_level=None, **_kwargs):
+        """Add a field of categorical text values
+
+        Args:
+            fieldnames:  String or list of strings with names of fields to be added.
+            table:       String, name of table where fields are added (optional).
+        """
+        if len(val) != self.num_obs:
+            raise ValueError("'val' must be a list with length {}".format(self.num_obs))
+
+        super().add(fieldname, write_level)
+        self._set_field(fieldname, *np.unique(np.array(val, dtype=str), return_inverse=True))
+        self._fields.append(fieldname)
+        self._units[fieldname] = unit
+
+    def read(self, json_data, hdf5_data):
+        """Read a categorical table from file
+
+        Each field is stored in its own group in the HDF5-file, with the categories as UTF-8 strings and the codes as
+        an integer array.
+
+        Args:
+            json_data:  Dict, data read from JSON-file.
+            hdf5_data:  HDF5 dataset, data read from HDF5-file.
+        """
+        super().read(json_data, hdf5_data)
+        for field, field_group in hdf5_data[self.name].items():
+            categories = np.array([c.decode("utf-8") for c in field_group["categories"]], dtype=str)
+            self._set_field(field, categories, field_group["codes"][...])
+        self._fields = sorted(self._data)
+
+    def write(self, json_data, hdf5_data, write_level=None):
+        """Write a categorical table to file
+
+        Args:
+            json_data:  Dict, data to be stored in JSON-file.
+            hdf5_data:  HDF5 dataset, data to be stored in HDF5-file.
+        """
+        table_group = hdf5_data.create_group(self.name)
+        for field in self.get_fields(write_level):
+            field_group = table_group.create_group(field)
+            encoded = np.array([c.encode("utf-8") for c in self._categories[field]], dtype=bytes)
+            field_group.create_dataset("categories", data=encoded)
+            field_group.create_dataset("codes", data=self._data[field])
+
+    def copy_from(self, other_table):
+        """Copy data from another categorical table
+
+        Args:
+            other_table:  CategoricalTable-object. Table to copy data from.
+        """
+        super().copy_from(other_table)
+        self._data = {f: v.copy() for f, v in other_table._data.items()}
+        self._categories = {f: v.copy() for f, v in other_table._categories.items()}
+        self._values = dict()
+
+    def subset(self, idx):
+        """Remove observations from table based on idx
+
+        Only the codes are changed, the categories are kept as they are.
+
+        Args:
+            idx:   Array of booleans with shape (num_obs, ). True means observation is kept, False means removed.
+        """
+        for field, codes in self._data.items():
+            self._data[field] = codes[idx]
+        self._values.clear()
+        self._num_obs = np.sum(idx)
+
+    def extend(self, other_table):
+        """Add observations from another categorical table at the end of this table
+
+        The categories of the two tables are merged, and the codes are translated to the merged categories. Fields in
+        only one of the tables are handled by filling with empty strings.
+
+        Args:
+            other_table (CategoricalTable):   The other table.
+        """
+        for field in set(self.fields) | set(other_table.fields):
+            if field in other_table.fields:
+                other_categories, other_codes = other_table._categories[field], other_table._data[field]
+            else:
+                other_categories, other_codes = np.array([""]), np.zeros(other_table.num_obs, dtype=np.uint8)
+
+            if field not in self.fields:
+                self._dataset.add_categorical(field, val=np.full(self.num_obs, ""), table=self.name)
+
+            categories = np.union1d(self._categories[field], other_categories)
+            codes = np.concatenate(
+                (
+                    np.searchsorted(categories, self._categories[field])[self._data[field]],
+                    np.searchsorted(categories, other_categories)[other_codes],
+                )
+            )
+            self._set_field(field, categories, codes)
+
+        self._num_obs += other_table.num_obs
+
+    def filter_field(self, field, filter_value):
+        """Filter observations in one field
+
+        The filter value is looked up in the categories, and the codes are compared to the code of the filter value.
+
+        Args:
+            field:         String, name of field.
+            filter_value:  String, value to compare to.
+
+        Returns:
+            Numpy array of booleans with shape (num_obs, ).
+        """
+        categories = self._categories[field]
+        code = np.searchsorted(categories, filter_value)
+        if code >= len(categories) or categories[code] != filter_value:
+            return np.zeros(self.num_obs, dtype=bool)
+
+        return self._data[field] == code
+
+    def unique(self, field, idx):
+        """List unique values in one field
+
+        Args:
+            field:  String, name of field.
+            idx:    Array of booleans with shape (num_obs, ). Only observations where idx is True are considered.
+
+        Returns:
+            List of strings, sorted unique values.
+        """
+        return self._categories[field][np.unique(self._data[field][idx])].tolist()
+
+    def plot_values(self, field):
+        """Return values of a field in a form that can be plotted
+
+        Args:
+            field:   String, the field name.
+
+        Returns:
+            Numpy-array that can be plotted by for instance matplotlib.
+        """
+        return np.unique(self._data[field], return_inverse=True)[1] + 1
+
+    def as_dict(self, use_plot_values=False, fields=None):
+        """Return a representation of the table as a dict
+
+        Args:
+            use_plot_values (Boolean):  Use the plot_values instead of regular values for each field.
+            fields (List):              Field names that should be included, default is to include all fields.
+
+        Returns:
+            Dict: A representation of the table as a dictionary.
+        """
+        fields = self.fields if fields is None else fields
+        if use_plot_values:
+            return {f: self.plot_values(f) for f in self.fields if f in fields}
+        else:
+            return {f: self[f] for f in self.fields if f in fields}
+
+    def _set_field(self, field, categories, codes):
+        """Store categories and codes of one field, using the smallest integer type that can hold the codes"""
+        self._categories[field] = categories
+        self._data[field] = np.asarray(codes).astype(np.min_scalar_type(max(len(categories) - 1, 0)))
+        self._values.pop(field, None)
+
+    def __getitem__(self, key):
+        """Read field data from table
+
+        The values are created from the categories and codes the first time they are needed, and then kept until the
+        field changes.
+
+        Args:
+            key:   String with name of field.
+
+        Returns:
+            Read-only Numpy array of strings with field data.
+        """
+        if key not in self._values:
+            values = self._categories[key][self._data[key]]
+            values.flags.writeable = False
+            self._values[key] = values
+        return self._values[key]
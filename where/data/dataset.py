@@ -11,11 +11,17 @@ asdf.
 """
 
 # Standard library imports
+import collections.abc
+from contextlib import contextmanager
 import copy
 from datetime import date
+import fcntl
 import json
+import os
+import uuid
 
 # External library imports
+import h5py
 import numpy as np
 import pandas as pd
 
@@ -25,7 +31,7 @@ from midgard.dev import console
 import where
 from where.data import _data
 from where.lib import config
-from where.lib.exceptions import FieldExistsError, InitializationError
+from where.lib.exceptions import FieldExistsError, InitializationError, MissingDataError
 from where.lib import files
 from where.lib import log
 from where.lib.time import Time
@@ -57,7 +63,7 @@ class Dataset(object):
     Regular text?
     """
 
-    def __init__(self, rundate, tech, stage, dataset_name, dataset_id, empty=False, **kwargs):
+    def __init__(self, rundate, tech, stage, dataset_name, dataset_id, empty=False, fields=None, **kwargs):
         """Create a new Dataset or read an existing one
 
         Note:
@@ -71,10 +77,11 @@ class Dataset(object):
             dataset_name: String, the name of the dataset.
             dataset_id:   Int, id of the dataset.
             empty:        Boolean, if False (default) will read dataset from disk if available.
+            fields:       List of strings, only read these fields from disk (optional). See :func:`read`.
 
         """
         self._fields = dict()
-        self._data = dict()
+        self._data = _Tables()
         self._num_obs = 0
         self._default_field_suffix = None
         self._kwargs = kwargs
@@ -100,7 +107,7 @@ class Dataset(object):
         # Try to read dataset from disk unless explicitly told to create an empty dataset
         if not empty:
             try:
-                self.read()
+                self.read(fields=fields)
             except FileNotFoundError:
                 pass
 
@@ -120,38 +127,102 @@ class Dataset(object):
 
         return dset
 
-    def read(self):
+    def read(self, fields=None):
         """Read a dataset from file
 
-        A dataset is stored on disk in two files, one JSON-file and one HDF5-file. Typically the HDF5-file is great for
-        handling numeric data, while JSON is more flexible. The actual reading of the data is handled by the individual
-        datatype table-classes. The dispatch to the correct class is done by functions defined in the
+        Each dataset is stored on disk in two files, one JSON-file and one HDF5-file. Typically the HDF5-file is great
+        for handling numeric data, while JSON is more flexible. An index-file, common for all datasets of a stage,
+        lists the datasets that are available. The actual reading of the data is handled by the individual datatype
+        table-classes. The dispatch to the correct class is done by functions defined in the
         :func:`Dataset._read`-method which is called by :mod:`where.data._data` when Dataset is first imported.
+
+        Datasets written by older versions of Where are stored together with all other datasets of the stage, in the
+        index-file and one common HDF5-file.
+
+        Only the JSON-file is read up front. The field names are registered at once, while the data of each table are
+        read from the HDF5-file the first time the table is used. Datasets written by older versions of Where do not
+        list their fields in the JSON-file, and are read completely.
+
+        If `fields` is given, only tables containing at least one of the fields (or fields with the same name and a
+        suffix, like station_1 and station_2 for station), and the tables they depend on, are available in the
+        dataset. Such a partial dataset should not be written back to disk under the same name, as the other fields
+        would then be lost.
+
+        Args:
+            fields:  List of strings, only read these fields (optional, default is to read all fields).
         """
-        # Open and read JSON-file
-        json_path = files.path("dataset_json", file_vars=self.vars)
-        with files.open_path(json_path, mode="rt", write_log=False) as f_json:
-            json_all = json.load(f_json)
+        # Look up dataset in index-file
+        index_path = files.path("dataset_json", file_vars=self.vars)
+        with files.open_path(index_path, mode="rt", write_log=False) as f_index:
+            json_all = json.load(f_index)
         if self.name not in json_all:
-            raise FileNotFoundError("Dataset {} not found in file {}".format(self.name, json_path))
+            raise FileNotFoundError("Dataset {} not found in file {}".format(self.name, index_path))
 
-        log.debug("Read dataset {tech}-{stage} from disk at {directory}", directory=json_path.parent, **self.vars)
-        json_data = json_all[self.name]
+        # Open and read JSON-file
+        log.debug("Read dataset {tech}-{stage} from disk at {directory}", directory=index_path.parent, **self.vars)
+        file_vars, name = self._file_vars(), self.name
+        if "_tables" in json_all[self.name]:
+            json_data = json_all[self.name]
+            hdf5_key = "dataset_hdf5"
+        else:
+            json_path = files.path("dataset_id_json", file_vars=file_vars)
+            with files.open_path(json_path, mode="rt", write_log=False) as f_json:
+                json_data = json.load(f_json)
+            hdf5_key = "dataset_id_hdf5"
         self._num_obs = json_data["_num_obs"]
         tables = json_data["_tables"]
+        table_fields = json_data.get("_fields")
+
+        # Read data for each table by dispatching to read function based on datatype
+        if table_fields is None:
+            self._read_tables(tables, json_data, hdf5_key, file_vars, name)
+        else:
+            if fields is not None:
+                tables = _tables_with_fields([fields] if isinstance(fields, str) else fields, json_data)
+            for table in tables:
+                self._fields.update({f: table for f in table_fields[table]})
+            self._data.add_pending(
+                tables, lambda table, dtype: self._read_tables({table: dtype}, json_data, hdf5_key, file_vars, name)
+            )
+
+        # Add meta and vars properties
+        self.meta = json_data.get("_meta", dict())
+        self.vars = json_data.get("_vars", self.vars)
 
-        # Open HDF5-file
-        with files.open_datafile("dataset_hdf5", file_vars=self.vars, mode="r", write_log=False) as f_hdf5:
-            hdf5_data = f_hdf5[self.name]
+    def _read_tables(self, tables, json_data, hdf5_key, file_vars, name):
+        """Read data for tables from the HDF5-file
+
+        Args:
+            tables:     Dict, names and datatypes of the tables to read.
+            json_data:  Dict, data read from JSON-file.
+            hdf5_key:   String, file key of the HDF5-file.
+            file_vars:  Dict, variables used to find the HDF5-file.
+            name:       String, name of the dataset inside the HDF5-file.
+        """
+        with files.open_datafile(hdf5_key, file_vars=file_vars, mode="r", write_log=False) as f_hdf5:
+            hdf5_data = f_hdf5[name]
+            if hdf5_data.attrs.get("write_id") != json_data.get("_write_id"):
+                raise MissingDataError(
+                    "Dataset {} has been overwritten on disk, can not read table(s) {}".format(name, ", ".join(tables))
+                )
 
-            # Read data for each table by dispatching to read function based on datatype
             for table, dtype in tables.items():
                 read_func = getattr(self, "_read_" + dtype)
                 read_func(table, json_data, hdf5_data)
 
-        # Add meta and vars properties
-        self.meta = json_data.get("_meta", dict())
-        self.vars = json_data.get("_vars", self.vars)
+    def _file_vars(self, **vars_):
+        """Variables used to find the files of this dataset
+
+        Args:
+            vars_:  Variables overriding the variables of the dataset.
+
+        Returns:
+            Dict: File variables, including the dataset name and a zero-padded dataset id.
+        """
+        file_vars = dict(self.vars, dataset_name=self.dataset_name, dataset_id=self.dataset_id)
+        file_vars.update(vars_)
+        file_vars["dataset_id"] = "{:04d}".format(int(file_vars["dataset_id"]))
+        return file_vars
 
     def rename(self, rundate=None, tech=None, stage=None, dataset_name=None, dataset_id=None, **kwargs):
         """Rename a dataset
@@ -188,36 +259,34 @@ class Dataset(object):
     def write(self, write_level=None):
         """Write a dataset to file
 
-        A dataset is stored on disk in two files, one JSON-file and one HDF5-file. Typically the HDF5-file is great for
-        handling numeric data, while JSON is more flexible. The actual writing of the data is handled by the individual
-        datatype table-classes. These classes are free to choose how they divide the data between the JSON- and
-        HDF5-files, as long as they are able to recover all the data.
+        Each dataset is stored on disk in two files, one JSON-file and one HDF5-file. Typically the HDF5-file is great
+        for handling numeric data, while JSON is more flexible. The actual writing of the data is handled by the
+        individual datatype table-classes. These classes are free to choose how they divide the data between the JSON-
+        and HDF5-files, as long as they are able to recover all the data.
+
+        The files are written to temporary paths and then moved in place, before the dataset is added to the
+        index-file of the stage. Readers thus never see half-written datasets, and writing a dataset does not touch the
+        other datasets of the stage. The index-file is locked while it is updated, so several processes can write
+        datasets to the same stage.
         """
-        json_path = files.path("dataset_json", file_vars=self.vars)
-        log.debug("Write dataset {tech}-{stage} to disk at {directory}", directory=json_path.parent, **self.vars)
+        index_path = files.path("dataset_json", file_vars=self.vars)
+        log.debug("Write dataset {tech}-{stage} to disk at {directory}", directory=index_path.parent, **self.vars)
 
         # Read write level from config
         write_level = config.tech.get("write_level", value=write_level).as_enum("write_level").name
 
-        # Read existing data in JSON-file
-        try:
-            with files.open_path(json_path, mode="rt", write_log=False) as f_json:
-                json_all = json.load(f_json)
-        except FileNotFoundError:
-            json_all = dict()
-        json_all.setdefault(self.name, dict())
-        json_data = json_all[self.name]
-
         # Figure out which tables have data
         tables = [t for t in self._data.values() if t.get_fields(write_level)]
-
-        # Open HDF5-file
-        with files.open_datafile("dataset_hdf5", file_vars=self.vars, mode="a", write_log=False) as f_hdf5:
-            if self.name in f_hdf5:
-                del f_hdf5[self.name]
+        write_id = uuid.uuid4().hex
+        json_data = dict()
+
+        # Write data for each table to HDF5-file
+        file_vars = self._file_vars()
+        hdf5_path = files.path("dataset_id_hdf5", file_vars=file_vars)
+        hdf5_path.parent.mkdir(parents=True, exist_ok=True)
+        with _replace_path(hdf5_path) as tmp_path, h5py.File(tmp_path, mode="w") as f_hdf5:
             hdf5_data = f_hdf5.create_group(self.name)
-
-            # Write data for each table (HDF5-data are automatically written to disk)
+            hdf5_data.attrs["write_id"] = write_id
             for table in tables:
                 table.write(json_data, hdf5_data, write_level)
 
@@ -227,15 +296,31 @@ class Dataset(object):
         json_data["_tables"] = {tbl.name: tbl.datatype for tbl in tables}
         json_data["_units"] = {tbl.name: tbl._units for tbl in tables}
         json_data["_write_levels"] = {tbl.name: tbl._write_level_strings for tbl in tables}
+        json_data["_fields"] = {tbl.name: _written_fields(tbl, write_level) for tbl in tables}
+        json_data["_write_id"] = write_id
         json_data["_meta"] = self.meta
         json_data["_vars"] = self.vars
 
-        # Store last dataset_id written to
-        json_all.setdefault(self.dataset_name, dict())["_last_dataset_id"] = self.dataset_id
-
         # Write JSON-data to file
-        with files.open_path(json_path, mode="wt", write_log=False) as f_json:
-            json.dump(json_all, f_json)
+        json_path = files.path("dataset_id_json", file_vars=file_vars)
+        with _replace_path(json_path) as tmp_path, files.open_path(tmp_path, mode="wt", write_log=False) as f_json:
+            json.dump(json_data, f_json)
+
+        # Add dataset and last dataset_id written to to the index-file. The index is locked while it is updated, so
+        # that datasets written concurrently by other processes are not lost
+        with _lock_path(index_path):
+            try:
+                with files.open_path(index_path, mode="rt", write_log=False) as f_index:
+                    json_all = json.load(f_index)
+            except FileNotFoundError:
+                json_all = dict()
+            json_all[self.name] = dict(_version=where.__version__, _num_obs=self.num_obs)
+            json_all.setdefault(self.dataset_name, dict())["_last_dataset_id"] = self.dataset_id
+
+            with _replace_path(index_path) as tmp_path, files.open_path(
+                tmp_path, mode="wt", write_log=False
+            ) as f_index:
+                json.dump(json_all, f_index)
 
     def write_as(
         self, rundate=None, tech=None, stage=None, dataset_name=None, dataset_id=None, write_level=None, **kwargs
@@ -273,31 +358,48 @@ class Dataset(object):
         if not ids_to_delete:
             return
 
-        # Open JSON and HDF5 file and remove datasets
+        # Remove datasets from index-file, and delete their files. The index-file is locked while it is updated
         file_vars = dict(self.vars, tech=tech, stage=stage)
-        json_path = files.path("dataset_json", file_vars=file_vars)
-        with files.open_path(json_path, mode="rt", write_log=False) as f_json:
-            json_all = json.load(f_json)
-        with files.open_datafile("dataset_hdf5", file_vars=file_vars, mode="a", write_log=False) as f_hdf5:
+        index_path = files.path("dataset_json", file_vars=file_vars)
+        with _lock_path(index_path):
+            with files.open_path(index_path, mode="rt", write_log=False) as f_index:
+                json_all = json.load(f_index)
+
+            old_datasets = list()
             for id_to_delete in ids_to_delete:
                 name = "{name}/{id:04d}".format(name=dataset_name, id=id_to_delete)
-                del json_all[name]
-                del f_hdf5[name]
+                if "_tables" in json_all.pop(name):
+                    old_datasets.append(name)  # Stored in the common HDF5-file by older versions of Where
+                else:
+                    id_vars = self._file_vars(
+                        tech=tech, stage=stage, dataset_name=dataset_name, dataset_id=id_to_delete
+                    )
+                    files.delete_file(files.path("dataset_id_hdf5", file_vars=id_vars))
+                    files.delete_file(files.path("dataset_id_json", file_vars=id_vars))
                 log.debug(
                     "Deleted {name} from dataset {tech}-{stage} at {directory}",
                     name=name,
                     tech=tech,
                     stage=stage,
-                    directory=json_path.parent,
+                    directory=index_path.parent,
                 )
 
-        with files.open_path(json_path, mode="wt", write_log=False) as f_json:
-            json.dump(json_all, f_json)
+            if old_datasets:
+                with files.open_datafile("dataset_hdf5", file_vars=file_vars, mode="a", write_log=False) as f_hdf5:
+                    for name in old_datasets:
+                        del f_hdf5[name]
 
-        # Delete files if all datasets are deleted
-        if not any(["/" in k for k in json_all.keys()]):
-            json_path.unlink()
-            files.path("dataset_hdf5", file_vars=file_vars).unlink()
+            with _replace_path(index_path) as tmp_path, files.open_path(
+                tmp_path, mode="wt", write_log=False
+            ) as f_index:
+                json.dump(json_all, f_index)
+
+            # Delete files if all datasets are deleted
+            if not any(["/" in k for k in json_all.keys()]):
+                index_path.unlink()
+                hdf5_path = files.path("dataset_hdf5", file_vars=file_vars)
+                if hdf5_path.exists():
+                    hdf5_path.unlink()
 
     def copy_from(self, other_dataset):
         # Check and update number of observations
@@ -310,7 +412,7 @@ class Dataset(object):
 
         # Clear any existing fields and tables
         self._fields = dict()
-        self._data = dict()
+        self._data = _Tables()
 
         # Update meta information
         self.meta = copy.deepcopy(other_dataset.meta)
@@ -399,7 +501,8 @@ class Dataset(object):
     def unique(self, field, **filters):
         """List all unique values of a given field
 
-        TODO: Should this be implemented at the table level? Using np.unique? Seems like np.unique is faster
+        The unique values are found by the table containing the field, so that for instance categorical tables can
+        work directly on their codes.
 
         Args:
             field:   String, fieldname.
@@ -407,14 +510,20 @@ class Dataset(object):
         Returns:
             List of values. The value type depends on the field.
         """
-        idx = [self.filter(**filters)] if filters else np.ones(self.num_obs, dtype=bool)
+        idx = self.filter(**filters) if filters else np.ones(self.num_obs, dtype=bool)
         if field in self._fields:
-            return sorted(set(self[field][idx]))
+            return self._unique(field, idx)
         elif self.default_field_suffix and field + self.default_field_suffix in self._fields:
-            return sorted(set(self[field + self.default_field_suffix][idx]))
+            return self._unique(field + self.default_field_suffix, idx)
         else:
             all_fields = [f for f in self._fields if f.startswith(field + "_")]
-            return sorted(set().union(*[self[f][idx] for f in all_fields]))
+            return sorted(set().union(*[self._unique(f, idx) for f in all_fields]))
+
+    def _unique(self, field, idx):
+        """List unique values of one field in the dataset, see Dataset.unique"""
+        if "." in field:
+            return sorted(set(self[field][idx]))
+        return self._data[self._fields[field]].unique(field, idx)
 
     def filter(self, idx=None, **filters):
         """Filter observations
@@ -1076,3 +1185,138 @@ class Dataset(object):
             self._fields.update({f: table for f in self._data[table].fields})
 
         return read_func
+
+
+@contextmanager
+def _lock_path(file_path):
+    """Lock file_path for updates, waiting for other processes to release it
+
+    The lock is taken on a separate lock-file, so that file_path itself can be replaced while the lock is held.
+
+    Args:
+        file_path (Path):  Path to file that will be updated.
+    """
+    lock_path = file_path.with_name(file_path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, mode="a") as fid:
+        fcntl.flock(fid, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fid, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _replace_path(file_path):
+    """Write to a temporary path, which is moved to file_path when done
+
+    Readers will see either the old or the new file, never a half-written one.
+
+    Args:
+        file_path (Path):  Path to file that will be written.
+
+    Returns:
+        Path:  Temporary path that should be written to.
+    """
+    tmp_path = file_path.with_name("{}.{}".format(file_path.name, os.getpid()))
+    try:
+        yield tmp_path
+        os.replace(tmp_path, file_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class _Tables(collections.abc.MutableMapping):
+    """Tables in a dataset, indexed by table name
+
+    Tables that are stored on disk may be added as pending tables. These are read by calling `read_table` the first
+    time they are used. Iterating over the tables lists pending tables as well, while looking up values reads them.
+    """
+
+    def __init__(self):
+        self._tables = dict()
+        self._pending = dict()
+        self._read_table = None
+
+    def add_pending(self, tables, read_table):
+        """Add tables that will be read the first time they are used
+
+        Args:
+            tables:      Dict, names and datatypes of tables.
+            read_table:  Function taking table name and datatype as arguments, reading the table into the dataset.
+        """
+        self._pending.update(tables)
+        self._read_table = read_table
+
+    def __getitem__(self, table):
+        if table in self._pending:
+            self._read_table(table, self._pending.pop(table))
+        return self._tables[table]
+
+    def __setitem__(self, table, value):
+        self._pending.pop(table, None)
+        self._tables[table] = value
+
+    def __delitem__(self, table):
+        if table in self._pending:
+            del self._pending[table]
+        else:
+            del self._tables[table]
+
+    def __contains__(self, table):
+        return table in self._tables or table in self._pending
+
+    def __iter__(self):
+        return iter(list(self._tables) + list(self._pending))
+
+    def __len__(self):
+        return len(self._tables) + len(self._pending)
+
+
+def _written_fields(table, write_level):
+    """List names of fields in a table that are written to file at a given write level
+
+    Args:
+        table:        Table-object.
+        write_level:  String, lowest write level of fields that are written.
+
+    Returns:
+        List of strings with names of fields, including derived fields like site_pos.llh.
+    """
+    written = set(table.get_fields(write_level))
+    return [f for f in table.fields if f.split(".")[0] in written]
+
+
+def _tables_with_fields(fields, json_data):
+    """Find tables needed to read the given fields from file
+
+    Tables referenced by other tables, like the time table of a position table, are included as well.
+
+    Args:
+        fields:     List of strings with names of fields.
+        json_data:  Dict, data read from JSON-file.
+
+    Returns:
+        Dict: Names and datatypes of tables.
+    """
+    all_tables = json_data["_tables"]
+    needed = {
+        table
+        for table, table_fields in json_data["_fields"].items()
+        for f in table_fields
+        if f in fields or f.split(".")[0] in fields or any(f.startswith(field + "_") for field in fields)
+    }
+
+    # Add tables referenced from the JSON-data of the needed tables
+    references = list(needed)
+    while references:
+        table_json = json_data.get(references.pop())
+        if not isinstance(table_json, dict):
+            continue
+        for value in table_json.values():
+            if isinstance(value, str) and value in all_tables and value not in needed:
+                needed.add(value)
+                references.append(value)
+
+    return {t: dtype for t, dtype in all_tables.items() if t in needed}
@@ -15,7 +15,7 @@ import numpy as np
 from midgard.dev import console
 
 from where.data.table import Table
-from where.ext import sofa
+from where.ext import sofa_wrapper as sofa
 from where.lib import cache
 from where.lib import config
 from where.lib import constant
@@ -436,12 +436,7 @@ class PositionTable(Table):
         Returns:
             numpy.ndarray: Geodetic coordinates (latitude in radians, longitude in radians, height in meters)
         """
-        llh = np.empty((self.num_obs, 3))
-        for obs, itrs in enumerate(self.itrs):
-            longitude, latitude, height, _ = sofa.iau_gc2gd(self._ref_ellipsoid, itrs[:3])
-            llh[obs, :] = (latitude, longitude, height)
-
-        return llh
+        return sofa.vectorized_llh(self.itrs, ref_ellipsoid=self._ref_ellipsoid)
 
     @cache.dependent_property.pos.other.time
     @lib_unit.register("meter")
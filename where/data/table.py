@@ -182,6 +182,20 @@ class Table(object):
             "'{}' class has not implemented method '{}'" "".format(class_name, method_name)
         ) from None
 
+    def unique(self, field, idx):
+        """List unique values in one field
+
+        This method is called from Dataset.unique.
+
+        Args:
+            field:  String, name of field.
+            idx:    Array of booleans with shape (num_obs, ). Only observations where idx is True are considered.
+
+        Returns:
+            List of sorted unique values. The value type depends on the table.
+        """
+        return sorted(set(self[field][idx]))
+
     def plot_values(self, field):
         """Return values of a field in a form that can be plotted
 
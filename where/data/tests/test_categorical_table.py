@@ -0,0 +1,44 @@
+""" Test :mod:`where.data.categorical_table`.
+
+-------
+
+
+"""
+
+# Standard library imports
+from datetime import datetime
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where import data
+
+
+class TestCategoricalTable(unittest.TestCase):
+    def setUp(self):
+        rundate = datetime(2016, 3, 1)
+        self.dset = data.Dataset(rundate, tech=None, stage=None, dataset_name="test_where", dataset_id=0, empty=True)
+        self.dset.num_obs = 5
+        self.dset.add_categorical("station", val=["WETTZELL", "NYALES20", "WETTZELL", "ONSALA60", "NYALES20"])
+
+    def test_values(self):
+        np.testing.assert_equal(self.dset.station, ["WETTZELL", "NYALES20", "WETTZELL", "ONSALA60", "NYALES20"])
+        with self.assertRaises(ValueError):
+            self.dset.station[0] = "ONSALA60"
+
+    def test_filter_and_unique(self):
+        np.testing.assert_equal(self.dset.filter(station="NYALES20"), [False, True, False, False, True])
+        np.testing.assert_equal(self.dset.filter(station="KOKEE"), [False] * 5)
+        self.assertEqual(self.dset.unique("station"), ["NYALES20", "ONSALA60", "WETTZELL"])
+
+    def test_subset_and_extend(self):
+        other = data.Dataset.anonymous(num_obs=2)
+        other.add_categorical("station", val=["KOKEE", "WETTZELL"])
+        self.dset.subset(np.array([True, True, False, False, False]))
+        self.dset.extend(other)
+
+        np.testing.assert_equal(self.dset.station, ["WETTZELL", "NYALES20", "KOKEE", "WETTZELL"])
+        self.assertEqual(self.dset.unique("station"), ["KOKEE", "NYALES20", "WETTZELL"])
+        np.testing.assert_equal(self.dset.filter(station="WETTZELL"), [True, False, False, True])
@@ -0,0 +1,134 @@
+""" Test :mod:`where.data.dataset`.
+
+The datasets are written to a temporary work directory.
+
+"""
+
+# Standard library imports
+from datetime import date
+import json
+import shutil
+import tempfile
+import unittest
+
+# External library imports
+import h5py
+import numpy as np
+
+# Where imports
+from where.data.dataset import Dataset
+from where.lib import config
+from where.lib.exceptions import MissingDataError
+from where.lib import files
+
+RUNDATE = date(2018, 1, 2)
+FILE_VARS = dict(user="test", id="", use_options=False)
+
+
+def _dataset(dataset_name, value, empty=True, **kwargs):
+    """Dataset with one text and one float field"""
+    dset = Dataset(RUNDATE, "vlbi", "test", dataset_name, 0, empty=empty, session="", **FILE_VARS, **kwargs)
+    if empty:
+        dset.num_obs = 3
+        dset.add_text("station", val=["NYALES20", "ONSALA60", "WETTZELL"])
+        dset.add_float("value", val=np.full(3, value))
+    return dset
+
+
+def _move_to_index(dset):
+    """Move the data of a dataset into the index-file and the common HDF5-file, like older versions of Where"""
+    file_vars = dset._file_vars()
+    json_path = files.path("dataset_id_json", file_vars=file_vars)
+    hdf5_path = files.path("dataset_id_hdf5", file_vars=file_vars)
+    index_path = files.path("dataset_json", file_vars=dset.vars)
+    with open(json_path) as fid:
+        json_data = json.load(fid)
+    for key in ("_fields", "_write_id"):
+        del json_data[key]
+    with open(index_path) as fid:
+        json_all = json.load(fid)
+    json_all[dset.name] = json_data
+    with open(index_path, mode="w") as fid:
+        json.dump(json_all, fid)
+
+    with h5py.File(hdf5_path, mode="r") as f_id, h5py.File(files.path("dataset_hdf5", file_vars=dset.vars), "a") as f:
+        f_id.copy(dset.name, f, name=dset.name)
+        del f[dset.name].attrs["write_id"]
+    json_path.unlink()
+    hdf5_path.unlink()
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        config.files.update_vars(dict(path_work=self.work_dir))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        config.set_file_vars()
+
+    def test_per_dataset_layout(self):
+        dset_a, dset_b = _dataset("XA", 1), _dataset("XB", 2)
+        dset_a.write()
+        dset_b.write()
+
+        with open(files.path("dataset_json", file_vars=dset_a.vars)) as fid:
+            json_all = json.load(fid)
+        self.assertEqual(set(json_all), {"XA", "XA/0000", "XB", "XB/0000"})
+        self.assertNotIn("_tables", json_all["XA/0000"])
+        self.assertEqual(json_all["XA/0000"]["_num_obs"], 3)
+        for dset in (dset_a, dset_b):
+            self.assertTrue(files.path("dataset_id_json", file_vars=dset._file_vars()).exists())
+            self.assertTrue(files.path("dataset_id_hdf5", file_vars=dset._file_vars()).exists())
+        self.assertFalse(files.path("dataset_hdf5", file_vars=dset_a.vars).exists())
+
+        np.testing.assert_equal(_dataset("XA", None, empty=False).value, [1, 1, 1])
+        np.testing.assert_equal(_dataset("XB", None, empty=False).value, [2, 2, 2])
+
+    def test_legacy_layout(self):
+        for dataset_name, value in (("XA", 1), ("XB", 2)):
+            dset = _dataset(dataset_name, value)
+            dset.write()
+            _move_to_index(dset)
+
+        for dataset_name, value in (("XA", 1), ("XB", 2)):
+            dset = _dataset(dataset_name, None, empty=False)
+            self.assertEqual(dset.num_obs, 3)
+            np.testing.assert_equal(dset.station, ["NYALES20", "ONSALA60", "WETTZELL"])
+            np.testing.assert_equal(dset.value, [value] * 3)
+
+        # Datasets stored in the old layout are kept when another dataset is written to the stage
+        _dataset("XC", 3).write()
+        np.testing.assert_equal(_dataset("XA", None, empty=False).value, [1, 1, 1])
+        np.testing.assert_equal(_dataset("XC", None, empty=False).value, [3, 3, 3])
+
+    def test_lazy_tables(self):
+        _dataset("XA", 1).write()
+
+        dset = _dataset("XA", None, empty=False)
+        self.assertEqual(dset.fields, ["station", "value"])
+        self.assertEqual(set(dset.data._pending), set(dset.data))
+
+        np.testing.assert_equal(dset.value, [1, 1, 1])
+        self.assertNotIn(dset._fields["value"], dset.data._pending)
+        self.assertIn(dset._fields["station"], dset.data._pending)
+
+    def test_fields(self):
+        _dataset("XA", 1).write()
+
+        dset = _dataset("XA", None, empty=False, fields=["value"])
+        self.assertEqual(dset.fields, ["value"])
+        self.assertEqual(list(dset.data), [dset._fields["value"]])
+        np.testing.assert_equal(dset.value, [1, 1, 1])
+
+    def test_write_id(self):
+        _dataset("XA", 1).write()
+        dset = _dataset("XA", None, empty=False)
+        _dataset("XA", 2).write()
+
+        with self.assertRaises(MissingDataError):
+            dset.value
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+""" Test :mod:`where.data.timeseries`.
+
+The timeseries are written to a temporary work directory. A timeseries stored as one dataset by older versions of
+Where is mixed with sessions upserted to the yearly partitions.
+
+"""
+
+# Standard library imports
+from datetime import date
+import json
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+
+# External library imports
+import h5py
+import numpy as np
+
+# Where imports
+from where.data import timeseries
+from where.data.dataset import Dataset
+from where.lib import config
+from where.lib import files
+
+FILE_VARS = dict(user="test", id="", use_options=False)
+
+
+def _session(rundate, session, value):
+    """Timeseries rows of one session, with the fields added by the timeseries writer"""
+    dset = Dataset.anonymous(num_obs=2)
+    dset.add_text("rundate", val=[rundate.strftime(config.FMT_date)] * 2)
+    dset.add_text("session", val=[session] * 2)
+    dset.add_float("value", val=np.full(2, value))
+    return dset
+
+
+def _write_legacy(sessions):
+    """Write a timeseries the way older versions of Where did, as one dataset stored in the index-file"""
+    dset = Dataset(timeseries.RUNDATE, "vlbi", timeseries.STAGE, "ts", 0, empty=True, session="", **FILE_VARS)
+    for rundate, session, value in sessions:
+        dset_session = _session(rundate, session, value)
+        if dset.num_obs:
+            dset.extend(dset_session)
+        else:
+            dset.copy_from(dset_session)
+    dset.write()
+
+    # Move the data of the dataset into the index-file and the common HDF5-file
+    file_vars = dset._file_vars()
+    json_path = files.path("dataset_id_json", file_vars=file_vars)
+    hdf5_path = files.path("dataset_id_hdf5", file_vars=file_vars)
+    index_path = files.path("dataset_json", file_vars=dset.vars)
+    with open(json_path) as fid:
+        json_data = json.load(fid)
+    for key in ("_fields", "_write_id"):
+        del json_data[key]
+    with open(index_path) as fid:
+        json_all = json.load(fid)
+    json_all[dset.name] = json_data
+    with open(index_path, mode="w") as fid:
+        json.dump(json_all, fid)
+
+    with h5py.File(hdf5_path, mode="r") as f_id, h5py.File(files.path("dataset_hdf5", file_vars=dset.vars), "w") as f:
+        f_id.copy(dset.name, f, name=dset.name)
+        del f[dset.name].attrs["write_id"]
+    json_path.unlink()
+    hdf5_path.unlink()
+
+
+class TestTimeseries(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        config.files.update_vars(dict(path_work=self.work_dir))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        config.set_file_vars()
+
+    def _upsert(self, rundate, session, value):
+        timeseries.upsert(_session(rundate, session, value), rundate, session, "vlbi", "ts", 0, **FILE_VARS)
+
+    def _read(self, **kwargs):
+        return timeseries.read("vlbi", "ts", 0, **FILE_VARS, **kwargs)
+
+    def test_partitioned(self):
+        self._upsert(date(2018, 1, 2), "XA", 1)
+        self._upsert(date(2017, 1, 2), "XA", 2)
+        self._upsert(date(2018, 1, 2), "XA", 3)
+
+        dset = self._read()
+        np.testing.assert_equal(dset["rundate"], ["2017-01-02"] * 2 + ["2018-01-02"] * 2)
+        np.testing.assert_equal(dset.value, [2, 2, 3, 3])
+        self.assertEqual(timeseries.years("vlbi", **FILE_VARS), [2017, 2018])
+        self.assertEqual(timeseries.list_datasets("vlbi", **FILE_VARS), ["ts/0000"])
+
+    def test_legacy(self):
+        _write_legacy([(date(2017, 1, 2), "XA", 1), (date(2017, 1, 3), "XB", 2)])
+
+        dset = self._read()
+        np.testing.assert_equal(dset["session"], ["XA", "XA", "XB", "XB"])
+        np.testing.assert_equal(dset.value, [1, 1, 2, 2])
+
+    def test_legacy_and_partitioned(self):
+        _write_legacy([(date(2017, 1, 2), "XA", 1), (date(2017, 1, 3), "XB", 2), (date(2017, 1, 3), "XC", 3)])
+        self._upsert(date(2017, 1, 3), "XB", 4)
+        self._upsert(date(2018, 1, 2), "XA", 5)
+
+        dset = self._read()
+        np.testing.assert_equal(dset["rundate"], ["2017-01-02"] * 2 + ["2017-01-03"] * 4 + ["2018-01-02"] * 2)
+        np.testing.assert_equal(dset["session"], ["XA", "XA", "XC", "XC", "XB", "XB", "XA", "XA"])
+        np.testing.assert_equal(dset.value, [1, 1, 3, 3, 4, 4, 5, 5])
+
+        dset = self._read(start=date(2017, 1, 3), end=date(2017, 12, 31), fields=["value"])
+        np.testing.assert_equal(dset["session"], ["XC", "XC", "XB", "XB"])
+        np.testing.assert_equal(dset.value, [3, 3, 4, 4])
+
+    def test_concurrent_upsert(self):
+        processes = [
+            multiprocessing.get_context("fork").Process(target=self._upsert, args=(date(2018, 1, day), "XA", day))
+            for day in range(1, 29)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        np.testing.assert_equal(self._read().value, np.repeat(np.arange(1, 29), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
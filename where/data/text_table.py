@@ -77,7 +77,8 @@ class TextTable(Table):
     def read(self, json_data, hdf5_data):
         """Read a text table from file
 
-        The text data are read from the appropriate dict in the JSON-file.
+        The text data are read from the HDF5-file, see `write` for details. Datasets written by older versions of Where
+        have the text data stored in the appropriate dict in the JSON-file instead.
 
         Args:
             json_data:  Dict, data read from JSON-file.
@@ -87,21 +88,34 @@ class TextTable(Table):
             List of strings with all field names read from file.
         """
         super().read(json_data, hdf5_data)
-        self._data = {f: np.array(d, dtype=str) for f, d in json_data[self.name].items()}
+        if self.name in hdf5_data:
+            self._data = {
+                f: np.array([c.decode("utf-8") for c in g["categories"]], dtype=str)[g["codes"][...]]
+                for f, g in hdf5_data[self.name].items()
+            }
+        else:
+            self._data = {f: np.array(d, dtype=str) for f, d in json_data[self.name].items()}
         self._fields = sorted(self._data)
 
     def write(self, json_data, hdf5_data, write_level=None):
         """Write a text table to file
 
-        The text data dict is simply stored as a dict in the JSON-file.
-
-        TODO: Store text data in HDF5-file
+        Each text field is stored dictionary-encoded in its own group in the HDF5-file: The unique values of the field
+        are stored as fixed-width UTF-8 strings in `categories`, while `codes` is an integer array with the index of
+        the value of each observation in `categories`.
 
         Args:
             json_data:  Dict, data to be stored in JSON-file.
             hdf5_data:  HDF5 dataset, data to be stored in HDF5-file.
         """
-        json_data[self.name] = {f: self._data[f].tolist() for f in self.get_fields(write_level)}
+        json_data.pop(self.name, None)  # Remove text data stored in JSON-file by older versions of Where
+        table_group = hdf5_data.create_group(self.name)
+        for field in self.get_fields(write_level):
+            categories, codes = np.unique(self._data[field], return_inverse=True)
+            field_group = table_group.create_group(field)
+            encoded = np.array([c.encode("utf-8") for c in categories], dtype=bytes)
+            field_group.create_dataset("categories", data=encoded)
+            field_group.create_dataset("codes", data=codes.astype(np.min_scalar_type(len(categories))))
 
     def copy_from(self, other_table):
         """Copy data from another text table
@@ -154,6 +168,18 @@ class TextTable(Table):
         """
         return self._data[field] == filter_value
 
+    def unique(self, field, idx):
+        """List unique values in one field
+
+        Args:
+            field:  String, name of field.
+            idx:    Array of booleans with shape (num_obs, ). Only observations where idx is True are considered.
+
+        Returns:
+            List of strings, sorted unique values.
+        """
+        return np.unique(self._data[field][idx]).tolist()
+
     def plot_values(self, field):
         """Return values of a field in a form that can be plotted
 
@@ -163,9 +189,7 @@ class TextTable(Table):
         Returns:
             Numpy-array that can be plotted by for instance matplotlib.
         """
-        values = super().plot_values(field)
-        unique_values = sorted(set(values))
-        return np.array([unique_values.index(v) + 1 for v in values])
+        return np.unique(super().plot_values(field), return_inverse=True)[1] + 1
 
     def as_dict(self, use_plot_values=False, fields=None):
         """Return a representation of the table as a dict
@@ -0,0 +1,221 @@
+"""A timeseries of key indicators from many model runs, partitioned by year
+
+Description:
+------------
+
+The timeseries is stored as one small dataset for each rundate and session, named `<name>_<yyyymmdd>_<session>`. The
+datasets are stored in one file per year, using the stage `timeseries_<yyyy>` and the dummy-date of January 1st 1970.
+Adding or updating the data of one session thus only rewrites the data of that session, and reading a range of
+dates only opens the files of the years in the range.
+
+Timeseries written by older versions of Where are stored as one dataset with the stage `timeseries`. These rows are
+still read, before the partitioned data, except for the rundates and sessions that have since been upserted.
+
+Example:
+--------
+
+    from where.data import timeseries
+    timeseries.upsert(dset_session, rundate, session, tech="vlbi", dataset_name="vlbi", dataset_id=0)
+    dset_ts = timeseries.read("vlbi", dataset_name="vlbi", dataset_id=0, start=date(2018, 1, 1))
+
+"""
+
+# Standard library imports
+from datetime import date, datetime
+import json
+import re
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.data.dataset import Dataset
+from where.lib import config
+from where.lib import files
+from where.lib import log
+
+STAGE = "timeseries"
+RUNDATE = date(1970, 1, 1)
+
+# Session datasets are named <dataset_name>_<yyyymmdd>_<session>/<dataset_id:04d>
+_SESSION_RE = re.compile(r"^(?P<name>.+)_(?P<date>\d{8})_(?P<session>[^/]*)/(?P<id>\d{4})$")
+
+
+def upsert(dset_session, rundate, session, tech, dataset_name, dataset_id, **file_vars):
+    """Add or replace the data of one session in the timeseries
+
+    Args:
+        dset_session (Dataset):  Data for the given rundate and session.
+        rundate (Date):          The model run date.
+        session (String):        Name of the session.
+        tech (String):           The technique.
+        dataset_name (String):   Name of the timeseries.
+        dataset_id (Int):        Id of the timeseries.
+        file_vars:               Other variables used to find the timeseries files (optional).
+    """
+    file_vars = dict(file_vars, session="")
+    stage = _partition_stage(rundate.year)
+    name = _session_name(dataset_name, rundate, session)
+    dset = Dataset(RUNDATE, tech, stage, name, dataset_id, empty=True, **file_vars)
+    dset.copy_from(dset_session)
+    dset.write()
+
+
+def read(tech, dataset_name, dataset_id, start=None, end=None, fields=None, **file_vars):
+    """Read the timeseries for a range of dates into one dataset
+
+    Args:
+        tech (String):          The technique.
+        dataset_name (String):  Name of the timeseries.
+        dataset_id (Int):       Id of the timeseries.
+        start (Date):           First rundate to read (optional, default is the start of the timeseries).
+        end (Date):             Last rundate to read (optional, default is the end of the timeseries).
+        fields (List):          Names of fields to read (optional, default is to read all fields).
+        file_vars:              Other variables used to find the timeseries files (optional).
+
+    Returns:
+        Dataset: The timeseries. Rows stored by older versions of Where come first, then the partitioned data sorted by
+                 rundate and session.
+    """
+    file_vars = dict(file_vars, session="")
+    if fields is not None:
+        fields = list(fields) + ["rundate", "session"]
+
+    dsets, upserted = list(), set()
+    for year in years(tech, **file_vars):
+        for name, rundate, session in _list_sessions(tech, year, dataset_name, dataset_id, **file_vars):
+            upserted.add((rundate.strftime(config.FMT_date), session))
+            if (start and rundate < start) or (end and rundate > end):
+                continue
+            dsets.append(
+                Dataset(RUNDATE, tech, _partition_stage(year), name, dataset_id, fields=fields, **file_vars)
+            )
+
+    # Add rows from a timeseries stored as one dataset, except the sessions that have since been upserted
+    dset_legacy = _read_legacy(tech, dataset_name, dataset_id, start, end, upserted, **file_vars)
+    if dset_legacy.num_obs or not dsets:
+        if dsets:
+            for field in [f for f in dset_legacy.fields if dset_legacy._fields[f] not in dsets[0].data]:
+                del dset_legacy[field]
+        dsets.insert(0, dset_legacy)
+
+    # Extend datasets pairwise, so that each observation is only copied about log2(number of sessions) times
+    log.debug("Combining {} sessions into timeseries {}/{:04d}", len(dsets), dataset_name, dataset_id)
+    while len(dsets) > 1:
+        for dset, other in zip(dsets[::2], dsets[1::2]):
+            dset.extend(other)
+        dsets = dsets[::2]
+
+    dset_ts = dsets[0]
+    dset_ts.rename(stage=STAGE, dataset_name=dataset_name, dataset_id=dataset_id, session="")
+    return dset_ts
+
+
+def years(tech, **file_vars):
+    """List years with timeseries data
+
+    Args:
+        tech (String):  The technique.
+        file_vars:      Other variables used to find the timeseries files (optional).
+
+    Returns:
+        List of ints with the years that have timeseries data stored.
+    """
+    file_vars = _file_vars(tech, **file_vars)
+    stages = files.glob_variable("dataset_json", "stage", STAGE + "_[0-9]+", file_vars=file_vars)
+    return sorted(int(s[len(STAGE) + 1 :]) for s in stages)
+
+
+def list_datasets(tech, **file_vars):
+    """List the timeseries that have data stored
+
+    Args:
+        tech (String):  The technique.
+        file_vars:      Other variables used to find the timeseries files (optional).
+
+    Returns:
+        List of strings with names and ids of timeseries on the form `<dataset_name>/<dataset_id:04d>`.
+    """
+    datasets = set()
+    for year in years(tech, **file_vars):
+        for key in _read_keys(tech, year, **file_vars):
+            match = _SESSION_RE.match(key)
+            if match:
+                datasets.add("{}/{}".format(match.group("name"), match.group("id")))
+
+    return sorted(datasets)
+
+
+def _partition_stage(year):
+    """Stage used for the timeseries datasets of one year"""
+    return "{}_{:04d}".format(STAGE, year)
+
+
+def _session_name(dataset_name, rundate, session):
+    """Name of the timeseries dataset of one session"""
+    return "{}_{:%Y%m%d}_{}".format(dataset_name, rundate, session)
+
+
+def _file_vars(tech, **file_vars):
+    """Variables used to find the timeseries files"""
+    file_vars = dict(file_vars, session="")
+    use_options = file_vars.pop("use_options", True)
+    return dict(
+        config.program_vars(RUNDATE, tech, use_options=use_options, **file_vars), **config.date_vars(RUNDATE)
+    )
+
+
+def _read_legacy(tech, dataset_name, dataset_id, start, end, upserted, **file_vars):
+    """Read the rows of a timeseries stored as one dataset by older versions of Where
+
+    Args:
+        tech (String):          The technique.
+        dataset_name (String):  Name of the timeseries.
+        dataset_id (Int):       Id of the timeseries.
+        start (Date):           First rundate to read, or None.
+        end (Date):             Last rundate to read, or None.
+        upserted (Set):         Tuples of rundate-strings and sessions stored in the partitions, which are skipped.
+        file_vars:              Other variables used to find the timeseries files.
+
+    Returns:
+        Dataset: The rows of the old timeseries, possibly empty.
+    """
+    dset = Dataset(RUNDATE, tech, STAGE, dataset_name, dataset_id, **file_vars)
+    if not dset.num_obs:
+        return dset
+
+    rundates, sessions = np.asarray(dset["rundate"]), np.asarray(dset["session"])
+    keep_idx = np.array([(r, s) not in upserted for r, s in zip(rundates, sessions)], dtype=bool)
+    if start:
+        keep_idx &= rundates >= start.strftime(config.FMT_date)
+    if end:
+        keep_idx &= rundates <= end.strftime(config.FMT_date)
+    dset.subset(keep_idx)
+    return dset
+
+
+def _read_keys(tech, year, **file_vars):
+    """List the keys in the JSON-file of the timeseries datasets of one year"""
+    file_vars = dict(_file_vars(tech, **file_vars), stage=_partition_stage(year))
+    json_path = files.path("dataset_json", file_vars=file_vars)
+    try:
+        with files.open_path(json_path, mode="rt", write_log=False) as f_json:
+            return list(json.load(f_json))
+    except FileNotFoundError:
+        return list()
+
+
+def _list_sessions(tech, year, dataset_name, dataset_id, **file_vars):
+    """List the session datasets of one timeseries stored for one year
+
+    Returns:
+        List of 3-tuples with dataset name, rundate and session, sorted by rundate and session.
+    """
+    sessions = list()
+    for key in _read_keys(tech, year, **file_vars):
+        match = _SESSION_RE.match(key)
+        if match and match.group("name") == dataset_name and int(match.group("id")) == dataset_id:
+            rundate = datetime.strptime(match.group("date"), "%Y%m%d").date()
+            sessions.append((key.split("/")[0], rundate, match.group("session")))
+
+    return sorted(sessions, key=lambda s: s[1:])
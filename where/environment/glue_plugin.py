@@ -251,7 +251,7 @@ class DD_User(DropdownPicker):
     def update(self):
         """Read users from the file directories
         """
-        users = files.glob_variable("dataset_hdf5", "user", r"[a-z]+")
+        users = files.glob_variable("dataset_json", "user", r"[a-z]+")
         simple_update_combobox(self, sorted(users))
 
 
@@ -264,7 +264,7 @@ class DD_Date(DropdownPicker):
         """Read dates from filenames
         """
         vars_ = dict(self.model_vars, user=self.dset_vars["user"])
-        paths = files.glob_paths("dataset_hdf5", file_vars=vars_)
+        paths = files.glob_paths("dataset_json", file_vars=vars_)
         dirs = [os.path.basename(os.path.dirname(p)) for p in paths]
         dates = set()
         for dirname in dirs:
@@ -300,7 +300,7 @@ class DD_Technique(DropdownPicker):
         """Read technique and stage from filenames
         """
         vars_ = {k: v for k, v in self.dset_vars.items() if k not in ("tech", "stage")}
-        paths = files.glob_paths("dataset_hdf5", file_vars=vars_)
+        paths = files.glob_paths("dataset_json", file_vars=vars_)
         simple_update_combobox(
             self, ["{0}/{2}".format(*s) for s in [os.path.basename(p).split("-") for p in sorted(paths)]]
         )
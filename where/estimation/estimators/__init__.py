@@ -33,10 +33,10 @@ def call(config_key, dset, partial_vectors, obs_noise):
     """Call an estimator
 
     Args:
-        config_key (String):     Config key specifying the name of the estimator.
-        dset (Dataset):          Model run data.
-        partial_vectors (Dict):  Names and values of the partial derivatives for each partial config key.
-        obs_noise (Array):       Observation noise, numpy array with one float value for each observation.
+        config_key (String):               Config key specifying the name of the estimator.
+        dset (Dataset):                    Model run data.
+        partial_vectors (PartialVectors):  Names and values of the partial derivatives for each partial config key.
+        obs_noise (Array):                 Observation noise, numpy array with one float value for each observation.
     """
     estimator_name = config.tech[config_key].str
     if estimator_name:
@@ -0,0 +1,256 @@
+"""Batch least squares solution of the continuous piecewise linear state space model
+
+Description:
+------------
+
+Solves the same estimation problem as the Kalman filter and smoother in :mod:`where.estimation.estimators._kalman`
+when the state transition is the continuous piecewise linear (CPWL) model used by the cpwl estimator. Instead of
+walking through the observations one by one, the stochastic parameters are reparametrized as their values at the
+epochs where their rates change (the knots), and the normal equations of all observations are accumulated at once
+using sparse design matrices. The normal equations are solved by a Cholesky decomposition.
+
+Each stochastic parameter x with rate r changes as x(k + 1) = x(k) + r(k) * dt(k), and the rate is a random walk
+which is only updated when a knot interval is passed. In the batch formulation each stochastic parameter is
+represented by its values y_s at the first epoch of each rate segment s, and the rate of the last segment. Between the
+knots the parameter is linearly interpolated. The random walk of the rates is applied as pseudo-observations of the
+differences between the rates of consecutive segments.
+
+The smoothed states of the Kalman filter are the same as the batch least squares solution. The standard deviations
+of the states are however taken from the full covariance matrix of the solution, while the Kalman filter reports the
+standard deviations of the forward filter.
+
+"""
+
+# External library imports
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+
+# Where imports
+from where.estimation.estimators._state_estimator import StateEstimator
+from where.lib import log
+
+
+class BatchLeastSquares(StateEstimator):
+    """Batch least squares estimator for the CPWL state space model
+
+    The results are stored in the same way as for the KalmanFilter, and are added to the dataset by the update_dataset
+    method of StateEstimator.
+
+    Notation (in addition to the notation of the KalmanFilter):
+
+    theta:             Parameters of the batch solution                             # n_theta
+    N:                 Normal matrix                                                # n_theta x n_theta
+    b:                 Normal vector                                                # n_theta
+    """
+
+    def __init__(
+        self,
+        h,
+        time,
+        z=None,
+        apriori_stdev=None,
+        knot_interval=None,
+        process_noise=None,
+        r=None,
+        n_constant=0,
+        param_names=None,
+    ):
+        """Initialize the batch estimator
+
+        The observations are followed by pseudo-observations for constraints. These do not have an observation time,
+        and apply to the state at the last observation.
+
+        Args:
+            h (Sparse matrix):             Partial derivatives               (num_obs x n)
+            time (Numpy array):            Observation time in MJD           (num_obs without pseudo-observations)
+            z (Numpy array):               Observations                      (num_obs)
+            apriori_stdev (Numpy array):   Apriori standard deviation        (n)
+            knot_interval (Numpy array):   Knot interval in days for rates   (n)
+            process_noise (Numpy array):   Process noise for rates           (n)
+            r (Numpy array):               Observation noise covariance      (num_obs)
+            n_constant (Int):              Number of constant parameters.
+            param_names (List):            Strings with names of parameters.
+        """
+        super().__init__(h, z=z, apriori_stdev=apriori_stdev, r=r, param_names=param_names)
+        self.time = time
+        self.num_real_obs = len(time)
+        self.knot_interval = np.ones(self.n) * np.inf if knot_interval is None else knot_interval
+        self.process_noise = np.zeros(self.n) if process_noise is None else process_noise
+        self.n_constant = n_constant
+        self.num_unknowns = self.n
+
+    def filter(self):
+        """Set up and solve the normal equations of all observations
+
+        The name is kept from the KalmanFilter, even though no filtering is done.
+        """
+        num_obs = self.num_real_obs
+        n_constant = self.n_constant
+        stochastic_idx = range(n_constant, self.n, 2)
+
+        # Time in hours since first observation, matching the state transition of the cpwl estimator
+        time_hours = (self.time - self.time[0]) * 24
+
+        # Parametrize the stochastic parameters
+        segments = [self._segments(idx, time_hours) for idx in stochastic_idx]
+        self.num_unknowns = self.n + sum(len(s["first"]) - 1 for s in segments)
+        offsets = np.cumsum([n_constant] + [len(s["first"]) + 1 for s in segments])
+        n_theta = offsets[-1]
+        log.debug(f"Solving batch least squares with {n_theta} parameters for {num_obs} observations")
+
+        # Mapping from parameters, theta, to state vectors at each epoch and rates for each segment
+        states, rates = list(), list()
+        for segment, offset in zip(segments, offsets):
+            states.append(self._state_matrix(segment, time_hours, offset, n_theta))
+            rates.append(self._rate_matrix(segment, offset, n_theta))
+
+        # Design matrix for the observations
+        h = self.h[:num_obs].tocsc()
+        h_const = h[:, :n_constant].tocoo()
+        A = scipy.sparse.csr_matrix((h_const.data, (h_const.row, h_const.col)), shape=(num_obs, n_theta))
+        for idx, state in zip(stochastic_idx, states):
+            A += scipy.sparse.diags(h[:, idx].toarray()[:, 0]) @ state
+
+        # Pseudo-observations for apriori values and process noise of stochastic parameters
+        pseudo_obs, pseudo_weight = list(), list()
+        for idx, state, rate in zip(stochastic_idx, states, rates):
+            pseudo_obs.extend([state[0], rate[0], rate[1:] - rate[:-1]])
+            pseudo_weight.extend(
+                [
+                    [self.apriori_stdev[idx] ** -2],
+                    [self.apriori_stdev[idx + 1] ** -2],
+                    np.full(rate.shape[0] - 1, self.process_noise[idx + 1] ** -2),
+                ]
+            )
+
+        # Normal equations for the observations
+        weight = 1 / self.r[:num_obs]
+        N = (A.T @ scipy.sparse.diags(weight) @ A).toarray()
+        b = A.T @ (weight * self.z[:num_obs])
+        if pseudo_obs:
+            P = scipy.sparse.vstack(pseudo_obs).tocsr()
+            N += (P.T @ scipy.sparse.diags(np.hstack(pseudo_weight)) @ P).toarray()
+
+        # Normal equations for the constant parameters, with the stochastic parameters reduced
+        const, stoch = slice(0, n_constant), slice(n_constant, n_theta)
+        N_cs = N[const, stoch]
+        if n_theta > n_constant:
+            N_ss_cho = scipy.linalg.cho_factor(N[stoch, stoch])
+            self.N = N[const, const] - N_cs @ scipy.linalg.cho_solve(N_ss_cho, N_cs.T)
+            self.b = (b[const] - N_cs @ scipy.linalg.cho_solve(N_ss_cho, b[stoch]))[:, None]
+        else:
+            self.N = N[const, const].copy()
+            self.b = b[const, None].copy()
+
+        # Estimate of constant parameters based on the observations only, as done by the forward Kalman filter
+        const_weight = self.apriori_stdev[:n_constant] ** -2
+        g = np.linalg.solve(self.N + np.diag(const_weight), self.b)
+        self.x_hat[num_obs - 1, :n_constant] = g
+
+        # Apriori values of constant parameters and constraints on the state at the last epoch
+        N[const, const] += np.diag(const_weight)
+        last_state = scipy.sparse.vstack(
+            [scipy.sparse.eye(n_constant, n_theta, format="csr")]
+            + [m for s, r in zip(states, rates) for m in (s[num_obs - 1], r[-1])]
+        )
+        if self.num_obs > num_obs:
+            C = self.h[num_obs:] @ last_state
+            weight = 1 / self.r[num_obs : self.num_obs]
+            N += (C.T @ scipy.sparse.diags(weight) @ C).toarray()
+            b += C.T @ (weight * self.z[num_obs : self.num_obs])
+
+        # Solve normal equations
+        N_cho = scipy.linalg.cho_factor(N)
+        theta = scipy.linalg.cho_solve(N_cho, b)
+        Q_theta = scipy.linalg.cho_solve(N_cho, np.eye(n_theta))
+
+        # Store states and standard deviations, pseudo-observations get the state of the last epoch
+        self.x_smooth[:num_obs, :n_constant, 0] = theta[:n_constant]
+        self.x_hat_ferr[:num_obs, :n_constant] = np.sqrt(np.diag(Q_theta)[:n_constant])
+        for idx, segment, state, rate in zip(stochastic_idx, segments, states, rates):
+            self.x_smooth[:num_obs, idx, 0] = state @ theta
+            self.x_smooth[:num_obs, idx + 1, 0] = (rate @ theta)[segment["idx"]]
+            self.x_hat_ferr[:num_obs, idx] = np.sqrt(_quadratic_diagonal(state, Q_theta))
+            self.x_hat_ferr[:num_obs, idx + 1] = np.sqrt(_quadratic_diagonal(rate, Q_theta))[segment["idx"]]
+        self.x_smooth[num_obs:] = self.x_smooth[num_obs - 1]
+        self.x_hat_ferr[num_obs:] = self.x_hat_ferr[num_obs - 1]
+
+    def _normal_equations(self, normal_idx, last_obs):
+        """Normal equations of the constant parameters with the stochastic parameters reduced
+
+        Args:
+            normal_idx (Slice):  A slice denoting which columns should be used for the normal equations.
+            last_obs (Int):      Index of the last observation.
+
+        Returns:
+            Tuple of Numpy arrays: Normal matrix (n x n) and Normal vector (n x 1).
+        """
+        return self.N[normal_idx, normal_idx], self.b[normal_idx]
+
+    def _segments(self, idx, time_hours):
+        """Find the segments where the rate of a stochastic parameter is constant
+
+        The rate changes at the first observation after a knot interval is passed, as in the cpwl estimator.
+
+        Args:
+            idx (Int):                  Index of stochastic parameter in state vector. The rate has index idx + 1.
+            time_hours (Numpy array):   Time in hours since the first observation.
+
+        Returns:
+            Dict:  Segment index for each epoch (idx), and first epoch (first) and start time (start) of each segment.
+        """
+        num_knots = np.maximum(np.ceil((self.time - self.time[0]) / self.knot_interval[idx + 1]) - 1, 0)
+        if not self.process_noise[idx + 1]:
+            num_knots[:] = 0
+
+        segment_idx = np.concatenate(([0], np.cumsum(np.diff(num_knots) > 0)))
+        first_epoch = np.searchsorted(segment_idx, np.arange(segment_idx[-1] + 1))
+        return dict(idx=segment_idx, first=first_epoch, start=time_hours[first_epoch])
+
+    @staticmethod
+    def _state_matrix(segment, time_hours, offset, n_theta):
+        """Sparse matrix mapping the parameters to the value of a stochastic parameter at each epoch
+
+        The parameters are the values at the start of each segment, followed by the rate in the last segment.
+        """
+        seg_idx = segment["idx"]
+        last_seg = len(segment["first"]) - 1
+        duration = np.diff(segment["start"])
+        tau = time_hours - segment["start"][seg_idx]
+        epochs = np.arange(len(seg_idx))
+
+        is_last = seg_idx == last_seg
+        weight = np.zeros(len(seg_idx))
+        weight[~is_last] = tau[~is_last] / duration[seg_idx[~is_last]]
+        rows = np.concatenate((epochs, epochs))
+        cols = offset + np.concatenate((seg_idx, seg_idx + 1))
+        values = np.concatenate((np.where(is_last, 1, 1 - weight), np.where(is_last, tau, weight)))
+        return scipy.sparse.csr_matrix((values, (rows, cols)), shape=(len(seg_idx), n_theta))
+
+    @staticmethod
+    def _rate_matrix(segment, offset, n_theta):
+        """Sparse matrix mapping the parameters to the rate of a stochastic parameter in each segment"""
+        num_segments = len(segment["first"])
+        duration = np.diff(segment["start"])
+
+        segments = np.arange(num_segments - 1)
+        rows = np.concatenate((segments, segments, [num_segments - 1]))
+        cols = offset + np.concatenate((segments, segments + 1, [num_segments]))
+        values = np.concatenate((-1 / duration, 1 / duration, [1]))
+        return scipy.sparse.csr_matrix((values, (rows, cols)), shape=(num_segments, n_theta))
+
+
+def _quadratic_diagonal(A, Q):
+    """Diagonal of A @ Q @ A.T for a sparse matrix A, without forming the full product
+
+    Args:
+        A (Sparse matrix):   Matrix with few non-zero columns (m x n).
+        Q (Numpy array):     Dense matrix (n x n).
+
+    Returns:
+        Numpy array: Diagonal of A @ Q @ A.T (m).
+    """
+    cols = np.unique(A.indices)
+    A_cols = A[:, cols]
+    return np.asarray(A_cols.multiply(A_cols @ Q[np.ix_(cols, cols)]).sum(axis=1)).ravel()
@@ -0,0 +1,206 @@
+"""Storage of covariance matrices for the Kalman filter
+
+Description:
+------------
+
+The Kalman filter needs the updated estimate covariance (p-hat) of every epoch from the forward pass when running the
+smoother backwards. For big sessions these matrices do not necessarily fit in memory, so they can be stored in one of
+the following ways:
+
+    memory:    All matrices are kept in one Numpy array in memory.
+    hdf5:      All matrices are stored in one chunked HDF5-dataset, read and written in blocks of epochs.
+    memmap:    All matrices are stored in a memory-mapped .npy-file.
+
+The storage is chosen by the `covariance_store` config option. If it is set to `auto`, the matrices are kept in memory
+if they fit inside `covariance_store_max_memory` megabytes, and stored in a HDF5-file otherwise.
+
+The hdf5 and memmap stores use temporary files next to the `output_covariance_matrix` file, which are deleted when the
+store is closed. If the `keep_covariance_file` config option is set, the matrices are written to the
+`output_covariance_matrix` file when the store is closed, with one HDF5-dataset named by the epoch number for each
+epoch and the parameter names in the `labels` attribute, independent of how they were stored.
+
+Example:
+--------
+
+    from where.estimation.estimators import _covariance
+    p_hat_store = _covariance.store(num_obs, n, param_names)
+    p_hat_store[epoch] = p_hat
+    p_hat = p_hat_store[epoch]
+    p_hat_store.close()
+
+"""
+
+# Standard library imports
+import abc
+
+# External library imports
+import numpy as np
+import h5py
+
+# Where imports
+from where.lib import config
+from where.lib import files
+from where.lib import log
+
+# Number of epochs read and written to file at a time
+BLOCK_SIZE = 256
+
+
+def store(num_obs, n, param_names=None):
+    """Create a covariance store as specified in the configuration
+
+    Args:
+        num_obs (Int):         Number of epochs (observations) to store covariance matrices for.
+        n (Int):               Number of parameters, each covariance matrix is n x n.
+        param_names (List):    Strings with names of parameters, stored as labels when writing to file.
+
+    Returns:
+        CovarianceStore: Object storing one n x n covariance matrix for each epoch.
+    """
+    store_type = config.tech.get("covariance_store", default="auto").str
+    if store_type == "auto":
+        max_memory = config.tech.get("covariance_store_max_memory", default=1000).float * 2 ** 20
+        store_type = "memory" if num_obs * n * n * np.dtype(float).itemsize <= max_memory else "hdf5"
+
+    if store_type not in _STORES:
+        log.fatal(f"Unknown covariance store {store_type!r}. Use one of {', '.join(['auto'] + list(_STORES))}")
+
+    log.debug(f"Storing {num_obs} covariance matrices of size {n} x {n} using {store_type!r}")
+    return _STORES[store_type](num_obs, n, param_names)
+
+
+class CovarianceStore(abc.ABC):
+    """Base class for storing one covariance matrix per epoch"""
+
+    def __init__(self, num_obs, n, param_names=None):
+        self.num_obs = num_obs
+        self.n = n
+        self.param_names = param_names if param_names else []
+        self.file_path = files.path("output_covariance_matrix")
+
+    @abc.abstractmethod
+    def __setitem__(self, epoch, data):
+        """Store the covariance matrix of one epoch"""
+
+    @abc.abstractmethod
+    def __getitem__(self, epoch):
+        """Get the covariance matrix of one epoch"""
+
+    def close(self, keep_file=False):
+        """Release the storage
+
+        Subclasses release their own storage after calling this method.
+
+        Args:
+            keep_file (Boolean):   Whether to write the covariance matrices to the output_covariance_matrix file.
+        """
+        if keep_file:
+            self._write_file()
+
+    def _write_file(self):
+        """Write all covariance matrices to the output_covariance_matrix file, one HDF5-dataset per epoch"""
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with h5py.File(self.file_path, "w") as p_hat_file:
+            p_hat_file.attrs["labels"] = ", ".join(self.param_names)
+            for epoch in range(self.num_obs):
+                p_hat_file.create_dataset(str(epoch), data=self[epoch])
+
+
+class MemoryStore(CovarianceStore):
+    """Keep all covariance matrices in memory"""
+
+    def __init__(self, num_obs, n, param_names=None):
+        super().__init__(num_obs, n, param_names)
+        self.data = np.empty((num_obs, n, n))
+
+    def __setitem__(self, epoch, data):
+        self.data[epoch] = data
+
+    def __getitem__(self, epoch):
+        return self.data[epoch]
+
+    def close(self, keep_file=False):
+        super().close(keep_file)
+        self.data = None
+
+
+class Hdf5Store(CovarianceStore):
+    """Store covariance matrices in one chunked HDF5-dataset
+
+    The temporary file is kept open while the filter runs, and matrices are buffered and written or read one block of
+    epochs at a time.
+    """
+
+    def __init__(self, num_obs, n, param_names=None):
+        super().__init__(num_obs, n, param_names)
+        self.store_path = self.file_path.with_name(f"{self.file_path.stem}_store.hdf5")
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = h5py.File(self.store_path, "w")
+        self._dataset = self._file.create_dataset(
+            "p_hat", shape=(num_obs, n, n), dtype=float, chunks=(min(BLOCK_SIZE, max(num_obs, 1)), n, n)
+        )
+        self._block = np.empty((BLOCK_SIZE, n, n))
+        self._block_idx = None
+        self._block_dirty = False
+
+    def __setitem__(self, epoch, data):
+        self._load_block(epoch // BLOCK_SIZE)
+        self._block[epoch % BLOCK_SIZE] = data
+        self._block_dirty = True
+
+    def __getitem__(self, epoch):
+        self._load_block(epoch // BLOCK_SIZE)
+        return self._block[epoch % BLOCK_SIZE].copy()
+
+    def close(self, keep_file=False):
+        self._flush()
+        super().close(keep_file)
+        self._file.close()
+        files.delete_file(self.store_path)
+
+    def _load_block(self, block_idx):
+        """Make sure the given block of epochs is available in the buffer"""
+        if block_idx == self._block_idx:
+            return
+
+        self._flush()
+        start, end = self._block_limits(block_idx)
+        self._dataset.read_direct(self._block, np.s_[start:end], np.s_[: end - start])
+        self._block_idx = block_idx
+
+    def _flush(self):
+        """Write the buffered block of epochs to file"""
+        if not self._block_dirty:
+            return
+
+        start, end = self._block_limits(self._block_idx)
+        self._dataset.write_direct(self._block, np.s_[: end - start], np.s_[start:end])
+        self._block_dirty = False
+
+    def _block_limits(self, block_idx):
+        start = block_idx * BLOCK_SIZE
+        return start, min(start + BLOCK_SIZE, self.num_obs)
+
+
+class MemmapStore(CovarianceStore):
+    """Store covariance matrices in a temporary memory-mapped .npy-file"""
+
+    def __init__(self, num_obs, n, param_names=None):
+        super().__init__(num_obs, n, param_names)
+        self.store_path = self.file_path.with_name(f"{self.file_path.stem}_store.npy")
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self.data = np.lib.format.open_memmap(self.store_path, mode="w+", dtype=float, shape=(num_obs, n, n))
+
+    def __setitem__(self, epoch, data):
+        self.data[epoch] = data
+
+    def __getitem__(self, epoch):
+        return np.array(self.data[epoch])
+
+    def close(self, keep_file=False):
+        super().close(keep_file)
+        self.data = None
+        files.delete_file(self.store_path)
+
+
+_STORES = dict(memory=MemoryStore, hdf5=Hdf5Store, memmap=MemmapStore)
@@ -0,0 +1,177 @@
+"""Common set up for the Continuous PieceWise Linear estimators
+
+Description:
+------------
+
+Organizes partial derivatives and reads information about parameters and constraints from the configuration. Used
+both by the Kalman filter based :mod:`where.estimation.estimators.cpwl` and the batch least squares based
+:mod:`where.estimation.estimators.cpwl_batch` estimators.
+
+"""
+
+# External library imports
+import numpy as np
+import scipy.sparse
+
+# Where imports
+from where import apriori
+from where.lib import config
+from where.lib import log
+from where.lib.unit import unit
+
+
+def setup_parameters(dset, partial_vectors):
+    """Organize partial derivatives and read information about the parameters from the config files
+
+    Constant parameters are placed first in the state vector. Each stochastic parameter is followed by a rate parameter
+    which is not added to the dataset.
+
+    Args:
+        dset (Dataset):                    Model run data.
+        partial_vectors (PartialVectors):  Names and values of the partial derivatives for each partial config key.
+
+    Returns:
+        Tuple: Sparse matrix of partial derivatives (num_obs x n), parameter names, number of constant parameters,
+               names of constant parameters, apriori standard deviations, knot intervals and process noise (n each).
+    """
+    # Organize partial derivatives (state vectors) into a sparse matrix
+    n_constant = len(partial_vectors["estimate_constant"])
+    n_stochastic = len(partial_vectors["estimate_stochastic"])
+    n = n_constant + 2 * n_stochastic
+    param_names = list(partial_vectors["estimate_constant"])
+
+    # Stochastic parameters are estimated as CPWL functions by adding a rate parameter after each of them
+    for name in partial_vectors["estimate_stochastic"]:
+        param_names.extend([name, name + "_rate_"])  # Trailing underscore in rate_ means field is not added to dset
+    to_cpwl = scipy.sparse.csr_matrix(
+        (np.ones(n_stochastic), (np.arange(n_stochastic), 2 * np.arange(n_stochastic))),
+        shape=(n_stochastic, n - n_constant),
+    )
+    h = scipy.sparse.hstack(
+        (partial_vectors.matrix("estimate_constant"), partial_vectors.matrix("estimate_stochastic") @ to_cpwl),
+        format="csr",
+    )
+
+    # Read information about parameters from config files
+    knot_interval = np.ones(n) * np.inf
+    process_noise = np.zeros(n)
+    apriori_stdev = np.empty(n)
+
+    constant_params = {c.split("-")[0] for c in partial_vectors["estimate_constant"]}
+    for param in constant_params:
+        idx = np.array([c.startswith(param + "-") for c in param_names])
+        apriori_stdev[idx] = config.tech[param].apriori_stdev.float
+
+    stochastic_params = {c.split("-")[0] for c in partial_vectors["estimate_stochastic"]}
+    for param in stochastic_params:
+        # Set default knot_interval
+        intervals = config.tech[param].knot_interval.list
+        const_idx = np.array([c.startswith(param + "-") for c in param_names])
+        rate_idx = np.array([c.startswith(param + "-") and c.endswith("rate_") for c in param_names])
+
+        knot_interval[rate_idx] = float(intervals.pop(0)) * unit.seconds2day
+        for interval in intervals:
+            # (Potentially) overwrite with station specific knot_interval
+            sta, _, seconds = interval.partition(":")
+            rate_idx_sta = np.array(
+                [c.startswith(param + "-") and c.endswith("rate_") and sta in c for c in param_names]
+            )
+            knot_interval[rate_idx_sta] = float(seconds) * unit.seconds2day
+        process_noise[rate_idx] = config.tech[param].process_noise.float
+
+        apriori_stdev[const_idx] = config.tech[param].apriori_stdev.float
+        apriori_stdev[rate_idx] = config.tech[param].apriori_rate_stdev.float  # Rate parameters
+
+    return h, param_names, n_constant, constant_params, apriori_stdev, knot_interval, process_noise
+
+
+def add_constraints(dset, param_names, constant_params, h, z, obs_noise):
+    """Add pseudo-observations for the constraints given in the config files
+
+    Args:
+        dset (Dataset):          Model run data.
+        param_names (List):      Strings with names of parameters.
+        constant_params (Set):   Names of constant parameters.
+        h (Sparse matrix):       Partial derivatives (num_obs x n).
+        z (Numpy array):         Observed residuals (num_obs).
+        obs_noise (Array):       Observation noise (num_obs).
+
+    Returns:
+        Tuple: Partial derivatives, observed residuals and observation noise with the pseudo-observations added, and
+               the number of pseudo-observations.
+    """
+    constraints = config.tech.get(key="estimate_constraint", default="").as_list(split_re=", *")
+    if not constraints:
+        return h, z, obs_noise, 0
+
+    n = len(param_names)
+    trf_constraints = [c for c in constraints if "crf" not in c]
+    reference_frame = config.tech.reference_frames.list[0]
+    trf = apriori.get("trf", time=dset.time.utc.mean, reference_frames=reference_frame)
+    d = np.zeros((n, 6))
+    stations = set()
+
+    for idx, column in enumerate(param_names):
+        if "_site_pos-" not in column:
+            continue
+        station = column.split("-", maxsplit=1)[-1].rsplit("_", maxsplit=1)[0]
+        key = dset.meta[station]["site_id"]
+        if key in trf:
+            x0, y0, z0 = trf[key].pos.itrs  # TODO: Take units into account
+            if column.endswith("_x"):
+                d[idx, :] = np.array([1, 0, 0, 0, z0, -y0])
+            if column.endswith("_y"):
+                d[idx, :] = np.array([0, 1, 0, -z0, 0, x0])
+            if column.endswith("_z"):
+                d[idx, :] = np.array([0, 0, 1, y0, -x0, 0])
+            stations.add(station)
+
+    # TODO deal with slr_site_pos etc
+    log.info(
+        "Applying {} with {} from {}", "/".join(trf_constraints).upper(), ", ".join(stations), reference_frame.upper()
+    )
+    if "nnt" in constraints and "nnr" in constraints and "vlbi_site_pos" in constant_params:
+        obs_noise = np.hstack((obs_noise, np.array([.0001 ** 2] * 3 + [(1.5e-11) ** 2] * 3))).T
+    elif "nnt" in constraints and "nnr" not in constraints and "vlbi_site_pos" in constant_params:
+        d = d[:, 0:3]
+        obs_noise = np.hstack((obs_noise, np.array([.0001 ** 2] * 3))).T
+    elif "nnt" not in constraints and "nnr" in constraints and "vlbi_site_pos" in constant_params:
+        d = d[:, 3:6]
+        obs_noise = np.hstack((obs_noise, np.array([(1.5e-11) ** 2] * 3))).T
+    elif "nnt" not in constraints and "nnr" not in constraints and "vlbi_site_pos" in constant_params:
+        d = np.zeros((n, 0))
+        log.warn("Unknown constraints {}. Not applying.", "/".join(constraints).upper())
+
+    num_constraints = d.shape[1]
+    try:
+        h = scipy.sparse.vstack((h, np.linalg.inv(d.T @ d) @ d.T), format="csr")
+    except np.linalg.linalg.LinAlgError:
+        pass
+
+    if "nnr_crf" in constraints and "vlbi_src_dir" in constant_params:
+        celestial_reference_frame = config.tech.celestial_reference_frames.list[0]
+        crf = apriori.get("crf", celestial_reference_frames=celestial_reference_frame, session=dset.dataset_name)
+        # NNR to CRF
+        log.info("Applying NNR constraint to {}", celestial_reference_frame.upper())
+        H2 = np.zeros((3, n))
+        for idx, column in enumerate(param_names):
+            if "_src_dir-" not in column:
+                continue
+            source = column.split("-", maxsplit=1)[-1].split("_")[0]
+            if source in crf:
+                ra = crf[source].pos.crs[0]
+                dec = crf[source].pos.crs[1]
+                if column.endswith("_ra"):
+                    H2[0, idx] = -np.cos(ra) * np.sin(dec) * np.cos(dec)
+                    H2[1, idx] = -np.sin(ra) * np.sin(dec) * np.cos(dec)
+                    H2[2, idx] = np.cos(dec) ** 2
+                if column.endswith("_dec"):
+                    H2[0, idx] = np.sin(ra)
+                    H2[1, idx] = -np.cos(ra)
+
+        obs_noise = np.hstack((obs_noise, np.array([(1e-6) ** 2] * 3)))
+        num_constraints += 3
+        h = scipy.sparse.vstack((h, H2), format="csr")
+
+    z = np.hstack((z, np.zeros(num_constraints))).T
+    return h, z, obs_noise, num_constraints
@@ -11,16 +11,14 @@ algorithm is listed in :cite:`gibbs2011`.
 
 # External library imports
 import numpy as np
-import h5py
 
 # Where imports
-from where.lib.unit import unit
-from where.lib import log
+from where.estimation.estimators import _covariance
+from where.estimation.estimators._state_estimator import StateEstimator
 from where.lib import config
-from where.lib import files
 
 
-class KalmanFilter(object):
+class KalmanFilter(StateEstimator):
     """A general Kalman filter
 
     See for instance https://en.wikipedia.org/wiki/Kalman_filter#Details for information about a general Kalman
@@ -29,7 +27,7 @@ class KalmanFilter(object):
 
     Notation:
 
-    h:                 Partial derivatives                                          # num_obs x n x 1
+    h:                 Partial derivatives                                          # num_obs x n (sparse)
     x:                 Predicted state estimate (x-tilde)                           # num_obs x n x 1
     x_hat:             Updated state estimate (x-hat)                               # num_obs x n x 1
     sigma:             Residual covariance                                          # num_obs
@@ -50,29 +48,18 @@ class KalmanFilter(object):
         """Initialize the Kalman filter
 
         Args:
-            h (Numpy array):               Partial derivatives          (num_obs x n x 1)
+            h (Sparse matrix):             Partial derivatives          (num_obs x n) or dense (num_obs x n x 1)
             z (Numpy array):               Observations                 (num_obs)
             apriori_stdev (Numpy array):   Apriori standard deviation   (n)
             phi (Numpy array):             State transition             (num_obs x n x n)
             r (Numpy array):               Observation noise covariance (num_obs)
             Q (Numpy array):               Process noise covariance     (num_obs x n x n)
+            param_names (List):            Strings with names of parameters.
         """
-        self.h = h
-        self.num_obs, self.n, _ = self.h.shape
-        self.apriori_stdev = np.ones(self.n) if apriori_stdev is None else apriori_stdev
-
-        self.z = np.zeros((self.num_obs)) if z is None else z
+        super().__init__(h, z=z, apriori_stdev=apriori_stdev, r=r, param_names=param_names)
         self.phi = np.eye(self.n).repeat(self.num_obs).reshape(self.n, self.n, -1).T if phi is None else phi
-        self.r = np.ones((self.num_obs)) if r is None else r
         self.Q = dict() if Q is None else Q
-        self.x_hat = np.zeros((self.num_obs, self.n, 1))
-        self.x_hat_ferr = np.zeros((self.num_obs, self.n))
-        self.x_smooth = np.zeros((self.num_obs, self.n, 1))
-        self.param_names = param_names if param_names else []
-        self.p_hat_file_path = files.path("output_covariance_matrix")
-
-        with h5py.File(self.p_hat_file_path, "w") as p_hat_file:
-            p_hat_file.attrs["labels"] = ", ".join(self.param_names)
+        self.p_hat = _covariance.store(self.num_obs, self.n, self.param_names)
 
     def filter(self):
         """Run the Kalman filter forward and backward
@@ -86,7 +73,7 @@ class KalmanFilter(object):
         lam = np.zeros((self.n, 1))
 
         # Makes calculations easier to read (and gives a slight speed-up)
-        h = self.h
+        h_ptr, h_idx, h_val = self.h.indptr, self.h.indices, self.h.data
         z = self.z
         phi = self.phi
         r = self.r
@@ -94,15 +81,19 @@ class KalmanFilter(object):
         x_hat = self.x_hat
         x_hat_ferr = self.x_hat_ferr
         x_smooth = self.x_smooth
-        I = np.eye(self.n)
 
-        # Run filter forward over all observations
+        # Run filter forward over all observations, only using the non-zero partial derivatives
         for epoch in range(self.num_obs):
-            innovation[epoch] = z[epoch] - h[epoch].T @ x_tilde
-            sigma[epoch] = (h[epoch].T @ p_tilde @ h[epoch]) + r[epoch]
-            k[epoch] = p_tilde @ h[epoch] / sigma[epoch]
+            idx = h_idx[h_ptr[epoch] : h_ptr[epoch + 1]]
+            h_epoch = h_val[h_ptr[epoch] : h_ptr[epoch + 1]]
+            p_h = p_tilde[:, idx] @ h_epoch
+            h_p = h_epoch @ p_tilde[idx, :]
+
+            innovation[epoch] = z[epoch] - h_epoch @ x_tilde[idx, 0]
+            sigma[epoch] = h_epoch @ p_h[idx] + r[epoch]
+            k[epoch, :, 0] = p_h / sigma[epoch]
             x_hat[epoch] = x_tilde + k[epoch] * innovation[epoch]
-            p_hat = (I - k[epoch] @ h[epoch].T) @ p_tilde
+            p_hat = p_tilde - k[epoch] @ h_p[None, :]
 
             x_tilde = phi[epoch] @ x_hat[epoch]
             p_tilde = phi[epoch] @ p_hat @ phi[epoch].T
@@ -113,230 +104,21 @@ class KalmanFilter(object):
             self.x_hat_ferr[epoch, :] = np.sqrt(np.diagonal(p_hat))
 
         # Run smoother backwards over all observations
+        h_epoch = np.zeros((self.n, 1))
         for epoch in range(self.num_obs - 1, -1, -1):
             # TODO smooth covariance matrix
             p_hat = self._get_p_hat(epoch)
             x_smooth[epoch] = x_hat[epoch] + p_hat.T @ lam
+            h_epoch[:] = 0
+            h_epoch[h_idx[h_ptr[epoch] : h_ptr[epoch + 1]], 0] = h_val[h_ptr[epoch] : h_ptr[epoch + 1]]
             lam = (
-                phi[epoch - 1].T @ h[epoch] * innovation[epoch] / sigma[epoch]
-                + phi[epoch - 1].T @ (I - k[epoch] @ h[epoch].T).T @ lam
+                phi[epoch - 1].T @ h_epoch * innovation[epoch] / sigma[epoch]
+                + phi[epoch - 1].T @ (lam - h_epoch * (k[epoch].T @ lam))
             )
 
-    def update_dataset(self, dset, param_names, normal_idx, num_unknowns):
-        """Update the given dataset with results from the filtering
-
-        Args:
-            dset (Dataset):       The dataset.
-            param_names (List):   Strings with names of parameters. Used to form field names.
-            normal_idx (Slice):   Slice denoting which parameters should be used for the normal equations.
-            num_unknowns (Int):   Number of unknowns.
-        """
-        # Update dataset with state and estimation fields and calculate new residuals
-        self._add_fields(dset, param_names)
-        dset.residual[:] = dset.estimate - (dset.obs - dset.calc)
-        num_unknowns += dset.meta.get("num_clock_coeff", 0)
-
-        # Calculate normal equations, and add statistics about estimation to dataset
-        N, b = self._normal_equations(normal_idx, dset.num_obs - 1)
-        g = self.x_hat[dset.num_obs - 1, normal_idx, :]
-        deg_freedom = dset.num_obs - num_unknowns
-        v = dset.residual[:, None]
-        P = np.diag(1 / self.r[: dset.num_obs])
-        sq_sum_residuals = np.asscalar(v.T @ P @ v)
-        sq_sum_omc_terms = np.asscalar(2 * b.T @ g - g.T @ N @ g)
-        variance_factor = sq_sum_residuals / deg_freedom if deg_freedom != 0 else np.inf
-        log.info("Variance factor = {:.4f}, degrees of freedom = {:d}", variance_factor, deg_freedom)
-
-        # Report and set analysis status if there are too few degrees of freedom
-        if deg_freedom < 1:
-            log.error(f"Degrees of freedom is {deg_freedom} < 1. Estimate fewer parameters")
-            if dset.meta.get("analysis_status") == "unchecked":
-                dset.meta["analysis_status"] = "too few degrees of freedom"
-
-                # Update config
-                # with config.update_tech_config(dset.rundate, dset.vars["tech"], dset.vars["session"]) as cfg:
-                # cfg.update("analysis_status", "status", dset.meta["analysis_status"], source=__file__)
-        else:
-            if dset.meta.get("analysis_status") == "too few degrees of freedom":
-                dset.meta["analysis_status"] = "unchecked"
-
-                # Update config
-                # with config.update_tech_config(dset.rundate, dset.vars["tech"], dset.vars["session"]) as cfg:
-                # cfg.update("analysis_status", "status", dset.meta["analysis_status"], source=__file__)
-
-        # Report and set analysis status if there are too few stations
-        # TODO: if vlbi_site_pos in state_vector and num_stations < 3
-        estimate_site_pos = np.char.startswith(np.array(param_names), "vlbi_site_pos").any()
-        if len(dset.unique("station")) < 3 and estimate_site_pos:
-            log.error(f"Too few stations {len(dset.unique('station'))} < 3. Do not estimate station positions.")
-            if dset.meta.get("analysis_status") == "unchecked":
-                dset.meta["analysis_status"] = "needs custom state vector"
-        elif len(dset.unique("station")) < 3 and estimate_site_pos:
-            if dset.meta.get("analysis_status") == "needs custom state vector":
-                dset.meta["analysis_status"] = "unchecked"
-        # Update config
-        with config.update_tech_config(dset.rundate, dset.vars["tech"], dset.vars["session"]) as cfg:
-            cfg.update("analysis_status", "status", dset.meta.get("analysis_status", ""), source=__file__)
-
-        # Add information to dset.meta
-        dset.add_to_meta("statistics", "number of observations", dset.num_obs)
-        dset.add_to_meta("statistics", "number of unknowns", num_unknowns)
-        dset.add_to_meta("statistics", "square sum of residuals", sq_sum_residuals)
-        dset.add_to_meta("statistics", "degrees of freedom", deg_freedom)
-        dset.add_to_meta("statistics", "variance factor", variance_factor)
-        dset.add_to_meta("statistics", "weighted square sum of o-c", sq_sum_residuals + sq_sum_omc_terms)
-        dset.add_to_meta("normal equation", "matrix", N.tolist())
-        dset.add_to_meta("normal equation", "vector", b[:, 0].tolist())
-        dset.add_to_meta("normal equation", "names", param_names[normal_idx])
-        dset.add_to_meta(
-            "normal equation", "unit", [config.tech[f.split("-")[0]].unit.str for f in param_names[normal_idx]]
-        )
-
-        # TODO should this be here?
-        log.info("Solving normal equations")
-        names = dset.meta["normal equation"]["names"]
-        n = len(names)
-        d = np.zeros((n, 6))
-        stations = set()
-        reference_frame = config.tech.reference_frames.list[0]
-
-        from where import apriori
-
-        trf = apriori.get("trf", time=dset.time.utc.mean, reference_frames=reference_frame)
-
-        # thaller2008: eq 2.51 (skipping scale factor)
-        for idx, column in enumerate(names):
-            if "_site_pos-" not in column:
-                continue
-            station = column.split("-", maxsplit=1)[-1].rsplit("_", maxsplit=1)[0]
-            site_id = dset.meta[station]["site_id"]
-            if site_id in trf:
-                x0, y0, z0 = trf[site_id].pos.itrs  # TODO: Take units into account
-                if column.endswith("_x"):
-                    d[idx, :] = np.array([1, 0, 0, 0, z0, -y0])
-                if column.endswith("_y"):
-                    d[idx, :] = np.array([0, 1, 0, -z0, 0, x0])
-                if column.endswith("_z"):
-                    d[idx, :] = np.array([0, 0, 1, y0, -x0, 0])
-                stations.add(station)
-
-        log.info("Applying NNT/NNR with {} from {}", ", ".join(stations), reference_frame.upper())
-        # thaller2008: eq 2.57
-        try:
-            H = np.linalg.inv(d.T @ d) @ d.T
-        except np.linalg.LinAlgError:
-            H = np.zeros((6, n))
-
-        sigmas = [0.0001] * 3 + [1.5e-11] * 3
-
-        # NNR to CRF
-        if "celestial_reference_frames" in config.tech.master_section:
-            celestial_reference_frame = config.tech.celestial_reference_frames.list[0]
-            crf = apriori.get("crf", celestial_reference_frames=celestial_reference_frame, session=dset.dataset_name)
-            H2 = np.zeros((3, n))
-            for idx, column in enumerate(names):
-                if "_src_dir-" not in column:
-                    continue
-                source = column.split("-", maxsplit=1)[-1].split("_")[0]
-                if source in crf:
-                    ra = crf[source].pos.crs[0]
-                    dec = crf[source].pos.crs[1]
-                    if column.endswith("_ra"):
-                        H2[0, idx] = -np.cos(ra) * np.sin(dec) * np.cos(dec)
-                        H2[1, idx] = -np.sin(ra) * np.sin(dec) * np.cos(dec)
-                        H2[2, idx] = np.cos(dec) ** 2
-                    if column.endswith("_dec"):
-                        H2[0, idx] = np.sin(ra)
-                        H2[1, idx] = -np.cos(ra)
-
-            if H2.any():
-                log.info("Applying NNR constraint to {}", celestial_reference_frame.upper())
-                # add NNR to CRF constraints
-                H = np.concatenate((H, H2))
-                sigmas = sigmas + [1e-6] * 3
-
-        # thaller2008: eq 2.45
-        P_h = np.diag(1 / np.array(sigmas) ** 2)
-
-        # thaller2008: eq 2.58
-        N_h = N + H.T @ P_h @ H
-
-        # solve neq
-        N_h_inv = np.linalg.inv(N_h)
-        x = N_h_inv @ b
-
-        # Covariance: thaller2008: eq 2.16
-        Q_xx = variance_factor ** 2 * N_h_inv
-
-        dset.add_to_meta("normal equation", "solution", x[:, 0].tolist())
-        dset.add_to_meta("normal equation", "covariance", Q_xx.tolist())
-
     def cleanup(self):
-        if not config.tech.keep_covariance_file.bool:
-            files.delete_file(self.p_hat_file_path)
-
-    def _add_fields(self, dset, param_names):
-        """Add fields to the given dataset
-
-        Adds fields for state vectors and estimate vectors for each parameter. Parameters with names ending with an
-        underscore, `_`, are not added to the dataset.
-
-        Args:
-            dset (Dataset):       The dataset.
-            param_names (List):   Strings with names of parameters. Used to form field names.
-
-        """
-        for idx, param_name in enumerate(param_names):
-            if param_name.endswith("_"):
-                continue
-
-            # State vectors
-            fieldname = "{}_{}".format("state", param_name)
-            fieldname_sigma = fieldname + "_sigma"
-            value = self.x_smooth[: dset.num_obs, idx, 0]
-            value_sigma = np.sqrt(self.x_hat_ferr[: dset.num_obs, idx])
-
-            if fieldname in dset.fields:
-                dset[fieldname][:] = value * dset.meta["display_factors"][param_name]
-            else:
-                # Convert values to the display unit. It corresponds to "meter per <unit of partial>"
-                partial_unit = dset.unit("partial_{}".format(param_name))
-                display_unit = dset.meta["display_units"][param_name]
-                factor = unit("meter / ({})".format(partial_unit), display_unit)
-                dset.add_to_meta("display_factors", param_name, factor)
-                dset.add_float(
-                    fieldname, table="state", val=value * factor, unit=display_unit, write_level="operational"
-                )
-
-            if fieldname_sigma in dset.fields:
-                dset[fieldname_sigma][:] = value_sigma * dset.meta["display_factors"][param_name]
-            else:
-                # Convert values to the display unit. It corresponds to "meter per <unit of partial>"
-                partial_unit = dset.unit("partial_{}".format(param_name))
-                display_unit = dset.meta["display_units"][param_name]
-                factor = unit("meter / ({})".format(partial_unit), display_unit)
-                dset.add_to_meta("display_factors", param_name, factor)
-                dset.add_float(
-                    fieldname_sigma,
-                    table="state",
-                    val=value_sigma * factor,
-                    unit=display_unit,
-                    write_level="operational",
-                )
-
-            # Estimate vectors
-            fieldname = "{}_{}".format("estimate", param_name)
-            value = self.h[: dset.num_obs, idx, 0] * self.x_smooth[: dset.num_obs, idx, 0]
-            if fieldname in dset.fields:
-                dset[fieldname][:] = value
-            else:
-                dset.add_float(fieldname, table="estimate", val=value, unit="meter", write_level="analysis")
-
-        value = (self.x_smooth.transpose(0, 2, 1) @ self.h)[: dset.num_obs, 0, 0]
-        if "estimate" in dset.fields:
-            dset.estimate[:] = value
-        else:
-            dset.add_float("estimate", val=value, unit="meter", write_level="operational")
+        """Close the storage of the covariance matrices"""
+        self.p_hat.close(keep_file=config.tech.keep_covariance_file.bool)
 
     def _normal_equations(self, normal_idx, last_obs):
         """Calculate normal equations corresponding to the filter results
@@ -364,12 +146,12 @@ class KalmanFilter(object):
         if False:
             stat_idx = slice(normal_idx.stop, self.n, None)
             R = np.diag(self.r[: last_obs + 1])
-            H_L = self.h[: last_obs + 1, stat_idx, 0]
+            H_L = self.h[: last_obs + 1, stat_idx].toarray()
             c_L = p_tilde_0[stat_idx, stat_idx]
             R_tilde = H_L @ c_L @ H_L.T + R
             R_tilde_inv = np.linalg.inv(R_tilde)
 
-            H_g = self.h[: last_obs + 1, normal_idx, 0]
+            H_g = self.h[: last_obs + 1, normal_idx].toarray()
 
             NN = H_g.T @ R_tilde_inv @ H_g
             bb = H_g.T @ R_tilde_inv @ self.z[: last_obs + 1]
@@ -385,9 +167,7 @@ class KalmanFilter(object):
         return N, b
 
     def _set_p_hat(self, epoch, data):
-        with h5py.File(self.p_hat_file_path) as p_hat_file:
-            p_hat_file.create_dataset(str(epoch), data=data)
+        self.p_hat[epoch] = data
 
     def _get_p_hat(self, epoch):
-        with h5py.File(self.p_hat_file_path) as p_hat_file:
-            return p_hat_file[str(epoch)][...]
+        return self.p_hat[epoch]
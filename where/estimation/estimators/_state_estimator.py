@@ -0,0 +1,288 @@
+"""Common base for estimators of state vectors
+
+Description:
+------------
+
+The Kalman filter in :mod:`where.estimation.estimators._kalman` and the batch least squares estimator in
+:mod:`where.estimation.estimators._batch` both estimate a state vector for each observation. This module contains the
+storage of the state vectors and the updating of the dataset with the results, which are common to both.
+
+"""
+
+# Standard library imports
+import abc
+
+# External library imports
+import numpy as np
+import scipy.sparse
+
+# Where imports
+from where.lib.unit import unit
+from where.lib import log
+from where.lib import config
+
+
+class StateEstimator(abc.ABC):
+    """Base class for estimators of one state vector per observation
+
+    Notation:
+
+    h:                 Partial derivatives                                          # num_obs x n (sparse)
+    z:                 Observed residual                                            # num_obs
+    r:                 Observation noise covariance                                 # num_obs
+    x_hat:             Updated state estimate (x-hat)                               # num_obs x n x 1
+    x_hat_ferr:        Standard deviation of the state estimate                     # num_obs x n
+    x_smooth:          Smoothed state estimates                                     # num_obs x n x 1
+    """
+
+    def __init__(self, h, z=None, apriori_stdev=None, r=None, param_names=None):
+        """Initialize the estimator
+
+        Args:
+            h (Sparse matrix):             Partial derivatives          (num_obs x n) or dense (num_obs x n x 1)
+            z (Numpy array):               Observations                 (num_obs)
+            apriori_stdev (Numpy array):   Apriori standard deviation   (n)
+            r (Numpy array):               Observation noise covariance (num_obs)
+            param_names (List):            Strings with names of parameters.
+        """
+        self.h = scipy.sparse.csr_matrix(h[:, :, 0] if isinstance(h, np.ndarray) else h)
+        self.num_obs, self.n = self.h.shape
+        self.apriori_stdev = np.ones(self.n) if apriori_stdev is None else apriori_stdev
+
+        self.z = np.zeros((self.num_obs)) if z is None else z
+        self.r = np.ones((self.num_obs)) if r is None else r
+        self.x_hat = np.zeros((self.num_obs, self.n, 1))
+        self.x_hat_ferr = np.zeros((self.num_obs, self.n))
+        self.x_smooth = np.zeros((self.num_obs, self.n, 1))
+        self.param_names = param_names if param_names else []
+
+    @abc.abstractmethod
+    def filter(self):
+        """Estimate the state vectors x_hat, x_hat_ferr and x_smooth"""
+
+    def cleanup(self):
+        """Release resources used by the estimator"""
+        pass
+
+    def update_dataset(self, dset, param_names, normal_idx, num_unknowns):
+        """Update the given dataset with results from the filtering
+
+        Args:
+            dset (Dataset):       The dataset.
+            param_names (List):   Strings with names of parameters. Used to form field names.
+            normal_idx (Slice):   Slice denoting which parameters should be used for the normal equations.
+            num_unknowns (Int):   Number of unknowns.
+        """
+        # Update dataset with state and estimation fields and calculate new residuals
+        self._add_fields(dset, param_names)
+        dset.residual[:] = dset.estimate - (dset.obs - dset.calc)
+        num_unknowns += dset.meta.get("num_clock_coeff", 0)
+
+        # Calculate normal equations, and add statistics about estimation to dataset
+        N, b = self._normal_equations(normal_idx, dset.num_obs - 1)
+        g = self.x_hat[dset.num_obs - 1, normal_idx, :]
+        deg_freedom = dset.num_obs - num_unknowns
+        sq_sum_residuals = np.sum(dset.residual ** 2 / self.r[: dset.num_obs])
+        sq_sum_omc_terms = (2 * b.T @ g - g.T @ N @ g).item()
+        variance_factor = sq_sum_residuals / deg_freedom if deg_freedom != 0 else np.inf
+        log.info("Variance factor = {:.4f}, degrees of freedom = {:d}", variance_factor, deg_freedom)
+
+        # Report and set analysis status if there are too few degrees of freedom
+        if deg_freedom < 1:
+            log.error(f"Degrees of freedom is {deg_freedom} < 1. Estimate fewer parameters")
+            if dset.meta.get("analysis_status") == "unchecked":
+                dset.meta["analysis_status"] = "too few degrees of freedom"
+
+                # Update config
+                # with config.update_tech_config(dset.rundate, dset.vars["tech"], dset.vars["session"]) as cfg:
+                # cfg.update("analysis_status", "status", dset.meta["analysis_status"], source=__file__)
+        else:
+            if dset.meta.get("analysis_status") == "too few degrees of freedom":
+                dset.meta["analysis_status"] = "unchecked"
+
+                # Update config
+                # with config.update_tech_config(dset.rundate, dset.vars["tech"], dset.vars["session"]) as cfg:
+                # cfg.update("analysis_status", "status", dset.meta["analysis_status"], source=__file__)
+
+        # Report and set analysis status if there are too few stations
+        # TODO: if vlbi_site_pos in state_vector and num_stations < 3
+        estimate_site_pos = np.char.startswith(np.array(param_names), "vlbi_site_pos").any()
+        if len(dset.unique("station")) < 3 and estimate_site_pos:
+            log.error(f"Too few stations {len(dset.unique('station'))} < 3. Do not estimate station positions.")
+            if dset.meta.get("analysis_status") == "unchecked":
+                dset.meta["analysis_status"] = "needs custom state vector"
+        elif len(dset.unique("station")) < 3 and estimate_site_pos:
+            if dset.meta.get("analysis_status") == "needs custom state vector":
+                dset.meta["analysis_status"] = "unchecked"
+        # Update config
+        with config.update_tech_config(dset.rundate, dset.vars["tech"], dset.vars["session"]) as cfg:
+            cfg.update("analysis_status", "status", dset.meta.get("analysis_status", ""), source=__file__)
+
+        # Add information to dset.meta
+        dset.add_to_meta("statistics", "number of observations", dset.num_obs)
+        dset.add_to_meta("statistics", "number of unknowns", num_unknowns)
+        dset.add_to_meta("statistics", "square sum of residuals", sq_sum_residuals)
+        dset.add_to_meta("statistics", "degrees of freedom", deg_freedom)
+        dset.add_to_meta("statistics", "variance factor", variance_factor)
+        dset.add_to_meta("statistics", "weighted square sum of o-c", sq_sum_residuals + sq_sum_omc_terms)
+        dset.add_to_meta("normal equation", "matrix", N.tolist())
+        dset.add_to_meta("normal equation", "vector", b[:, 0].tolist())
+        dset.add_to_meta("normal equation", "names", param_names[normal_idx])
+        dset.add_to_meta(
+            "normal equation", "unit", [config.tech[f.split("-")[0]].unit.str for f in param_names[normal_idx]]
+        )
+
+        # TODO should this be here?
+        log.info("Solving normal equations")
+        names = dset.meta["normal equation"]["names"]
+        n = len(names)
+        d = np.zeros((n, 6))
+        stations = set()
+        reference_frame = config.tech.reference_frames.list[0]
+
+        from where import apriori
+
+        trf = apriori.get("trf", time=dset.time.utc.mean, reference_frames=reference_frame)
+
+        # thaller2008: eq 2.51 (skipping scale factor)
+        for idx, column in enumerate(names):
+            if "_site_pos-" not in column:
+                continue
+            station = column.split("-", maxsplit=1)[-1].rsplit("_", maxsplit=1)[0]
+            site_id = dset.meta[station]["site_id"]
+            if site_id in trf:
+                x0, y0, z0 = trf[site_id].pos.itrs  # TODO: Take units into account
+                if column.endswith("_x"):
+                    d[idx, :] = np.array([1, 0, 0, 0, z0, -y0])
+                if column.endswith("_y"):
+                    d[idx, :] = np.array([0, 1, 0, -z0, 0, x0])
+                if column.endswith("_z"):
+                    d[idx, :] = np.array([0, 0, 1, y0, -x0, 0])
+                stations.add(station)
+
+        log.info("Applying NNT/NNR with {} from {}", ", ".join(stations), reference_frame.upper())
+        # thaller2008: eq 2.57
+        try:
+            H = np.linalg.inv(d.T @ d) @ d.T
+        except np.linalg.LinAlgError:
+            H = np.zeros((6, n))
+
+        sigmas = [0.0001] * 3 + [1.5e-11] * 3
+
+        # NNR to CRF
+        if "celestial_reference_frames" in config.tech.master_section:
+            celestial_reference_frame = config.tech.celestial_reference_frames.list[0]
+            crf = apriori.get("crf", celestial_reference_frames=celestial_reference_frame, session=dset.dataset_name)
+            H2 = np.zeros((3, n))
+            for idx, column in enumerate(names):
+                if "_src_dir-" not in column:
+                    continue
+                source = column.split("-", maxsplit=1)[-1].split("_")[0]
+                if source in crf:
+                    ra = crf[source].pos.crs[0]
+                    dec = crf[source].pos.crs[1]
+                    if column.endswith("_ra"):
+                        H2[0, idx] = -np.cos(ra) * np.sin(dec) * np.cos(dec)
+                        H2[1, idx] = -np.sin(ra) * np.sin(dec) * np.cos(dec)
+                        H2[2, idx] = np.cos(dec) ** 2
+                    if column.endswith("_dec"):
+                        H2[0, idx] = np.sin(ra)
+                        H2[1, idx] = -np.cos(ra)
+
+            if H2.any():
+                log.info("Applying NNR constraint to {}", celestial_reference_frame.upper())
+                # add NNR to CRF constraints
+                H = np.concatenate((H, H2))
+                sigmas = sigmas + [1e-6] * 3
+
+        # thaller2008: eq 2.45
+        P_h = np.diag(1 / np.array(sigmas) ** 2)
+
+        # thaller2008: eq 2.58
+        N_h = N + H.T @ P_h @ H
+
+        # solve neq
+        N_h_inv = np.linalg.inv(N_h)
+        x = N_h_inv @ b
+
+        # Covariance: thaller2008: eq 2.16
+        Q_xx = variance_factor ** 2 * N_h_inv
+
+        dset.add_to_meta("normal equation", "solution", x[:, 0].tolist())
+        dset.add_to_meta("normal equation", "covariance", Q_xx.tolist())
+
+    def _add_fields(self, dset, param_names):
+        """Add fields to the given dataset
+
+        Adds fields for state vectors and estimate vectors for each parameter. Parameters with names ending with an
+        underscore, `_`, are not added to the dataset.
+
+        Args:
+            dset (Dataset):       The dataset.
+            param_names (List):   Strings with names of parameters. Used to form field names.
+
+        """
+        h = self.h[: dset.num_obs].tocsc()
+        for idx, param_name in enumerate(param_names):
+            if param_name.endswith("_"):
+                continue
+
+            # State vectors
+            fieldname = "{}_{}".format("state", param_name)
+            fieldname_sigma = fieldname + "_sigma"
+            value = self.x_smooth[: dset.num_obs, idx, 0]
+            value_sigma = np.sqrt(self.x_hat_ferr[: dset.num_obs, idx])
+
+            if fieldname in dset.fields:
+                dset[fieldname][:] = value * dset.meta["display_factors"][param_name]
+            else:
+                # Convert values to the display unit. It corresponds to "meter per <unit of partial>"
+                partial_unit = dset.meta["partial_units"][param_name]
+                display_unit = dset.meta["display_units"][param_name]
+                factor = unit("meter / ({})".format(partial_unit), display_unit)
+                dset.add_to_meta("display_factors", param_name, factor)
+                dset.add_float(
+                    fieldname, table="state", val=value * factor, unit=display_unit, write_level="operational"
+                )
+
+            if fieldname_sigma in dset.fields:
+                dset[fieldname_sigma][:] = value_sigma * dset.meta["display_factors"][param_name]
+            else:
+                # Convert values to the display unit. It corresponds to "meter per <unit of partial>"
+                partial_unit = dset.meta["partial_units"][param_name]
+                display_unit = dset.meta["display_units"][param_name]
+                factor = unit("meter / ({})".format(partial_unit), display_unit)
+                dset.add_to_meta("display_factors", param_name, factor)
+                dset.add_float(
+                    fieldname_sigma,
+                    table="state",
+                    val=value_sigma * factor,
+                    unit=display_unit,
+                    write_level="operational",
+                )
+
+            # Estimate vectors
+            fieldname = "{}_{}".format("estimate", param_name)
+            value = h[:, idx].toarray()[:, 0] * self.x_smooth[: dset.num_obs, idx, 0]
+            if fieldname in dset.fields:
+                dset[fieldname][:] = value
+            else:
+                dset.add_float(fieldname, table="estimate", val=value, unit="meter", write_level="analysis")
+
+        value = np.asarray(h.multiply(self.x_smooth[: dset.num_obs, :, 0]).sum(axis=1))[:, 0]
+        if "estimate" in dset.fields:
+            dset.estimate[:] = value
+        else:
+            dset.add_float("estimate", val=value, unit="meter", write_level="operational")
+
+    @abc.abstractmethod
+    def _normal_equations(self, normal_idx, last_obs):
+        """Normal equations of the parameters given by normal_idx
+
+        Args:
+            normal_idx (Slice):  A slice denoting which columns should be used for the normal equations.
+            last_obs (Int):      Index of the last observation.
+
+        Returns:
+            Tuple of Numpy arrays: Normal matrix (n x n) and Normal vector (n x 1).
+        """
@@ -0,0 +1,65 @@
+"""Continuous PieceWise Linear estimator solved as one batch least squares problem
+
+Description:
+------------
+
+Estimates the same parameters as the :mod:`where.estimation.estimators.cpwl` estimator, but sets up and solves the
+normal equations for all observations at once instead of running a Kalman filter and smoother through the
+observations one by one. Use it by setting `estimate_method = cpwl_batch` in the configuration.
+
+"""
+
+# Where imports
+from where.estimation.estimators import _cpwl
+from where.estimation.estimators._batch import BatchLeastSquares
+from where.lib import plugins
+
+
+@plugins.register_named("partial_config_keys")
+def partial_config_keys():
+    """List the types of partials needed by the estimator
+
+    The CPWL batch estimator uses both constant and stochastic parameters.
+
+    Returns:
+        Tuple: Strings with names of config keys listing which partial models to run.
+    """
+    return ("estimate_constant", "estimate_stochastic")
+
+
+@plugins.register
+def estimate_cpwl_batch(dset, partial_vectors, obs_noise):
+    """Estimate with continuous piecewise linear functions using batch least squares
+
+    Args:
+        dset (Dataset):                    Model run data.
+        partial_vectors (PartialVectors):  Names and values of the partial derivatives for each partial config key.
+        obs_noise (Array):                 Observation noise, numpy array with one float value for each observation.
+    """
+    h, param_names, n_constant, constant_params, apriori_stdev, knot_interval, process_noise = _cpwl.setup_parameters(
+        dset, partial_vectors
+    )
+
+    # Add pseudo-observations
+    z = dset.obs - dset.calc
+    h, z, obs_noise, _ = _cpwl.add_constraints(dset, param_names, constant_params, h, z, obs_noise)
+
+    # Set up and solve the normal equations
+    batch = BatchLeastSquares(
+        h,
+        time=dset.time.utc.mjd,
+        z=z,
+        apriori_stdev=apriori_stdev,
+        knot_interval=knot_interval,
+        process_noise=process_noise,
+        r=obs_noise,
+        n_constant=n_constant,
+        param_names=param_names,
+    )
+    batch.filter()
+
+    # Update the dataset with results from the estimation
+    batch.update_dataset(
+        dset, param_names=param_names, normal_idx=slice(0, n_constant), num_unknowns=batch.num_unknowns
+    )
+    batch.cleanup()
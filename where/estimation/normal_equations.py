@@ -0,0 +1,142 @@
+"""Accumulate normal equations from observation equations
+
+Description:
+------------
+
+The normal equations of a weighted least squares problem with design matrix A, observations z and weights w are
+
+    N = A^T W A,    b = A^T W z,
+
+where W is the diagonal matrix of weights. The :class:`NormalEquations`-class accumulates N and b for batches of
+observations without forming per-observation outer products. Sparse design matrices are multiplied directly, while
+dense design matrices are multiplied in blocks of rows so that BLAS is used without creating large temporary arrays.
+
+Since the normal equations are sums over the observations, observations can also be removed again (downdated). This
+makes it cheap to refit after removing outliers or after changing the parametrization of a few observations.
+
+Example:
+--------
+
+    > neq = NormalEquations(num_params=3)
+    > neq.add(A, residual)
+    > neq.remove(A[outliers], residual[outliers])
+    > x = neq.solve()
+
+"""
+
+# External library imports
+import numpy as np
+import scipy.sparse
+
+# Number of rows of dense design matrices multiplied at a time
+BLOCK_SIZE = 10000
+
+
+class NormalEquations:
+    """Normal equations accumulated from observation equations
+
+    Attributes:
+        N (Numpy array):   Normal matrix                                     (num_params x num_params)
+        b (Numpy array):   Normal vector                                     (num_params)
+        num_obs (Int):     Number of observations currently in the normal equations.
+    """
+
+    def __init__(self, num_params):
+        """Create empty normal equations
+
+        Args:
+            num_params (Int):   Number of parameters.
+        """
+        self.N = np.zeros((num_params, num_params))
+        self.b = np.zeros(num_params)
+        self.num_obs = 0
+
+    @property
+    def num_params(self):
+        return len(self.b)
+
+    def add(self, A, z, weight=None):
+        """Add observation equations to the normal equations
+
+        Args:
+            A (Array or sparse matrix):   Design matrix                               (num_obs x num_params)
+            z (Numpy array):              Observations                                (num_obs)
+            weight (Numpy array):         Optional weight of each observation         (num_obs)
+        """
+        self._accumulate(A, z, weight, sign=1)
+
+    def remove(self, A, z, weight=None):
+        """Remove observation equations previously added to the normal equations
+
+        Args:
+            A (Array or sparse matrix):   Design matrix                               (num_obs x num_params)
+            z (Numpy array):              Observations                                (num_obs)
+            weight (Numpy array):         Optional weight of each observation         (num_obs)
+        """
+        self._accumulate(A, z, weight, sign=-1)
+
+    def replace(self, A_old, A_new, z, weight=None):
+        """Replace the design matrix of observations already in the normal equations
+
+        Useful when the parametrization of a few observations changes, for instance at a clock break.
+
+        Args:
+            A_old (Array or sparse matrix):   Design matrix used when the observations were added.
+            A_new (Array or sparse matrix):   New design matrix of the same observations.
+            z (Numpy array):                  Observations                            (num_obs)
+            weight (Numpy array):             Optional weight of each observation     (num_obs)
+        """
+        self.remove(A_old, z, weight)
+        self.add(A_new, z, weight)
+
+    def set_observations(self, A, z, weight=None):
+        """Recalculate the normal vector for new observations, keeping the normal matrix
+
+        Args:
+            A (Array or sparse matrix):   Design matrix of all observations           (num_obs x num_params)
+            z (Numpy array):              Observations                                (num_obs)
+            weight (Numpy array):         Optional weight of each observation         (num_obs)
+        """
+        wz = z if weight is None else weight * z
+        self.b = np.asarray(A.T @ wz).ravel()
+
+    def solve(self, idx=None):
+        """Solve the normal equations
+
+        Args:
+            idx (Array):   Optional boolean or integer index of parameters to solve for. Other parameters are set to 0.
+
+        Returns:
+            Numpy array: Estimated parameters (num_params).
+        """
+        x = np.zeros(self.num_params)
+        idx = slice(None) if idx is None else idx
+        x[idx] = np.linalg.solve(self.N[idx, :][:, idx], self.b[idx])
+        return x
+
+    def _accumulate(self, A, z, weight, sign):
+        """Add or subtract the contribution of observation equations to the normal equations
+
+        Args:
+            A (Array or sparse matrix):   Design matrix                               (num_obs x num_params)
+            z (Numpy array):              Observations                                (num_obs)
+            weight (Numpy array):         Weight of each observation, or None         (num_obs)
+            sign (Int):                   1 to add observations, -1 to remove them.
+        """
+        num_obs = A.shape[0]
+        weight = np.ones(num_obs) if weight is None else np.asarray(weight)
+
+        if scipy.sparse.issparse(A):
+            A = scipy.sparse.csr_matrix(A)
+            WA = scipy.sparse.diags(weight) @ A
+            self.N += sign * (A.T @ WA).toarray()
+            self.b += sign * np.asarray(WA.T @ z).ravel()
+        else:
+            A = np.asarray(A)
+            for start in range(0, num_obs, BLOCK_SIZE):
+                block = slice(start, start + BLOCK_SIZE)
+                WA = weight[block, None] * A[block]
+                self.N += sign * (A[block].T @ WA)
+                self.b += sign * (WA.T @ z[block])
+
+        self.num_obs += sign * num_obs
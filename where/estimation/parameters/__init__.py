@@ -15,11 +15,19 @@ should be called need to be decorated with the :func:`~where.lib.plugins.registe
 The decorated function will be called with a single parameter, ``dset`` which contains a
 :class:`~where.data.dataset.Dataset` with data that can be used when calculating the partial derivatives.
 
+The partial derivatives are returned as an array with one column for each parameter. Since most partial derivatives
+only depend on a few observations each, the array may also be a sparse matrix from :mod:`scipy.sparse`. The partial
+derivatives are passed on to the estimators as sparse matrices, see :class:`PartialVectors`.
+
 
 
 
 """
 
+# External library imports
+import numpy as np
+import scipy.sparse
+
 # Where imports
 from where.lib import config
 from where.estimation import estimators
@@ -35,18 +43,22 @@ def partial_vectors(dset, estimator_config_key):
     passed a :class:`~where.data.dataset.Dataset` with data for the modelrun and should return a tuple with the partial
     vectors and their names.
 
+    The partial derivatives are only added to the dataset as `partial_*`-fields if the `write_partials` config option
+    is set, as the estimators use the sparse partial derivatives directly.
+
     Args:
         dset (Dataset):                 A Dataset containing model run data.
         estimator_config_key (String):  Key in config file with the name of the estimator.
 
     Returns:
-        Dict: List of names of the partial derivatives for each partial config key.
+        PartialVectors: Names and values of the partial derivatives for each partial config key.
     """
-    partial_vectors = dict()
+    config_keys = estimators.partial_config_keys(estimator_config_key)
+    partial_vectors = PartialVectors(dset.num_obs, config_keys)
     prefix = config.analysis.get("analysis", default="").str
+    write_partials = config.tech.get("write_partials", default=False).bool
 
-    for config_key in estimators.partial_config_keys(estimator_config_key):
-        partial_vectors[config_key] = list()
+    for config_key in config_keys:
         partial_data = plugins.call_all(package_name=__name__, config_key=config_key, prefix=prefix, dset=dset)
 
         for param, (data, names, data_unit) in partial_data.items():
@@ -57,16 +69,89 @@ def partial_vectors(dset, estimator_config_key):
             display_unit = param_unit_cfg.str if not display_unit else display_unit
             partial_unit = str(unit("{} / ({})".format(dset.unit("calc"), param_unit_cfg.str)).u)
             factor = unit(data_unit, partial_unit)
-            for values, name in zip(data.T, names):
-                partial_name = "{}-{}".format(param, name)
-                dset.add_float(
-                    "partial_" + partial_name,
-                    table="partial",
-                    val=values * factor,
-                    unit=partial_unit,
-                    write_level="operational",
-                )
+            partial_names = ["{}-{}".format(param, name) for name in names]
+            partial_vectors.add(config_key, names=partial_names, values=scipy.sparse.csr_matrix(data) * factor)
+
+            for partial_name in partial_names:
                 dset.add_to_meta("display_units", partial_name, display_unit)
-                partial_vectors[config_key].append(partial_name)
+                dset.add_to_meta("partial_units", partial_name, partial_unit)
+            if write_partials:
+                for values, partial_name in zip(_columns(data), partial_names):
+                    dset.add_float(
+                        "partial_" + partial_name,
+                        table="partial",
+                        val=values * factor,
+                        unit=partial_unit,
+                        write_level="operational",
+                    )
 
     return partial_vectors
+
+
+class PartialVectors(dict):
+    """Partial derivatives for each partial config key
+
+    Behaves as a dict with a list of names of the partial derivatives for each partial config key. The partial
+    derivatives themselves are kept as one sparse matrix for each partial config key, with one row for each observation
+    and one column for each name. Use `subset` to keep the rows in step with the dataset when observations are removed.
+    """
+
+    def __init__(self, num_obs, config_keys):
+        """Set up empty partial derivatives for the given config keys
+
+        Args:
+            num_obs (Int):       Number of observations.
+            config_keys (List):  Strings with names of partial config keys.
+        """
+        super().__init__({k: list() for k in config_keys})
+        self.num_obs = num_obs
+        self._values = {k: scipy.sparse.csr_matrix((num_obs, 0)) for k in config_keys}
+
+    def add(self, config_key, names, values):
+        """Add partial derivatives to the given config key
+
+        Args:
+            config_key (String):       Partial config key.
+            names (List):              Names of the partial derivatives.
+            values (Sparse matrix):    Partial derivatives (num_obs x len(names)).
+        """
+        self[config_key].extend(names)
+        self._values[config_key] = scipy.sparse.hstack((self._values[config_key], values), format="csr")
+
+    def matrix(self, config_key):
+        """Partial derivatives of the given config key
+
+        Args:
+            config_key (String):  Partial config key.
+
+        Returns:
+            Sparse matrix: Partial derivatives, one row for each observation and one column for each name.
+        """
+        return self._values[config_key]
+
+    def subset(self, idx):
+        """Remove observations from the partial derivatives
+
+        Args:
+            idx:   Array of booleans with shape (num_obs, ). True means observation is kept, False means removed.
+        """
+        self._values = {k: v[idx] for k, v in self._values.items()}
+        self.num_obs = int(np.sum(idx))
+
+
+def _columns(data):
+    """Iterate over the columns of a dense array or sparse matrix of partial derivatives
+
+    Args:
+        data (Array):  Partial derivatives, either a Numpy array or a scipy.sparse matrix.
+
+    Returns:
+        Generator: Numpy arrays, one for each column of the partial derivatives.
+    """
+    if not scipy.sparse.issparse(data):
+        yield from data.T
+        return
+
+    data = data.tocsc()
+    for idx in range(data.shape[1]):
+        yield data[:, idx].toarray()[:, 0]
@@ -43,7 +43,7 @@ def trop_grad(dset):
     stations = np.asarray(dset.unique("station"))
 
     skip_stations = config.tech.get("skip_stations", section=PARAMETER, default="").list
-    skip_idx = np.in1d(stations, skip_stations)
+    skip_idx = np.isin(stations, skip_stations)
 
     if skip_idx.any():
         stations = stations[np.logical_not(skip_idx)]
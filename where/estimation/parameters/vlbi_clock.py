@@ -19,6 +19,7 @@ References:
 """
 # External library imports
 import numpy as np
+import scipy.sparse
 
 # Where imports
 from where.lib import plugins
@@ -46,14 +47,19 @@ def clock(dset):
     stations = np.asarray(stations)
 
     skip_stations = config.tech.get("skip_stations", section=PARAMETER, default="").list
-    skip_idx = np.in1d(stations, skip_stations)
+    skip_idx = np.isin(stations, skip_stations)
 
     if skip_idx.any():
         stations = stations[np.logical_not(skip_idx)]
 
-    partials = np.zeros((dset.num_obs, len(stations)))
-    for idx, station in enumerate(stations):
-        partials[dset.filter(station_1=station), idx] = -1
-        partials[dset.filter(station_2=station), idx] = 1
+    rows, cols, values = list(), list(), list()
+    for station_field, sign in (("station_1", -1), ("station_2", 1)):
+        obs_idx = np.nonzero(np.isin(dset[station_field], stations))[0]
+        rows.append(obs_idx)
+        cols.append(np.searchsorted(stations, dset[station_field][obs_idx]))
+        values.append(np.full(len(obs_idx), sign, dtype=float))
+    partials = scipy.sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(dset.num_obs, len(stations))
+    )
 
     return partials, stations, "dimensionless"
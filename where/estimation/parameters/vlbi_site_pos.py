@@ -22,6 +22,7 @@ References:
 """
 # External library imports
 import numpy as np
+import scipy.sparse
 
 # Where imports
 from where.lib import plugins
@@ -44,18 +45,22 @@ def site_pos(dset):
     # Remove stations that should be fixed
     stations = np.asarray(dset.unique("station"))
     fix_stations = config.tech[PARAMETER].fix_stations.list
-    fix_idx = np.in1d(stations, fix_stations)
+    fix_idx = np.isin(stations, fix_stations)
     if fix_idx.any():
         stations = stations[np.logical_not(fix_idx)]
 
-    # Calculate partials
+    # Calculate partials, each observation only depends on the two stations of the baseline
     all_partials = -dset.src_dir.unit_vector[:, None, :] @ dset.time.itrs2gcrs
-    partials = np.zeros((dset.num_obs, len(stations) * 3))
-    for idx, station in enumerate(stations):
-        filter_1 = dset.filter(station_1=station)
-        partials[filter_1, idx * 3 : idx * 3 + 3] = all_partials[filter_1][:, 0] * -1
-        filter_2 = dset.filter(station_2=station)
-        partials[filter_2, idx * 3 : idx * 3 + 3] = all_partials[filter_2][:, 0]
+    rows, cols, values = list(), list(), list()
+    for station_field, sign in (("station_1", -1), ("station_2", 1)):
+        obs_idx = np.nonzero(np.isin(dset[station_field], stations))[0]
+        station_idx = np.searchsorted(stations, dset[station_field][obs_idx])
+        rows.append(np.repeat(obs_idx, 3))
+        cols.append((station_idx[:, None] * 3 + np.arange(3)).ravel())
+        values.append(sign * all_partials[obs_idx, 0].ravel())
+    partials = scipy.sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(dset.num_obs, len(stations) * 3)
+    )
 
     column_names = [s + "_" + xyz for s in stations for xyz in "xyz"]
 
@@ -24,6 +24,7 @@ References:
 """
 # External library imports
 import numpy as np
+import scipy.sparse
 
 # Where imports
 from where.lib import plugins
@@ -74,7 +75,6 @@ def src_dir(dset):
     sources = sources[np.logical_not(fix_idx)]
 
     # Calculate partials
-    partials = np.zeros((dset.num_obs, len(sources) * 2))
     zero = np.zeros(dset.num_obs)
 
     cos_ra = np.cos(dset.src_dir.right_ascension)
@@ -87,9 +87,16 @@ def src_dir(dset):
     dK_ddec = np.array([-sin_dec * cos_ra, -sin_dec * sin_ra, cos_dec]).T[:, None, :]
     all_partials = np.hstack((-dK_dra @ baseline, -dK_ddec @ baseline))[:, :, 0]
 
-    for idx, src in enumerate(sources):
-        src_idx = dset.filter(source=src)
-        partials[src_idx, idx * 2 : idx * 2 + 2] = all_partials[src_idx]
+    # Each observation only depends on the coordinates of one source
+    obs_idx = np.nonzero(np.isin(dset.source, sources))[0]
+    source_idx = np.searchsorted(sources, dset.source[obs_idx])
+    partials = scipy.sparse.csr_matrix(
+        (
+            all_partials[obs_idx].ravel(),
+            (np.repeat(obs_idx, 2), (source_idx[:, None] * 2 + np.arange(2)).ravel()),
+        ),
+        shape=(dset.num_obs, len(sources) * 2),
+    )
 
     column_names = [s + "_" + name for s in sources for name in column_names]
 
@@ -0,0 +1,99 @@
+""" Test :mod:`where.estimation.estimators._covariance`.
+
+The covariance stores are written to a temporary work directory. Epochs are stored and read in the order used by the
+Kalman filter, forward and then backward, over more than one block of epochs.
+
+"""
+
+# Standard library imports
+import shutil
+import tempfile
+import unittest
+
+# External library imports
+import h5py
+import numpy as np
+
+# Where imports
+from where.estimation.estimators import _covariance
+from where.lib import config
+
+NUM_OBS = 2 * _covariance.BLOCK_SIZE + 10
+PARAM_NAMES = ["a", "b", "c"]
+FILE_VARS = dict(user="test", tech="vlbi", yyyy="2018", mm="01", dd="02", session="XA", id="")
+
+
+class TestCovarianceStore(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        config.files.update_vars(dict(path_work=self.work_dir, **FILE_VARS))
+        rng = np.random.RandomState(2018)
+        self.p_hat = rng.randn(NUM_OBS, len(PARAM_NAMES), len(PARAM_NAMES))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        config.tech.master_section = None
+        config.reset_config()
+
+    def _set_store(self, store_type, max_memory=1000):
+        config.tech.update("test", "covariance_store", store_type, source=__name__)
+        config.tech.update("test", "covariance_store_max_memory", str(max_memory), source=__name__)
+        config.tech.master_section = "test"
+
+    def _fill(self, store):
+        for epoch in range(NUM_OBS):
+            store[epoch] = self.p_hat[epoch]
+        for epoch in range(NUM_OBS - 1, -1, -1):
+            np.testing.assert_equal(store[epoch], self.p_hat[epoch])
+
+    def test_stores(self):
+        for store_type, store_cls in (
+            ("memory", _covariance.MemoryStore),
+            ("hdf5", _covariance.Hdf5Store),
+            ("memmap", _covariance.MemmapStore),
+        ):
+            with self.subTest(store_type=store_type):
+                self._set_store(store_type)
+                store = _covariance.store(NUM_OBS, len(PARAM_NAMES), PARAM_NAMES)
+                self.assertIsInstance(store, store_cls)
+                self._fill(store)
+                store.close()
+                self.assertFalse(store.file_path.exists())
+                self.assertEqual(list(store.file_path.parent.glob("*")), [])
+
+    def test_keep_file(self):
+        for store_type in ("memory", "hdf5", "memmap"):
+            with self.subTest(store_type=store_type):
+                self._set_store(store_type)
+                store = _covariance.store(NUM_OBS, len(PARAM_NAMES), PARAM_NAMES)
+                self._fill(store)
+                store.close(keep_file=True)
+                self.assertEqual(list(store.file_path.parent.glob("*")), [store.file_path])
+
+                # One dataset per epoch, as written by earlier versions of the Kalman filter
+                with h5py.File(store.file_path, "r") as p_hat_file:
+                    self.assertEqual(p_hat_file.attrs["labels"], "a, b, c")
+                    self.assertEqual(len(p_hat_file), NUM_OBS)
+                    for epoch in (0, _covariance.BLOCK_SIZE, NUM_OBS - 1):
+                        np.testing.assert_equal(p_hat_file[str(epoch)][...], self.p_hat[epoch])
+                store.file_path.unlink()
+
+    def test_auto(self):
+        size_mb = NUM_OBS * len(PARAM_NAMES) ** 2 * 8 / 2 ** 20
+        self._set_store("auto", max_memory=size_mb)
+        store = _covariance.store(NUM_OBS, len(PARAM_NAMES))
+        self.assertIsInstance(store, _covariance.MemoryStore)
+        store.close()
+
+        self._set_store("auto", max_memory=size_mb / 2)
+        store = _covariance.store(NUM_OBS, len(PARAM_NAMES))
+        self.assertIsInstance(store, _covariance.Hdf5Store)
+        store.close()
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            _covariance.CovarianceStore(NUM_OBS, len(PARAM_NAMES))
+
+
+if __name__ == "__main__":
+    unittest.main()
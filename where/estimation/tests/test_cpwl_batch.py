@@ -0,0 +1,99 @@
+""" Test :mod:`where.estimation.estimators.cpwl_batch`.
+
+The batch least squares solution is compared to the Kalman filter and smoother of the cpwl estimator for a synthetic
+session with one constant parameter and two stochastic parameters, where one of the rates is a random walk.
+
+"""
+
+# Standard library imports
+from datetime import date
+import shutil
+import tempfile
+import unittest
+
+# External library imports
+import numpy as np
+import scipy.sparse
+
+# Where imports
+from where.data.dataset import Dataset
+from where.estimation.estimators import cpwl, cpwl_batch
+from where.estimation.parameters import PartialVectors
+from where.lib import config
+
+RUNDATE = date(2018, 1, 2)
+FILE_VARS = dict(user="test", tech="vlbi", yyyy="2018", mm="01", dd="02", doy="002", session="XA", id="")
+STATIONS = ["NYALES20", "ONSALA60", "WETTZELL"]
+CONFIG = dict(
+    test=dict(reference_frames="itrf:2014", covariance_store="memory", keep_covariance_file="False"),
+    test_const=dict(apriori_stdev="1", unit="meter"),
+    test_stoch=dict(apriori_stdev="1", apriori_rate_stdev="0.1", knot_interval="21600", process_noise="0.01"),
+    test_drift=dict(apriori_stdev="1", apriori_rate_stdev="0.1", knot_interval="86400", process_noise="0"),
+)
+
+
+class TestCpwlBatch(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        config.files.update_vars(dict(path_work=self.work_dir, **FILE_VARS))
+        for section, options in CONFIG.items():
+            for key, value in dict(options, unit="meter").items():
+                config.tech.update(section, key, value, source=__name__)
+        config.tech.master_section = "test"
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        config.tech.master_section = None
+        config.reset_config()
+
+    def _estimate(self, estimator):
+        """Run an estimator on a synthetic session"""
+        rng = np.random.RandomState(2018)
+        num_obs = 300
+        baselines = np.array([rng.choice(len(STATIONS), 2, replace=False) for _ in range(num_obs)])
+        dset = Dataset(RUNDATE, "vlbi", "estimate", "XA", 0, empty=True, session="XA")
+        dset.num_obs = num_obs
+        dset.add_time("time", val=58120 + np.sort(rng.rand(num_obs)), scale="utc", format="mjd")
+        dset.add_text("station_1", val=[STATIONS[i] for i in baselines[:, 0]])
+        dset.add_text("station_2", val=[STATIONS[i] for i in baselines[:, 1]])
+        dset.add_float("obs", val=rng.randn(num_obs))
+        dset.add_float("calc", val=rng.randn(num_obs) * 0.1)
+        dset.add_float("residual", val=dset.obs - dset.calc)
+
+        partial_vectors = PartialVectors(num_obs, ["estimate_constant", "estimate_stochastic"])
+        partials = {
+            "estimate_constant": ["test_const-a"],
+            "estimate_stochastic": ["test_stoch-NYALES20", "test_drift-ONSALA60"],
+        }
+        for config_key, names in partials.items():
+            values = rng.randn(num_obs, len(names)) * (rng.rand(num_obs, len(names)) < 0.7)
+            partial_vectors.add(config_key, names=names, values=scipy.sparse.csr_matrix(values))
+            for name in names:
+                dset.add_to_meta("display_units", name, "meter")
+                dset.add_to_meta("partial_units", name, "dimensionless")
+
+        estimator(dset, partial_vectors, obs_noise=rng.rand(num_obs) * 0.01 + 0.01)
+        return dset
+
+    def test_batch_equals_kalman(self):
+        dset_kalman = self._estimate(cpwl.estimate_cpwl)
+        dset_batch = self._estimate(cpwl_batch.estimate_cpwl_batch)
+
+        fields = [f for f in dset_kalman.fields if f.startswith(("state_", "estimate")) and not f.endswith("_sigma")]
+        self.assertEqual(len(fields), 7)
+        for field in fields:
+            np.testing.assert_allclose(dset_batch[field], dset_kalman[field], rtol=0, atol=1e-8, err_msg=field)
+
+        neq_kalman, neq_batch = dset_kalman.meta["normal equation"], dset_batch.meta["normal equation"]
+        self.assertEqual(neq_batch["names"], neq_kalman["names"])
+        self.assertEqual(neq_batch["unit"], neq_kalman["unit"])
+        for key in ("matrix", "vector", "solution"):
+            np.testing.assert_allclose(neq_batch[key], neq_kalman[key], rtol=1e-6, err_msg=key)
+
+        stats_kalman, stats_batch = dset_kalman.meta["statistics"], dset_batch.meta["statistics"]
+        self.assertEqual(stats_batch["number of unknowns"], stats_kalman["number of unknowns"])
+        self.assertEqual(stats_batch["degrees of freedom"], stats_kalman["degrees of freedom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+""" Test :mod:`where.estimation.estimators._kalman`.
+
+The Kalman filter, which only uses the non-zero partial derivatives of each observation, is compared to a
+straightforward implementation using dense partial derivatives.
+
+"""
+
+# Standard library imports
+import unittest
+
+# External library imports
+import numpy as np
+import scipy.sparse
+
+# Where imports
+from where.estimation.estimators._kalman import KalmanFilter
+from where.estimation.parameters import PartialVectors
+
+
+def _dense_kalman(h, z, apriori_stdev, phi, r, Q):
+    """Kalman filter and Modified Bryson-Frazier smoother using dense partial derivatives"""
+    num_obs, n = h.shape
+    x_tilde, p_tilde = np.zeros(n), np.diag(apriori_stdev ** 2)
+    x_hat, p_hat, k = np.zeros((num_obs, n)), np.zeros((num_obs, n, n)), np.zeros((num_obs, n))
+    innovation, sigma = np.zeros(num_obs), np.zeros(num_obs)
+    for epoch in range(num_obs):
+        innovation[epoch] = z[epoch] - h[epoch] @ x_tilde
+        sigma[epoch] = h[epoch] @ p_tilde @ h[epoch] + r[epoch]
+        k[epoch] = p_tilde @ h[epoch] / sigma[epoch]
+        x_hat[epoch] = x_tilde + k[epoch] * innovation[epoch]
+        p_hat[epoch] = (np.eye(n) - np.outer(k[epoch], h[epoch])) @ p_tilde
+        x_tilde = phi[epoch] @ x_hat[epoch]
+        p_tilde = phi[epoch] @ p_hat[epoch] @ phi[epoch].T
+        for (idx1, idx2), noise in Q.get(epoch, {}).items():
+            p_tilde[idx1, idx2] += noise
+
+    x_smooth, lam = np.zeros((num_obs, n)), np.zeros(n)
+    for epoch in range(num_obs - 1, -1, -1):
+        x_smooth[epoch] = x_hat[epoch] + p_hat[epoch].T @ lam
+        lam = phi[epoch - 1].T @ (
+            h[epoch] * innovation[epoch] / sigma[epoch] + lam - h[epoch] * (k[epoch] @ lam)
+        )
+
+    return x_hat, x_smooth, np.sqrt(np.diagonal(p_hat, axis1=1, axis2=2))
+
+
+class TestKalmanFilter(unittest.TestCase):
+    def setUp(self):
+        # Two constant parameters and one stochastic parameter with rate, each observation sees a few of them
+        rng = np.random.RandomState(2018)
+        self.num_obs, self.n = 60, 4
+        self.h = rng.randn(self.num_obs, self.n) * (rng.rand(self.num_obs, self.n) < 0.6)
+        self.h[:, 3] = 0
+        self.z = rng.randn(self.num_obs)
+        self.r = rng.rand(self.num_obs) + 0.5
+        self.apriori_stdev = np.array([1.0, 2.0, 0.5, 0.1])
+        self.phi = [np.eye(self.n) + np.eye(self.n, k=1) * 0.1 * (np.arange(self.n) == 2)] * self.num_obs
+        self.Q = {epoch: {(3, 3): 0.01} for epoch in range(0, self.num_obs, 10)}
+
+    def test_sparse_and_dense_partials(self):
+        expected_hat, expected_smooth, expected_ferr = _dense_kalman(
+            self.h, self.z, self.apriori_stdev, self.phi, self.r, self.Q
+        )
+
+        # Partial derivatives returned as dense arrays and sparse matrices from the partial calculators
+        for values in (self.h, scipy.sparse.csr_matrix(self.h)):
+            partial_vectors = PartialVectors(self.num_obs, ["estimate"])
+            partial_vectors.add("estimate", names=list("abcd"), values=values)
+            kalman = KalmanFilter(
+                partial_vectors.matrix("estimate"),
+                z=self.z,
+                apriori_stdev=self.apriori_stdev,
+                phi=self.phi,
+                r=self.r,
+                Q=self.Q,
+            )
+            kalman.filter()
+            np.testing.assert_allclose(kalman.x_hat[:, :, 0], expected_hat, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(kalman.x_smooth[:, :, 0], expected_smooth, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(kalman.x_hat_ferr, expected_ferr, rtol=0, atol=1e-12)
+            kalman.cleanup()
+
+        # Dense partial derivatives passed directly to the Kalman filter
+        kalman = KalmanFilter(
+            self.h[:, :, None], z=self.z, apriori_stdev=self.apriori_stdev, phi=self.phi, r=self.r, Q=self.Q
+        )
+        kalman.filter()
+        np.testing.assert_allclose(kalman.x_smooth[:, :, 0], expected_smooth, rtol=0, atol=1e-12)
+        kalman.cleanup()
+
+
+class TestPartialVectors(unittest.TestCase):
+    def test_add_and_subset(self):
+        rng = np.random.RandomState(2018)
+        dense = rng.randn(10, 3) * (rng.rand(10, 3) < 0.5)
+        partial_vectors = PartialVectors(10, ["estimate_constant", "estimate_stochastic"])
+        partial_vectors.add("estimate_constant", names=["a", "b"], values=scipy.sparse.csr_matrix(dense[:, :2]))
+        partial_vectors.add("estimate_constant", names=["c"], values=scipy.sparse.csr_matrix(dense[:, 2:]))
+
+        self.assertEqual(partial_vectors, {"estimate_constant": ["a", "b", "c"], "estimate_stochastic": []})
+        np.testing.assert_equal(partial_vectors.matrix("estimate_constant").toarray(), dense)
+        self.assertEqual(partial_vectors.matrix("estimate_stochastic").shape, (10, 0))
+
+        idx = rng.rand(10) < 0.5
+        partial_vectors.subset(idx)
+        np.testing.assert_equal(partial_vectors.matrix("estimate_constant").toarray(), dense[idx])
+        self.assertEqual(partial_vectors.matrix("estimate_stochastic").shape, (np.sum(idx), 0))
+        self.assertEqual(partial_vectors.num_obs, np.sum(idx))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+""" Test :mod:`where.estimation.normal_equations`.
+
+"""
+
+# Standard library imports
+import unittest
+
+# External library imports
+import numpy as np
+import scipy.sparse
+
+# Where imports
+from where.estimation.normal_equations import NormalEquations
+
+
+class TestNormalEquations(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(2018)
+        self.A = rng.randn(50, 4) * (rng.rand(50, 4) < 0.5)
+        self.z = rng.randn(50)
+        self.weight = rng.rand(50) + 0.5
+
+    def test_dense_and_sparse(self):
+        expected_N = self.A.T @ np.diag(self.weight) @ self.A
+        expected_b = self.A.T @ (self.weight * self.z)
+        for A in (self.A, scipy.sparse.csr_matrix(self.A)):
+            neq = NormalEquations(4)
+            neq.add(A, self.z, self.weight)
+            np.testing.assert_allclose(neq.N, expected_N, atol=1e-12)
+            np.testing.assert_allclose(neq.b, expected_b, atol=1e-12)
+            self.assertEqual(neq.num_obs, 50)
+
+    def test_remove(self):
+        neq = NormalEquations(4)
+        neq.add(self.A, self.z, self.weight)
+        neq.remove(self.A[:10], self.z[:10], self.weight[:10])
+
+        expected = NormalEquations(4)
+        expected.add(self.A[10:], self.z[10:], self.weight[10:])
+        np.testing.assert_allclose(neq.N, expected.N, atol=1e-12)
+        np.testing.assert_allclose(neq.solve(), expected.solve(), atol=1e-12)
+        self.assertEqual(neq.num_obs, 40)
+
+    def test_solve(self):
+        neq = NormalEquations(4)
+        neq.add(self.A, self.z)
+        x, *_ = np.linalg.lstsq(self.A, self.z, rcond=None)
+        np.testing.assert_allclose(neq.solve(), x, atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -53,6 +53,9 @@ instead of
 If you are having problems calling a function properly, do check that the input and output arguments are registered
 properly in the `sofa.pyf`-signature file, which is found in the `external/sofa/src`-directory.
 
+The vectorized functions in `where.ext.sofa_wrapper` use ERFA, the C-version of SOFA distributed together with Astropy,
+which works on whole arrays of epochs at once.
+
 IAU regularly updates the SOFA library, both with bugfixes, new data (for instance leap seconds) and improved
 models. See the file `external/sofa/UPDATE.txt` for instructions on how to update the Python wrapper.
 
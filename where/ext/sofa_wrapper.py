@@ -10,6 +10,13 @@ important matrices like Q (the transformation matrix for the celestial motion of
 for Earth rotation) and W (the transformation matrix for polar motion). See the IERS conventions [2]_ for more details,
 in particular section 5.
 
+The transformation matrices only depend on time. Functions decorated with `unique_epochs` are therefore only evaluated
+for the unique time epochs, and the results are indexed back to all epochs.
+
+The vectorized functions call ERFA [3]_, which is the C-version of SOFA with a different name, distributed together
+with Astropy. The ERFA functions are compiled ufuncs working on whole arrays of epochs at once, while the Fortran SOFA
+functions would need to be called once for each epoch.
+
 References:
 -----------
 
@@ -20,26 +27,56 @@ References:
        IERS Technical Note No. 36, BKG (2010).
        http://www.iers.org/IERS/EN/Publications/TechnicalNotes/tn36.html
 
+.. [3] ERFA (Essential Routines for Fundamental Astronomy).
+       https://github.com/liberfa/erfa
+
 
 
 
 """
 
 # Standard library imports
+import functools
 
 # External library imports
 import numpy as np
 
+try:
+    import erfa
+except ImportError:
+    from astropy import _erfa as erfa  # Older versions of Astropy include ERFA
+
 # Where imports
 from where.lib import cache
 from where.lib import constant
-from where.ext import sofa
 from where.lib.unit import unit
 from where.lib import rotation
 from where import apriori
 
 
+def unique_epochs(func):
+    """Decorator evaluating a function of time only for the unique time epochs
+
+    Args:
+        func:  Function taking a lib.time Time-object as the only argument, and returning an array with one element
+               (for instance a 3x3 matrix) for each time epoch.
+
+    Returns:
+        Function: Function returning the same values as func, but only evaluating func for the unique epochs.
+    """
+
+    @functools.wraps(func)
+    def unique_func(time):
+        unique_time, inverse = time.unique_epochs
+        if inverse is None:
+            return func(time)
+        return func(unique_time)[inverse]
+
+    return unique_func
+
+
 @cache.function
+@unique_epochs
 def Q(time):
     """Transformation matrix for the celestial motion of the CIP
 
@@ -136,6 +173,7 @@ def ERA(time):
 
 
 @cache.function
+@unique_epochs
 def R(time):
     """Transformation matrix for the Earth rotation
 
@@ -161,6 +199,7 @@ def R(time):
 
 
 @cache.function
+@unique_epochs
 def dR_dut1(time):
     """Derivative of transformation matrix for the Earth rotation with respect to time (UT1??)
 
@@ -204,6 +243,7 @@ def s_prime(time):
 
 
 @cache.function
+@unique_epochs
 def W(time):
     """Transformation matrix for the polar motion
 
@@ -220,6 +260,7 @@ def W(time):
 
 
 @cache.function
+@unique_epochs
 def dW_dxp(time):
     """Derivative of transformation matrix for the polar motion with regards to the CIP (Celestial Intermediate Pole)
     in TRF along the Greenwich meridian x_p.
@@ -231,6 +272,7 @@ def dW_dxp(time):
 
 
 @cache.function
+@unique_epochs
 def dW_dyp(time):
     """Derivative of transformation matrix for the polar motion with regards to the CIP in ITRS.
 
@@ -282,6 +324,7 @@ def dd_dY(time):
 
 
 @cache.function
+@unique_epochs
 def dQ_dX(time):
     """Derivative of transformation matrix for nutation/presession with regards to the X coordinate of CIP in GCRS
     """
@@ -304,6 +347,7 @@ def dQ_dX(time):
 
 
 @cache.function
+@unique_epochs
 def dQ_dY(time):
     """Derivative of transformation matrix for nutation/presession with regards to the Y coordinate of CIP in GCRS
     """
@@ -335,13 +379,7 @@ def vectorized_xy06(time):
     Returns:
         tuple:  CIP x, y coordinates
     """
-    if time.isscalar:
-        return sofa.iau_xy06(time.tt.jd1, time.tt.jd2)
-
-    x, y = np.empty(time.shape), np.empty(time.shape)
-    for idx, t in enumerate(time.tt):
-        x[idx], y[idx] = sofa.iau_xy06(t.jd1, t.jd2)
-    return x, y
+    return erfa.xy06(time.tt.jd1, time.tt.jd2)
 
 
 @cache.function
@@ -350,18 +388,11 @@ def vectorized_s06(time):
 
     Args:
         time:   lib.time-object
-        x:      CIP x coordinate
-        y:      CIP y coordinate
 
     Returns:
         CIO locator s
     """
-    if time.isscalar:
-        return sofa.iau_s06(time.tt.jd1, time.tt.jd2, X_model(time), Y_model(time))
-
-    return np.array(
-        [sofa.iau_s06(t.jd1, t.jd2, x_i, y_i) for t, x_i, y_i in zip(time.tt, X_model(time), Y_model(time))]
-    )
+    return erfa.s06(time.tt.jd1, time.tt.jd2, X_model(time), Y_model(time))
 
 
 @cache.function
@@ -374,10 +405,7 @@ def vectorized_era00(time):
     Returns:
         Earth rotation angle
     """
-    if time.isscalar:
-        return sofa.iau_era00(time.ut1.jd1, time.ut1.jd2)
-
-    return np.array([sofa.iau_era00(t.jd1, t.jd2) for t in time.ut1])
+    return erfa.era00(time.ut1.jd1, time.ut1.jd2)
 
 
 @cache.function
@@ -390,14 +418,11 @@ def vectorized_sp00(time):
     Returns:
         TIO locator s'
     """
-    if time.isscalar:
-        return sofa.iau_sp00(time.tt.jd1, time.tt.jd2)
-
-    return np.array([sofa.iau_sp00(t.jd1, t.jd2) for t in time.tt])
+    return erfa.sp00(time.tt.jd1, time.tt.jd2)
 
 
 def vectorized_llh(pos, ref_ellipsoid=2):
-    """Vectorized version of SOFA gc2gd-function. 
+    """Vectorized version of SOFA gc2gd-function.
 
     Converts xyz coordinates to latitude, longitude and height
 
@@ -405,14 +430,7 @@ def vectorized_llh(pos, ref_ellipsoid=2):
     Args:
         pos:        xyz coordinates
     Returns:
-        np.array:   llh coordinates 
-    """
-    if np.array(pos).ndim == 1:
-        lon, lat, h, _ = sofa.iau_gc2gd(ref_ellipsoid, pos)
-        return np.array([lat, lon, h])
-    else:
-        llh = np.empty(pos.shape)
-        for i, xyz in enumerate(pos):
-            lon, lat, h, _ = sofa.iau_gc2gd(ref_ellipsoid, xyz)
-            llh[i, :] = (lat, lon, h)
-        return llh
+        np.array:   llh coordinates
+    """
+    lon, lat, h = erfa.gc2gd(ref_ellipsoid, np.asarray(pos)[..., :3])
+    return np.stack((lat, lon, h), axis=-1)
@@ -0,0 +1,62 @@
+""" Test :mod:`where.ext.sofa_wrapper`.
+
+The vectorized functions based on ERFA are compared against calling the scalar SOFA routines for each epoch. The
+epochs are given in the TT and UT1 time scales, so that no EOP data are needed.
+
+"""
+
+# Standard library imports
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.ext import sofa
+from where.ext import sofa_wrapper
+from where.lib.time import Time
+
+
+class TestVectorizedSofa(unittest.TestCase):
+    def setUp(self):
+        mjd = np.random.RandomState(2018).uniform(50000, 60000, 20)
+        self.time_tt = Time(mjd, format="mjd", scale="tt")
+        self.time_ut1 = Time(mjd, format="mjd", scale="ut1")
+
+    def test_xy06(self):
+        x, y = sofa_wrapper.vectorized_xy06(self.time_tt)
+        expected = np.array([sofa.iau_xy06(t.jd1, t.jd2) for t in self.time_tt])
+        np.testing.assert_allclose(x, expected[:, 0], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(y, expected[:, 1], rtol=0, atol=1e-12)
+
+    def test_s06(self):
+        s = sofa_wrapper.vectorized_s06(self.time_tt)
+        x, y = sofa_wrapper.vectorized_xy06(self.time_tt)
+        expected = [sofa.iau_s06(t.jd1, t.jd2, x_i, y_i) for t, x_i, y_i in zip(self.time_tt, x, y)]
+        np.testing.assert_allclose(s, expected, rtol=0, atol=1e-12)
+
+    def test_era00(self):
+        era = sofa_wrapper.vectorized_era00(self.time_ut1)
+        expected = [sofa.iau_era00(t.jd1, t.jd2) for t in self.time_ut1]
+        np.testing.assert_allclose(era, expected, rtol=0, atol=1e-12)
+
+    def test_sp00(self):
+        sp = sofa_wrapper.vectorized_sp00(self.time_tt)
+        expected = [sofa.iau_sp00(t.jd1, t.jd2) for t in self.time_tt]
+        np.testing.assert_allclose(sp, expected, rtol=0, atol=1e-12)
+
+    def test_llh(self):
+        rng = np.random.RandomState(2018)
+        pos = rng.uniform(-6.4e6, 6.4e6, (20, 3))
+        llh = sofa_wrapper.vectorized_llh(pos)
+        for pos_i, llh_i in zip(pos, llh):
+            lon, lat, h, _ = sofa.iau_gc2gd(2, pos_i)
+            np.testing.assert_allclose(llh_i[:2], (lat, lon), rtol=0, atol=1e-12)
+            np.testing.assert_allclose(llh_i[2], h, rtol=1e-12, atol=1e-12)
+
+        # One position gives one set of coordinates
+        np.testing.assert_equal(sofa_wrapper.vectorized_llh(pos[0]), llh[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,17 +3,37 @@
 Example:
     from where.lib import cache
 
+    @cache.function
+    def expensive_calculation(...):
+        ...
+
+    cache.report()
+    cache.clear()
 
-Description:
 
-asdf.
+Description:
 
-Ref Python Cookbook, 3rd ed. Recipe 8.10.
+Cached properties are calculated the first time they are used and then stored on the instance. Ref Python Cookbook,
+3rd ed. Recipe 8.10.
 
+Cached functions are stored in namespaces, by default one namespace per module. Each namespace is limited by the
+estimated memory used by the cached values, and the least recently used values are evicted when the namespace grows
+too big. The caches should be cleared with `cache.clear()` when a new session starts, so that long running processes
+do not hold on to data for old sessions. Namespaces containing immutable data that do not depend on the session, like
+opened ephemeris files, can be marked as shared, and are then kept between sessions. Statistics about hits, misses
+and evictions are available through `cache.info()` and `cache.report()`.
 
 """
 # Standard library imports
+import builtins
+import collections
 import functools
+import sys
+import threading
+import types
+
+# Where imports
+from where.lib import log
 
 
 _DEPENDENT_PROPERTIES = dict()
@@ -62,10 +82,241 @@ def forget_dependent_values(obj, *dependencies):
                     pass
 
 
-def function(func):
+#
+# CACHED FUNCTIONS
+#
+# Default maximum number of bytes held by one cache namespace
+MAX_BYTES = 1000 * 2 ** 20
+
+# Objects that are not owned by cached values, and are not counted when estimating their size
+_NOT_SIZED = (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "evictions", "currsize", "nbytes", "max_bytes"])
+
+
+class _Namespace:
+    """Least recently used cache limited by the estimated number of bytes of the cached values"""
+
+    def __init__(self, name, max_bytes=None, shared=False):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.values = collections.OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.RLock()
+
+    @builtins.property
+    def limit(self):
+        return MAX_BYTES if self.max_bytes is None else self.max_bytes
+
+    def get(self, key):
+        """Get a cached value, raise KeyError if it is not cached"""
+        with self.lock:
+            try:
+                value, _ = self.values[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.values.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used values if the namespace grows too big"""
+        size = _nbytes(value)
+        with self.lock:
+            if key in self.values:
+                self.nbytes -= self.values.pop(key)[1]
+            if size > self.limit:
+                return  # Do not throw out everything else for a value that can not be cached anyway
+
+            self.values[key] = (value, size)
+            self.nbytes += size
+            self.evict()
+
+    def evict(self):
+        """Evict the least recently used values until the namespace is within its limit"""
+        with self.lock:
+            while self.nbytes > self.limit:
+                _, (_, evicted_size) = self.values.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+            self.nbytes = 0
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self.values), self.nbytes, self.limit)
+
+
+_NAMESPACES = dict()
+
+
+def _namespace(name):
+    """Get a cache namespace, create it if necessary"""
+    if name not in _NAMESPACES:
+        _NAMESPACES[name] = _Namespace(name)
+    return _NAMESPACES[name]
+
+
+def _nbytes(value):
+    """Estimate the memory used by a value
+
+    Numpy arrays and other objects with an `nbytes`-attribute report their own size. Containers are sized by their
+    items, and other objects by the attributes in their `__dict__` and `__slots__`, so that arrays held by objects are
+    counted as well. Each object is only counted once, and modules, classes and functions are not counted.
+    """
+    nbytes = 0
+    seen = set()
+    objects = [value]
+    while objects:
+        obj = objects.pop()
+        if id(obj) in seen or isinstance(obj, _NOT_SIZED):
+            continue
+        seen.add(id(obj))
+
+        obj_nbytes = getattr(obj, "nbytes", None)
+        if isinstance(obj_nbytes, int):
+            nbytes += obj_nbytes
+            continue
+
+        nbytes += sys.getsizeof(obj, 0)
+        if isinstance(obj, dict):
+            objects.extend(obj.keys())
+            objects.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+            objects.extend(obj)
+        else:
+            objects.extend(getattr(obj, "__dict__", dict()).values())
+            for cls in type(obj).__mro__:
+                for slot in cls.__dict__.get("__slots__", ()):
+                    objects.append(getattr(obj, slot, None))
+
+    return nbytes
+
+
+def function(func=None, *, namespace=None, shared=False):
     """Cache a given function call
 
-    Uses the lru_cache (Least Recently Used) implementation from the functools standard library. Wrapped here to have a
-    consistent lib.cache-module and possibly set the parameters of the functools.lru_cache.
+    The cache works like the lru_cache (Least Recently Used) from the functools standard library, but all cached
+    functions in the same namespace share one cache which is limited by the memory used by the cached values instead
+    of by the number of calls. By default, each module is its own namespace. The decorator can be used both with and
+    without arguments:
+
+        @cache.function
+        def get(...):
+
+        @cache.function(namespace="sofa")
+        def Q(...):
+
+    Values that are only known after the function has been called, like normal equations that are updated by later
+    calls, are stored with `cache_set` on the decorated function, so that the cache measures the finished value:
+
+        get.cache_set(value, *args, **kwargs)
+
+    Args:
+        func (Function):      The function that is cached.
+        namespace (String):   Name of the cache namespace, default is the name of the module containing func.
+        shared (Boolean):     Keep the cached values between sessions. Only for values independent of the analysis.
+                              Shared functions use the namespace <module>.shared by default.
+
+    Returns:
+        Function: The decorated function.
+    """
+    if func is None:
+        return functools.partial(function, namespace=namespace, shared=shared)
+
+    if namespace is None:
+        namespace = f"{func.__module__}.shared" if shared else func.__module__
+    func_cache = _namespace(namespace)
+    func_cache.shared |= shared
+
+    def cache_key(args, kwargs):
+        return (func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+    @functools.wraps(func)
+    def cached_func(*args, **kwargs):
+        key = cache_key(args, kwargs)
+        try:
+            return func_cache.get(key)
+        except KeyError:
+            pass
+
+        value = func(*args, **kwargs)
+        func_cache.set(key, value)
+        return value
+
+    def cache_set(value, *args, **kwargs):
+        """Cache a value for the given arguments, replacing any value already cached for them"""
+        func_cache.set(cache_key(args, kwargs), value)
+
+    cached_func.cache_namespace = func_cache.name
+    cached_func.cache_set = cache_set
+    cached_func.cache_clear = func_cache.clear
+    cached_func.cache_info = func_cache.info
+    return cached_func
+
+
+def set_max_memory(max_bytes, *namespaces):
+    """Set the maximum number of bytes used by cache namespaces
+
+    Args:
+        max_bytes (Int):      Maximum number of bytes, None to use the default MAX_BYTES.
+        namespaces (String):  Names of namespaces. If none are given, the default MAX_BYTES is changed.
+    """
+    global MAX_BYTES
+    if not namespaces:
+        MAX_BYTES = MAX_BYTES if max_bytes is None else max_bytes
+    for namespace in namespaces:
+        _namespace(namespace).max_bytes = max_bytes
+
+    for func_cache in _NAMESPACES.values():
+        func_cache.evict()
+
+
+def clear(*namespaces, include_shared=False):
+    """Clear cached function values
+
+    Should be called when the session changes, so that long running processes do not keep data for old sessions.
+
+    Args:
+        namespaces (String):      Names of namespaces to clear. If none are given, all namespaces are cleared,
+                                  except shared ones.
+        include_shared (Boolean): Also clear shared namespaces when no namespaces are given.
+    """
+    if not namespaces:
+        namespaces = [n for n, c in _NAMESPACES.items() if include_shared or not c.shared]
+
+    for namespace in namespaces:
+        if namespace in _NAMESPACES:
+            _NAMESPACES[namespace].clear()
+
+
+def info():
+    """Statistics about the cache namespaces
+
+    Returns:
+        Dict: CacheInfo with hits, misses, evictions, number of values and memory use for each namespace.
+    """
+    return {name: func_cache.info() for name, func_cache in sorted(_NAMESPACES.items())}
+
+
+def report(logger=log.info):
+    """Report statistics about the cache namespaces that have been used
+
+    Args:
+        logger (Function):   Function used to report, default is log.info.
     """
-    return functools.lru_cache()(func)
+    for name, stats in info().items():
+        if stats.hits + stats.misses == 0:
+            continue
+        hit_rate = stats.hits / (stats.hits + stats.misses)
+        logger(
+            f"Cache {name}: {stats.hits} hits, {stats.misses} misses ({hit_rate:.0%} hits), "
+            f"{stats.evictions} evictions, {stats.currsize} values using {stats.nbytes / 2 ** 20:.1f} of "
+            f"{stats.max_bytes / 2 ** 20:.0f} MB"
+        )
@@ -505,9 +505,9 @@ def use_filelist_profiles(*profiles):
     Different profiles are specified in the file list as `__profile`.
 
     Args:
-        Profiles (String):  List of profiles, a leading '__' will be assumed.
+        Profiles (String):  List of profiles, a leading '__' will be assumed. If empty, no profiles are used.
     """
-    config.files.profiles = list(profiles)
+    config.files.profiles = list(profiles) if profiles else None
 
 
 def get_parser(file_key):
@@ -472,6 +472,13 @@ def file_init(log_path=None, log_level=None, append=False):
     _dump_cache()
 
 
+def file_flush():
+    """Write any buffered log messages to the log file
+    """
+    if LOGINFO["do_file"]:
+        LOGINFO["file_id"].flush()
+
+
 def file_end():
     """Close the logging to file
     """
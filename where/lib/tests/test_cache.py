@@ -0,0 +1,159 @@
+""" Test :mod:`where.lib.cache`.
+
+"""
+
+# Standard library imports
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.lib import cache
+
+NAMESPACE = __name__
+SHARED_NAMESPACE = __name__ + ".shared"
+
+calls = list()
+
+
+@cache.function
+def ones(num, value=1.0):
+    calls.append(("ones", num, value))
+    return np.full(num, value)
+
+
+@cache.function
+def zeros(num):
+    calls.append(("zeros", num))
+    return np.zeros(num)
+
+
+@cache.function(namespace="where.lib.tests.other")
+def other(num):
+    calls.append(("other", num))
+    return np.zeros(num)
+
+
+@cache.function(shared=True)
+def shared(num):
+    calls.append(("shared", num))
+    return np.zeros(num)
+
+
+class Holder:
+    def __init__(self, num):
+        self.values = {"pos": np.zeros((num, 3)), "vel": np.zeros((num, 3))}
+        self.name = "holder"
+
+
+class Slots:
+    __slots__ = ("values",)
+
+    def __init__(self, num):
+        self.values = np.zeros(num)
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        cache.clear(include_shared=True)
+        calls.clear()
+
+    def tearDown(self):
+        cache.set_max_memory(None, NAMESPACE)
+
+    def test_hits_and_keys(self):
+        before = ones.cache_info()  # Hits and misses are counted since the start of the process
+        ones(10)
+        ones(10)
+        ones(10, value=2.0)
+        ones(10, value=2.0)
+        ones(num=10)
+        self.assertEqual(calls, [("ones", 10, 1.0), ("ones", 10, 2.0), ("ones", 10, 1.0)])
+
+        stats = ones.cache_info()
+        self.assertEqual((stats.hits - before.hits, stats.misses - before.misses, stats.currsize), (2, 3, 3))
+        self.assertEqual(stats.nbytes, 3 * 10 * 8)
+
+    def test_eviction(self):
+        cache.set_max_memory(3 * 100 * 8, NAMESPACE)
+        for num in (1, 2, 3):
+            ones(100, value=num)
+        ones(100, value=1)  # Value 1 is now the most recently used
+        ones(100, value=4)  # Evicts value 2
+        self.assertEqual(ones.cache_info().evictions, 1)
+
+        calls.clear()
+        for num in (1, 3, 4, 2):
+            ones(100, value=num)
+        self.assertEqual(calls, [("ones", 100, 2)])
+
+        # Values bigger than the limit are not cached, and do not evict other values
+        zeros(1000)
+        zeros(1000)
+        self.assertEqual(calls[-2:], [("zeros", 1000), ("zeros", 1000)])
+        self.assertEqual(ones.cache_info().currsize, 3)
+
+    def test_cache_set(self):
+        ones(10)
+        ones.cache_set(np.zeros(100), 10)
+        self.assertEqual(ones(10).tolist(), [0] * 100)
+        self.assertEqual(calls, [("ones", 10, 1.0)])
+
+        # The size of the new value is counted
+        stats = ones.cache_info()
+        self.assertEqual((stats.currsize, stats.nbytes), (1, 100 * 8))
+
+    def test_namespaces(self):
+        self.assertEqual(ones.cache_namespace, NAMESPACE)
+        self.assertEqual(zeros.cache_namespace, NAMESPACE)
+        self.assertEqual(other.cache_namespace, "where.lib.tests.other")
+        self.assertEqual(shared.cache_namespace, SHARED_NAMESPACE)
+
+        # Functions in the same namespace share one cache
+        ones(10)
+        zeros(10)
+        other(10)
+        self.assertEqual(ones.cache_info().currsize, 2)
+        self.assertEqual(other.cache_info().currsize, 1)
+
+        cache.clear(NAMESPACE)
+        self.assertEqual(ones.cache_info().currsize, 0)
+        self.assertEqual(other.cache_info().currsize, 1)
+        self.assertIn(NAMESPACE, cache.info())
+
+    def test_shared(self):
+        ones(10)
+        shared(10)
+        cache.clear()
+        self.assertEqual(ones.cache_info().currsize, 0)
+        self.assertEqual(shared.cache_info().currsize, 1)
+
+        shared(10)
+        self.assertEqual(calls.count(("shared", 10)), 1)
+
+        cache.clear(include_shared=True)
+        self.assertEqual(shared.cache_info().currsize, 0)
+
+    def test_nbytes(self):
+        self.assertEqual(cache._nbytes(np.zeros(100)), 800)
+        self.assertGreater(cache._nbytes(Holder(1000)), 2 * 1000 * 3 * 8)
+        self.assertGreater(cache._nbytes(Slots(1000)), 1000 * 8)
+        self.assertGreater(cache._nbytes([np.zeros(1000)] * 3), 1000 * 8)
+        self.assertLess(cache._nbytes([np.zeros(1000)] * 3), 2 * 1000 * 8)  # The same array is only counted once
+
+        holder = Holder(10)
+        holder.self = holder
+        self.assertGreater(cache._nbytes(holder), 2 * 10 * 3 * 8)  # Cycles are followed only once
+
+    def test_report(self):
+        other(10)
+        other(10)
+        stats = other.cache_info()
+        lines = list()
+        cache.report(logger=lines.append)
+        self.assertIn(f"Cache where.lib.tests.other: {stats.hits} hits, {stats.misses} misses", "\n".join(lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,7 @@ References:
 """
 # Standard library imports
 from datetime import datetime
+import hashlib
 
 # External library imports
 import astropy.time
@@ -101,25 +102,63 @@ class Time(astropy.time.Time):
     """
 
     @cache.property
-    def text_repr(self):
-        """A text representation of all time epochs
+    def fingerprint(self):
+        """A fingerprint identifying all time epochs
 
-        This is used when comparing two Time objects using either `__hash__` or `__eq__`.
+        This is used when comparing two Time objects using either `__hash__` or `__eq__`. The fingerprint is a digest
+        of the scale, the shape and the raw bytes of the internal `jd1` and `jd2` arrays, which is much faster to
+        calculate than a text representation of all the epochs.
 
         Returns:
-            String: Text representation of all time epochs.
+            String: Hexadecimal digest identifying all time epochs.
         """
-        return self.scale + (self.isot if self.isscalar else "".join(self.isot.tolist()))
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.scale}{self.shape}".encode())
+        digest.update(np.ascontiguousarray(self.jd1, dtype=float).tobytes())
+        digest.update(np.ascontiguousarray(self.jd2, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    @cache.property
+    def unique_epochs(self):
+        """The unique time epochs, and how to map them back to all epochs
+
+        Observations are often done at the same epochs, for instance all baselines of a VLBI scan or all satellites of
+        a GNSS epoch. Quantities depending only on time, like the transformation matrices, can then be calculated for
+        the unique epochs and indexed back to all epochs as follows:
+
+            unique_time, inverse = time.unique_epochs
+            matrices = calculate(unique_time)[inverse]
+
+        Returns:
+            Tuple: Time object with the unique epochs, and index array mapping the unique epochs back to all epochs. If
+                   all epochs are unique, the index array is None, and the Time object is self.
+        """
+        if self.isscalar:
+            return self, None
+
+        jd = np.stack((self.jd1.ravel(), self.jd2.ravel()), axis=1)
+        _, unique_idx, inverse = np.unique(jd, axis=0, return_index=True, return_inverse=True)
+        if len(unique_idx) == self.size:
+            return self, None
+
+        unique_time = self.ravel()[unique_idx]
+        unique_time.unique_epochs = (unique_time, None)
+        return unique_time, inverse.reshape(self.shape)
 
     @cache.property
     def itrs2gcrs(self):
         """The ITRS to GCRS transformation matrix for the given times
 
-        See ext/sofa_wrapper.py for details about the implementation.
+        The matrices are calculated for the unique epochs only. See ext/sofa_wrapper.py for details about the
+        implementation.
 
         Returns:
             Numpy-float array with transformation matrices, shape is (len(self), 3, 3).
         """
+        unique_time, inverse = self.unique_epochs
+        if inverse is not None:
+            return unique_time.itrs2gcrs[inverse]
+
         return sofa.Q(self) @ sofa.R(self) @ sofa.W(self)
 
     @cache.property
@@ -140,11 +179,16 @@ class Time(astropy.time.Time):
     def itrs2gcrs_dot(self):
         """The derivative of ITRS to GCRS transformation matrix for the given times
 
-        See ext/sofa_wrapper.py for details about the implementation.
+        The matrices are calculated for the unique epochs only. See ext/sofa_wrapper.py for details about the
+        implementation.
 
         Returns:
             Numpy-float array with transformation matrices, shape is (len(self), 3, 3).
         """
+        unique_time, inverse = self.unique_epochs
+        if inverse is not None:
+            return unique_time.itrs2gcrs_dot[inverse]
+
         return sofa.Q(self) @ sofa.dR_dut1(self) @ sofa.W(self)
 
     @cache.property
@@ -410,16 +454,16 @@ class Time(astropy.time.Time):
     def __hash__(self):
         """Define a hash value
 
-        We want arrays with the same time epochs to have equal hashes. This is done by applying a hash to a textual
-        representation of the time array.
+        We want arrays with the same time epochs to have equal hashes. This is done by applying a hash to the
+        fingerprint of the time array.
         """
-        return hash(self.text_repr)
+        return hash(self.fingerprint)
 
     def __eq__(self, other):
         """Compare if two Time objects are equal
 
-        Use the text representation to say that two Time objects are equal if they have the exact same time
-        epochs. (This was seemingly quite a bit faster than to do a `all(super().__eq__(other))`-call.)
+        Use the fingerprint to say that two Time objects are equal if they have the exact same time epochs. (This was
+        seemingly quite a bit faster than to do a `all(super().__eq__(other))`-call.)
 
         This was necessary to implement because things like Dict use __eq__ to double-check equality if two
         __hash__-values are the same (to guard against hash-collisions), and the __eq__ of Astropy-Time uses
@@ -428,7 +472,7 @@ class Time(astropy.time.Time):
         if not isinstance(other, self.__class__):
             return False
 
-        return self.text_repr == other.text_repr
+        return self.fingerprint == other.fingerprint
 
     def __repr__(self):
         """Represent the time object with scale and format, and an indication of values
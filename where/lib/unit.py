@@ -82,7 +82,7 @@ class _convert_units(type):
     with files.open("units") as fid:
         ureg.load_definitions(fid)
 
-    @cache.function
+    @cache.function(shared=True)
     def __call__(cls, from_unit, to_unit=None):
         """Calculate the conversion scale between from_unit and to_unit
 
@@ -0,0 +1,120 @@
+""" Test :mod:`where.models.delay.troposphere_radio`.
+
+The vectorized VMF1 mapping functions are compared against the 'vmf1_ht.f' and 'gmf.f' routines from the IERS software
+library. The GPT2 and GPT2w grid evaluation is tested on synthetic grids.
+
+"""
+
+# Standard library imports
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.ext import iers_2010 as iers
+from where.models.delay import troposphere_radio
+
+
+class TestVmf1MappingFunction(unittest.TestCase):
+    def setUp(self):
+        self.ah = np.array([0.0012, 0.00125, 0.00118])
+        self.aw = np.array([0.0005, 0.00062, 0.00071])
+        self.mjd = np.array([55000.0, 55100.5, 55300.25])
+        self.lat = np.radians([48.1, -33.9, 78.9])
+        self.lon = np.radians([12.9, 18.4, 11.9])
+        self.height = np.array([666.0, 34.5, 87.4])
+        self.zd = np.radians([10.0, 60.0, 85.0])
+
+    def test_vmf1_ht(self):
+        mh, mw = troposphere_radio.vmf1_ht_mapping_function(
+            self.ah, self.aw, self.mjd, self.lat, self.height, self.zd
+        )
+        for obs in range(len(mh)):
+            expected = iers.vmf1_ht(
+                self.ah[obs], self.aw[obs], self.mjd[obs], self.lat[obs], self.height[obs], self.zd[obs]
+            )
+            np.testing.assert_allclose((mh[obs], mw[obs]), expected, rtol=1e-12)
+
+    def test_vmf1_coefficients(self):
+        mh, mw = troposphere_radio.vmf1_ht_mapping_function(
+            self.ah, self.aw, self.mjd, self.lat, self.height, self.zd
+        )
+        ah, aw = troposphere_radio._vmf1_coefficients(mh, mw, self.mjd, self.lat, self.height, self.zd)
+        np.testing.assert_allclose(ah, self.ah, rtol=1e-10)
+        np.testing.assert_allclose(aw, self.aw, rtol=1e-10)
+
+    def test_gmf(self):
+        zd_ref = troposphere_radio._REFERENCE_ZENITH_DISTANCE
+        for obs in range(len(self.mjd)):
+            args = self.mjd[obs], self.lat[obs], self.lon[obs], self.height[obs]
+            ah, aw = troposphere_radio._vmf1_coefficients(
+                *iers.gmf(*args, zd_ref), self.mjd[obs], self.lat[obs], self.height[obs], zd_ref
+            )
+            mh, mw = troposphere_radio.vmf1_ht_mapping_function(
+                ah, aw, self.mjd[obs], self.lat[obs], self.height[obs], self.zd[obs]
+            )
+            np.testing.assert_allclose((mh, mw), iers.gmf(*args, self.zd[obs]), rtol=1e-10)
+
+
+class TestGpt2GridValues(unittest.TestCase):
+    def setUp(self):
+        num_points = 36 * 72
+        mean = dict(p=100000.0, T=280.0, Q=0.005, dT=-0.0065, ah=0.0012, aw=0.0006)
+        self.grid = dict(spacing=5.0, undu=np.full(num_points, 40.0), Hs=np.full(num_points, 100.0))
+        for name, value in mean.items():
+            self.grid[name] = np.zeros((num_points, 5))
+            self.grid[name][:, 0] = value
+
+    def test_grid_height(self):
+        lat = np.radians([59.9, -89.9, 0.0])
+        lon = np.radians([10.7, 200.0, -0.1])
+        hell = np.full(3, 140.0)  # Ellipsoidal height of the grid
+        values = troposphere_radio.gpt2_grid_values(self.grid, np.full(3, 58000.0), lat, lon, hell)
+
+        np.testing.assert_allclose(values["p"], 1000.0)
+        np.testing.assert_allclose(values["T"], 280.0 - 273.15)
+        np.testing.assert_allclose(values["dT"], -6.5)
+        np.testing.assert_allclose(values["ah"], 0.0012)
+        np.testing.assert_allclose(values["undu"], 40.0)
+        np.testing.assert_allclose(values["e"], 0.005 * 1000.0 / (0.622 + 0.378 * 0.005))
+
+    def test_station_height(self):
+        values = troposphere_radio.gpt2_grid_values(self.grid, 58000.0, 1.0, 0.2, 1140.0)
+
+        np.testing.assert_allclose(values["T"], 280.0 - 0.0065 * 1000 - 273.15)
+        self.assertTrue(values["p"][0] < 1000.0)
+
+
+class TestGpt2wGridValues(unittest.TestCase):
+    def setUp(self):
+        num_points = 36 * 72
+        mean = dict(p=100000.0, T=280.0, Q=0.005, dT=-0.0065, Tm=270.0, la=2.5, ah=0.0012, aw=0.0006)
+        self.grid = dict(spacing=5.0, undu=np.full(num_points, 40.0), Hs=np.full(num_points, 100.0))
+        for name, value in mean.items():
+            self.grid[name] = np.zeros((num_points, 5))
+            self.grid[name][:, 0] = value
+
+        # Increase the water vapor decrease factor and the specific humidity towards the east
+        self.grid["la"][:, 0] += np.tile(np.arange(72), 36) * 0.01
+        self.grid["Q"][:, 0] += np.tile(np.arange(72), 36) * 1e-5
+
+    def test_station_height(self):
+        lat, lon, hell = np.radians(59.9), np.radians(10.7), 1140.0
+        values = troposphere_radio.gpt2_grid_values(self.grid, 58000.0, lat, lon, hell)
+
+        # The station is between the grid points at 7.5 and 12.5 degrees longitude, 1000 meters above the grid
+        weights = np.array([(12.5 - 10.7) / 5, (10.7 - 7.5) / 5])
+        la = 2.5 + np.array([1, 2]) * 0.01
+        Q = 0.005 + np.array([1, 2]) * 1e-5
+        p = 100000.0 * np.exp(-9.80665 * 28.965e-3 / (8.3143 * 280.0 * (1 + 0.6077 * Q)) * 1000.0) / 100
+        e = Q * 100000.0 / (0.622 + 0.378 * Q) / 100 * (100 * p / 100000.0) ** (la + 1)
+
+        np.testing.assert_allclose(values["la"], weights @ la, rtol=1e-12)
+        np.testing.assert_allclose(values["Tm"], 270.0, rtol=1e-12)
+        np.testing.assert_allclose(values["p"], weights @ p, rtol=1e-12)
+        np.testing.assert_allclose(values["e"], weights @ e, rtol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+""" Test :mod:`where.models.delay.vlbi_clock_correction`.
+
+The normal equations downdated for removed outliers are compared to normal equations set up from scratch.
+
+"""
+
+# Standard library imports
+from datetime import date
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.data.dataset import Dataset
+from where.estimation.normal_equations import NormalEquations
+from where.lib import cache
+from where.lib.time import Time
+from where.models.delay import vlbi_clock_correction
+
+STATIONS = ["NYALES20", "ONSALA60", "WETTZELL", "KOKEE"]
+
+
+class TestIncrementalClockFit(unittest.TestCase):
+    def setUp(self):
+        cache.clear()
+        rng = np.random.RandomState(2018)
+        num_obs = 200
+        baselines = np.array([rng.choice(len(STATIONS), 2, replace=False) for _ in range(num_obs)])
+        self.dset = Dataset(date(2018, 1, 2), "vlbi", "calculate", "XA", 0, empty=True, session="XA")
+        self.dset.num_obs = num_obs
+        self.dset.add_time("time", val=58120 + np.sort(rng.rand(num_obs)), scale="utc", format="mjd")
+        self.dset.add_text("station_1", val=[STATIONS[i] for i in baselines[:, 0]])
+        self.dset.add_text("station_2", val=[STATIONS[i] for i in baselines[:, 1]])
+        self.dset.add_float("residual", val=rng.randn(num_obs))
+
+        # Clock break for Onsala, Kokee is the reference clock
+        clock_break = Time(58120.5, scale="utc", format="mjd")
+        t_start, t_end = min(self.dset.time.utc), max(self.dset.time.utc) + 1
+        self.stations = ["ONSALA60", "ONSALA60", "NYALES20", "WETTZELL"]
+        self.time_intervals = [(t_start, clock_break), (clock_break, t_end), (t_start, t_end), (t_start, t_end)]
+
+    def tearDown(self):
+        cache.clear()
+
+    def _full_fit(self, terms):
+        A = vlbi_clock_correction.design_matrix(self.dset, self.stations, self.time_intervals, terms)
+        neq = NormalEquations(A.shape[1])
+        neq.add(A, self.dset.residual)
+        return A, neq
+
+    def test_incremental_equals_full_fit(self):
+        rng = np.random.RandomState(2019)
+        terms = 3
+        args = (self.dset, self.stations, self.time_intervals, terms)
+        A, neq = vlbi_clock_correction.incremental_normal_equations(*args)
+        np.testing.assert_allclose(neq.solve(), self._full_fit(terms)[1].solve(), rtol=0, atol=1e-9)
+
+        # Remove outliers twice, and change the residuals between the fits
+        for _ in range(2):
+            self.dset.subset(rng.rand(self.dset.num_obs) > 0.1)
+            self.dset.residual[:] = rng.randn(self.dset.num_obs)
+            A, neq = vlbi_clock_correction.incremental_normal_equations(*args)
+            A_full, neq_full = self._full_fit(terms)
+
+            np.testing.assert_allclose(A.toarray(), A_full.toarray(), rtol=0, atol=1e-12)
+            np.testing.assert_allclose(neq.N, neq_full.N, rtol=1e-12, atol=1e-9)
+            np.testing.assert_allclose(neq.solve(), neq_full.solve(), rtol=0, atol=1e-9)
+
+    def test_previous_fit_is_cleared_with_cache(self):
+        args = (self.dset, self.stations, self.time_intervals, 3)
+        vlbi_clock_correction.incremental_normal_equations(*args)
+        self.dset.subset(np.arange(self.dset.num_obs) % 2 == 0)
+
+        # A new session starts with a new fit, even if the dataset still has the observation numbers of the old fit
+        cache.clear()
+        A, neq = vlbi_clock_correction.incremental_normal_equations(*args)
+        np.testing.assert_equal(self.dset.clock_fit_obs, np.arange(self.dset.num_obs))
+        np.testing.assert_allclose(neq.N, self._full_fit(3)[1].N, rtol=1e-12, atol=1e-9)
+
+    def test_terms_in_previous_fit(self):
+        vlbi_clock_correction.incremental_normal_equations(self.dset, self.stations, self.time_intervals, 3)
+        self.dset.subset(np.arange(self.dset.num_obs) % 2 == 0)
+
+        # A fit with another number of terms does not use the previous fit
+        A, neq = vlbi_clock_correction.incremental_normal_equations(self.dset, self.stations, self.time_intervals, 2)
+        self.assertEqual(A.shape[1], len(self.stations) * 2)
+        np.testing.assert_allclose(neq.N, self._full_fit(2)[1].N, rtol=1e-12, atol=1e-9)
+
+    def test_previous_fit_size(self):
+        A, neq = vlbi_clock_correction.incremental_normal_equations(self.dset, self.stations, self.time_intervals, 3)
+        namespace = vlbi_clock_correction._clock_fit.cache_namespace
+        self.assertGreaterEqual(cache.info()[namespace].nbytes, neq.N.nbytes + A.data.nbytes)
+
+    def test_no_zero_partials(self):
+        # The partials of the higher terms are zero for the first observation
+        A = vlbi_clock_correction.design_matrix(self.dset, self.stations, self.time_intervals, 3)
+        self.assertEqual(A.nnz, np.count_nonzero(A.toarray()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,14 +23,12 @@ TODO:
 """
 # External library imports
 import numpy as np
-import os
 
 # Where imports
 from where import apriori
 from where.ext import iers_2010 as iers
 from where.ext import gpt2w as ext_gpt2w
 from where.lib import config
-from where.lib import files
 from where.lib import log
 from where.lib import plugins
 from where.lib.unit import unit
@@ -51,11 +49,12 @@ MAPPING_ZENITH_WET_RELATION = dict(gmf="none", gpt2="saastamoinen", gpt2w="askne
 # Default relation between used mapping function model and meteorological data
 MAPPING_METEO_RELATION = dict(gmf="gpt", gpt2="gpt2", gpt2w="gpt2w", vmf1_gridded="vmf1_gridded")
 
-# Cache for GPT2 model
-_GPT2 = dict()
+# Coefficients 'bw' and 'cw' of the VMF1 wet mapping function
+_VMF1_BW = 0.00146
+_VMF1_CW = 0.04391
 
-# Cache for GPT2W model
-_GPT2W = dict()
+# Zenith distance used to recover the GMF coefficients, see gmf_mapping_function
+_REFERENCE_ZENITH_DISTANCE = np.radians(85)
 
 
 @plugins.register
@@ -475,6 +474,11 @@ def gmf_mapping_function(dset):
     Use the 'gmf.f' Fortran routine from the IERS software library to calculate the Global Mapping Function (see
     Section 9.2 in :cite:`iers2010`), which are described in Boehm et al. :cite:`boehm2006b`.
 
+    The GMF uses the same continued fraction form as VMF1, with coefficients 'ah' and 'aw' depending only on time and
+    station position. Therefore 'gmf.f' is called once for each unique epoch and station position at a reference
+    zenith distance, and the mapping functions for all observations are calculated with
+    :func:`vmf1_ht_mapping_function` from the recovered coefficients.
+
     Args:
         dset (Dataset):    Model data.
 
@@ -488,16 +492,17 @@ def gmf_mapping_function(dset):
      mw                         Wet mapping function coefficient aw
     ============  ===========  =======================================================
     """
-    mh = np.empty(dset.num_obs)
-    mw = np.empty(dset.num_obs)
+    mjd = dset.time.utc.mjd
+    lat, lon, height = dset.site_pos.llh.T
 
-    for obs, _ in enumerate(dset.values()):
-        mjd = dset.time.utc.mjd[obs]
-        lat, lon, height = dset.site_pos.llh[obs]
-        zd = dset.site_pos.zenith_distance[obs]
-        mh[obs], mw[obs] = iers.gmf(mjd, lat, lon, height, zd)
+    idx, inverse = _unique_rows(mjd, lat, lon, height)
+    mh_ref = np.empty(len(idx))
+    mw_ref = np.empty(len(idx))
+    for row, obs in enumerate(idx):
+        mh_ref[row], mw_ref[row] = iers.gmf(mjd[obs], lat[obs], lon[obs], height[obs], _REFERENCE_ZENITH_DISTANCE)
+    ah, aw = _vmf1_coefficients(mh_ref, mw_ref, mjd[idx], lat[idx], height[idx], _REFERENCE_ZENITH_DISTANCE)
 
-    return mh, mw
+    return vmf1_ht_mapping_function(ah[inverse], aw[inverse], mjd, lat, height, dset.site_pos.zenith_distance)
 
 
 def gpt(dset):
@@ -520,18 +525,16 @@ def gpt(dset):
      geoid_undu    m            Geoid undulation (based on 9x9 EGM model)
     ============  ===========  =======================================================
     """
-    pressure = np.empty(dset.num_obs)
-    temperature = np.empty(dset.num_obs)
-    geoid_undu = np.empty(dset.num_obs)
-
-    # Note: For GPT2 and GPT2w linear interpolation is done between daily solutions. Here
-    #      it does not seem to be necessary, because the performance of GPT Fortran routine
-    #      is not so worse than for GPT2 and GPT2w.
+    mjd = dset.time.utc.mjd
+    lat, lon, height = dset.site_pos.llh.T
 
-    for obs, _ in enumerate(dset.values()):
-        mjd = dset.time.utc.mjd[obs]
-        lat, lon, height = dset.site_pos.llh[obs]
-        pressure[obs], temperature[obs], geoid_undu[obs] = iers.gpt(mjd, lat, lon, height)
+    # The GPT values are only calculated once for each unique epoch and station position, and shared by all
+    # observations at that epoch.
+    idx, inverse = _unique_rows(mjd, lat, lon, height)
+    output = np.empty((len(idx), 3))
+    for row, obs in enumerate(idx):
+        output[row] = iers.gpt(mjd[obs], lat[obs], lon[obs], height[obs])
+    pressure, temperature, geoid_undu = output[inverse].T
 
     return pressure, temperature, geoid_undu
 
@@ -559,29 +562,14 @@ def gpt2(dset):
      geoid_undu    m            Geoid undulation (based on 9x9 EGM model)
     ============  ===========  =======================================================
     """
-    press = np.empty(dset.num_obs)
-    temp = np.empty(dset.num_obs)
-    dt = np.empty(dset.num_obs)
-    e = np.empty(dset.num_obs)
-    ah = np.empty(dset.num_obs)
-    aw = np.empty(dset.num_obs)
-    mh = np.empty(dset.num_obs)
-    mw = np.empty(dset.num_obs)
-    undu = np.empty(dset.num_obs)
-
-    # Determine GPT2 values for each observation by interpolating between two unique
-    # daily solutions
-    for obs, _ in enumerate(dset.values()):
-        mjd = dset.time.utc.mjd[obs]
-        lat, lon, height = dset.site_pos.llh[obs]
-        zd = dset.site_pos.zenith_distance[obs]
+    mjd = dset.time.utc.mjd
+    lat, lon, height = dset.site_pos.llh.T
 
-        # Start 'gpt2.f' day-by-day in folder where 'gpt2_5.grd' is placed and carry out
-        # linear interpolation
-        press[obs], temp[obs], dt[obs], e[obs], ah[obs], aw[obs], undu[obs] = gpt2_wrapper(mjd, [lat], [lon], [height])
+    # Determine GPT2 values for each observation
+    press, temp, dt, e, ah, aw, undu = gpt2_wrapper(mjd, lat, lon, height)
 
-        # Determine mapping function values based on coefficients 'ah' and 'aw'
-        mh[obs], mw[obs] = iers.vmf1_ht(ah[obs], aw[obs], mjd, lat, height, zd)
+    # Determine mapping function values based on coefficients 'ah' and 'aw'
+    mh, mw = vmf1_ht_mapping_function(ah, aw, mjd, lat, height, dset.site_pos.zenith_distance)
 
     return press, temp, dt, e, mh, mw, undu
 
@@ -589,26 +577,18 @@ def gpt2(dset):
 def gpt2_wrapper(mjd, lat, lon, hell):
     """Calculates meteorological data and mapping function coefficients based on GPT2 model
 
-    The functions calls the IERS library routine 'gpt2.f' (see Section 9.2 in :cite:`iers2010`). The Fortran routine
-    ``gpt2.f`` reads the grid file ``gpt2_5.grd``, which should be available in the same folder, where the Fortran
-    programs runs. Therefore we change the current directory to the IERS source directory, so that 'gpt2.f' can read
-    the grid file.
-
-    Due to performance reasons the GPT2 values are not determined for each observation. The call of the Fortran routine
-    ``gpt2.f`` takes time, because the grid file ``gpt2_5.grd`` has to be read for each observation. Instead the GPT2
-    values are calculated only once for each unique day (modified Julian date rounded to integer) and saved in the
-    cache _GPT2. The final GPT2 values are computed by a linear interpolation of the daily determined GPT2 values. The
-    difference between the use of routine ``gpt2.f`` for each observation and the linear interpolation between daily
-    solution is on the submillimeter level and can therefore be neglected.
+    This is a vectorized port of the IERS library routine ``gpt2.f`` (see Section 9.2 in :cite:`iers2010`). The grid
+    file ``gpt2_5.grd`` is read once with the ``gpt2_grid`` parser, and the GPT2 values are evaluated for all
+    observations at once by :func:`gpt2_grid_values`.
 
     Args:
-        mjd (numpy.float64):  Modified Julian date.
-        lat (list):           Array with latitude for each station in [rad].
-        lon (list):           Array with longitude for each station in [rad].
-        hell (list):          Array with height for each station in [m].
+        mjd (numpy.ndarray):   Modified Julian date for each observation.
+        lat (numpy.ndarray):   Latitude for each observation in [rad].
+        lon (numpy.ndarray):   Longitude for each observation in [rad].
+        hell (numpy.ndarray):  Ellipsoidal height for each observation in [m].
 
     Returns:
-        numpy.ndarray:  Array with following entries:
+        numpy.ndarray:  Array with shape (7, num_obs) with following entries:
 
     =======  ===========  =======================================================
      Index    Unit         Description
@@ -622,31 +602,12 @@ def gpt2_wrapper(mjd, lat, lon, hell):
      [6]      m            Geoid undulation (based on 9x9 EGM model)
     =======  ===========  =======================================================
     """
-    nstat = len(lat)  # Number of stations
-    it = 0  # Use of time variations (annual and semiannual terms)
-
     if not (len(lat) == len(lon) == len(hell)):
         log.fatal("Length of latitude, longitude and ellipsoidal height array is not equal.")
 
-    # TODO: Case not handled if several stations are included in Dataset. Is that the case for VLBI?
-
-    # Change directory so that gpt2.f can read the gpt2_5.grd-file in the IERS source directory
-    current_dir = os.getcwd()
-    os.chdir(files.path(iers.__name__))
-
-    # Loop over all unique dates (rounded to integer value)
-    for date in _rounded_dates(mjd):
+    values = gpt2_grid_values(apriori.get("gpt2_grid"), mjd, lat, lon, hell)
 
-        # Check if date is already included in cache
-        if date not in _GPT2:
-            _GPT2[date] = np.array(iers.gpt2(date, lat, lon, hell, nstat, it)).reshape(-1)
-    os.chdir(current_dir)
-
-    # Linear interpolation between two daily GPT2 solutions
-    mjd_int, mjd_frac = divmod(mjd, 1)
-    output = _GPT2[mjd_int] + mjd_frac * (_GPT2[mjd_int + 1] - _GPT2[mjd_int])
-
-    return output
+    return np.array([values[v] for v in ("p", "T", "dT", "e", "ah", "aw", "undu")])
 
 
 def gpt2w(dset):
@@ -674,33 +635,14 @@ def gpt2w(dset):
      geoid_undu    m            Geoid undulation (based on 9x9 EGM model)
     ============  ===========  =======================================================
     """
-    press = np.empty(dset.num_obs)
-    temp = np.empty(dset.num_obs)
-    dt = np.empty(dset.num_obs)
-    tm = np.empty(dset.num_obs)
-    e = np.empty(dset.num_obs)
-    ah = np.empty(dset.num_obs)
-    aw = np.empty(dset.num_obs)
-    mh = np.empty(dset.num_obs)
-    mw = np.empty(dset.num_obs)
-    la = np.empty(dset.num_obs)
-    undu = np.empty(dset.num_obs)
-
-    # Determine GPT2W values for each observation by interpolating between two unique
-    # daily solutions
-    for obs, _ in enumerate(dset.values()):
-        mjd = dset.time.utc.mjd[obs]
-        lat, lon, height = dset.site_pos.llh[obs]
-        zd = dset.site_pos.zenith_distance[obs]
-
-        # Start 'gpt2.f' day-by-day in folder where 'gpt2_5.grd' is placed and carry out
-        # linear interpolation
-        (press[obs], temp[obs], dt[obs], tm[obs], e[obs], ah[obs], aw[obs], la[obs], undu[obs]) = gpt2w_wrapper(
-            mjd, [lat], [lon], [height]
-        )
+    mjd = dset.time.utc.mjd
+    lat, lon, height = dset.site_pos.llh.T
+
+    # Determine GPT2W values for each observation
+    press, temp, dt, tm, e, ah, aw, la, undu = gpt2w_wrapper(mjd, lat, lon, height)
 
-        # Determine mapping function values based on coefficients 'ah' and 'aw'
-        mh[obs], mw[obs] = iers.vmf1_ht(ah[obs], aw[obs], mjd, lat, height, zd)
+    # Determine mapping function values based on coefficients 'ah' and 'aw'
+    mh, mw = vmf1_ht_mapping_function(ah, aw, mjd, lat, height, dset.site_pos.zenith_distance)
 
     return press, temp, dt, tm, e, mh, mw, la, undu
 
@@ -708,26 +650,18 @@ def gpt2w(dset):
 def gpt2w_wrapper(mjd, lat, lon, hell):
     """Calculates meteorological data and mapping function coefficients based on GPT2w model
 
-    The functions calls the GPT2w library routine ``gpt2w_1w.f`` (see
-    http://ggosatm.hg.tuwien.ac.at/DELAY/SOURCE/GPT2w). The Fortran routine ``gpt2w_1w.f`` reads the grid file
-    ``gpt2_1wA.grd``, which should be available in the same folder, where the Fortran programs runs. Therefore we
-    change the current directory to the GPT2w source directory, so that ``gpt2w_1w.f`` can read the grid file.
-
-    Due to performance reasons the GPT2w values are not determined for each observation. The call of the Fortran
-    routine ``gpt2w_1w.f`` takes time, because the grid file ``gpt2_1wA.grd`` has to be read for each
-    observation. Instead the GPT2w values are calculated only once for each unique day (modified Julian date rounded to
-    integer) and saved in the cache _GPT2W. The final GPT2W values are computed by a linear interpolation of the daily
-    determined GPT2W values.  The difference between the use of routine ``gpt2w_1w.f`` for each observation and the
-    linear interpolation between daily solution is on the submillimeter level and can therefore be neglected.
+    This is a vectorized port of the GPT2w library routine ``gpt2_1w.f`` (see
+    http://ggosatm.hg.tuwien.ac.at/DELAY/SOURCE/GPT2w). The grid file ``gpt2_1wA.grd`` is read once with the
+    ``gpt2_grid`` parser, and the GPT2w values are evaluated for all observations at once by :func:`gpt2_grid_values`.
 
     Args:
-        mjd (numpy.float64):  Modified Julian date.
-        lat (list):           Array with latitude for each station in [rad].
-        lon (list):           Array with longitude for each station in [rad].
-        hell (list):          Array with height for each station in [m].
+        mjd (numpy.ndarray):   Modified Julian date for each observation.
+        lat (numpy.ndarray):   Latitude for each observation in [rad].
+        lon (numpy.ndarray):   Longitude for each observation in [rad].
+        hell (numpy.ndarray):  Ellipsoidal height for each observation in [m].
 
     Returns:
-        numpy.ndarray:  Array with following entries:
+        numpy.ndarray:  Array with shape (9, num_obs) with following entries:
 
     =======  ===========  =======================================================
      Index    Unit         Description
@@ -743,31 +677,98 @@ def gpt2w_wrapper(mjd, lat, lon, hell):
      [8]      m            Geoid undulation (based on 9x9 EGM model)
     =======  ===========  =======================================================
     """
-    nstat = len(lat)  # Number of stations
-    it = 0  # Use of time variations (annual and semiannual terms)
-
-    # TODO: Case not handled if several stations are included in Dateset. Is that the case for VLBI?
-
     if not (len(lat) == len(lon) == len(hell)):
         log.fatal("Length of latitude, longitute and ellipsoidal height array is not equal.")
 
-    # Change directory so that gpt2w.f can read the gpt2_5.grd-file in the GPT2w source directory
-    current_dir = os.getcwd()
-    os.chdir(files.path(ext_gpt2w.__name__))
+    values = gpt2_grid_values(apriori.get("gpt2w_grid"), mjd, lat, lon, hell)
 
-    # Loop over all unique dates (rounded to integer value)
-    for date in _rounded_dates(mjd):
+    return np.array([values[v] for v in ("p", "T", "dT", "Tm", "e", "ah", "aw", "la", "undu")])
 
-        # Check if date is already included in cache
-        if date not in _GPT2W:
-            _GPT2W[date] = np.array(ext_gpt2w.gpt2_1w(date, lat, lon, hell, nstat, it)).reshape(-1)
-    os.chdir(current_dir)
 
-    # Linear interpolation between two daily GPT2W solutions
-    mjd_int, mjd_frac = divmod(mjd, 1)
-    output = _GPT2W[mjd_int] + mjd_frac * (_GPT2W[mjd_int + 1] - _GPT2W[mjd_int])
+def gpt2_grid_values(grid, mjd, lat, lon, hell):
+    """Evaluate the GPT2 or GPT2w grid for each observation
 
-    return output
+    Follows the Fortran routines ``gpt2.f`` and ``gpt2_1w.f`` with time variations (annual and semiannual terms)
+    included. For each observation the four surrounding grid points are evaluated at the station height, and the values
+    are interpolated bilinearly. Near the poles the nearest grid point is used.
+
+    Args:
+        grid (dict):           Grid data as read by the ``gpt2_grid`` parser.
+        mjd (numpy.ndarray):   Modified Julian date for each observation.
+        lat (numpy.ndarray):   Latitude for each observation in [rad].
+        lon (numpy.ndarray):   Longitude for each observation in [rad].
+        hell (numpy.ndarray):  Ellipsoidal height for each observation in [m].
+
+    Returns:
+        dict:  Arrays with pressure 'p' in [hPa], temperature 'T' in [Celsius], temperature lapse rate 'dT' in
+               [degree/km], water vapor pressure 'e' in [hPa], mapping function coefficients 'ah' and 'aw' and geoid
+               undulation 'undu' in [m]. For the GPT2w grid also the mean temperature of the water vapor 'Tm' in [K]
+               and the water vapor decrease factor 'la'.
+    """
+    gm = 9.80665  # Mean gravity in [m/s**2]
+    dMtr = 28.965e-3  # Molar mass of dry air in [kg/mol]
+    Rg = 8.3143  # Universal gas constant in [J/K/mol]
+
+    mjd, lat, lon, hell = (np.atleast_1d(v).astype(float) for v in (mjd, lat, lon, hell))
+    spacing = grid["spacing"]
+    num_lat, num_lon = int(round(180 / spacing)), int(round(360 / spacing))
+
+    # Annual and semiannual terms, referred to 2000 January 1.5
+    doy_angle = (mjd - 51544.5) / 365.25 * 2 * np.pi
+    time_terms = np.column_stack(
+        (np.ones(len(mjd)), np.cos(doy_angle), np.sin(doy_angle), np.cos(2 * doy_angle), np.sin(2 * doy_angle))
+    )
+
+    # Polar distance and positive longitude in degrees, and the (1-based) indices of the nearest grid point
+    ppod = np.degrees(np.pi / 2 - lat)
+    plon = np.degrees(np.mod(lon, 2 * np.pi))
+    ipod = np.floor((ppod + spacing) / spacing).astype(int)
+    ilon = np.floor((plon + spacing) / spacing).astype(int)
+
+    # Normalized differences to the nearest grid point, can be positive or negative
+    diffpod = (ppod - (ipod * spacing - spacing / 2)) / spacing
+    difflon = (plon - (ilon * spacing - spacing / 2)) / spacing
+    ipod = np.minimum(ipod, num_lat)
+    ilon = np.mod(ilon - 1, num_lon) + 1
+
+    # Grid points along the same longitude, the same polar distance and diagonally
+    ipod1 = np.clip(ipod + np.where(diffpod >= 0, 1, -1), 1, num_lat)
+    ilon1 = np.mod(ilon + np.where(difflon >= 0, 1, -1) - 1, num_lon) + 1
+    idx = np.column_stack((ipod, ipod1, ipod, ipod1)) - 1
+    idx = idx * num_lon + np.column_stack((ilon, ilon, ilon1, ilon1)) - 1
+
+    # Bilinear interpolation weights. Near the poles only the nearest grid point is used.
+    bilinear = (ppod > spacing / 2) & (ppod < 180 - spacing / 2)
+    dnpod1 = np.where(bilinear, np.abs(diffpod), 0)
+    dnlon1 = np.where(bilinear, np.abs(difflon), 0)
+    dnpod2, dnlon2 = 1 - dnpod1, 1 - dnlon1
+    weights = np.column_stack((dnpod2 * dnlon2, dnpod1 * dnlon2, dnpod2 * dnlon1, dnpod1 * dnlon1))
+
+    def evaluate(name):
+        """Value of a parameter at each of the four grid points, including time variations"""
+        return np.einsum("ijk,ik->ij", grid[name][idx], time_terms)
+
+    # Reduction from grid height to station height, where the station height is transformed to orthometric height
+    undu = grid["undu"][idx]
+    redh = hell[:, None] - undu - grid["Hs"][idx]
+    p0 = evaluate("p")
+    T0 = evaluate("T")
+    Q = evaluate("Q")
+    dT = evaluate("dT")
+    Tv = T0 * (1 + 0.6077 * Q)  # Virtual temperature in [K]
+    p = p0 * np.exp(-gm * dMtr / (Rg * Tv) * redh) / 100
+    corners = dict(p=p, T=T0 + dT * redh - 273.15, dT=dT * 1000, ah=evaluate("ah"), aw=evaluate("aw"), undu=undu)
+
+    # Water vapor pressure at each grid point. For GPT2w it is reduced from the grid height with the water vapor
+    # decrease factor (see gpt2_1w.f), for GPT2 it follows from the specific humidity and the reduced pressure.
+    if "la" in grid:
+        la = evaluate("la")
+        e0 = Q * p0 / (0.622 + 0.378 * Q) / 100
+        corners.update(e=e0 * (100 * p / p0) ** (la + 1), Tm=evaluate("Tm"), la=la)
+    else:
+        corners.update(e=Q * p / (0.622 + 0.378 * Q))
+
+    return {name: np.sum(weights * value, axis=1) for name, value in corners.items()}
 
 
 def pressure_zhd(zhd, latitude, height):
@@ -1034,31 +1035,108 @@ def vmf1_mapping_function(dset):
     # Get gridded VMF1 data
     vmf1 = apriori.get("vmf1", time=dset.time)
 
-    mh = np.empty(dset.num_obs)
-    mw = np.empty(dset.num_obs)
+    lat, lon, height = dset.site_pos.llh.T
+    # Interpolation in time and space in VMF1 grid
+    # TODO vlbi t_2
+    # if dset._default_field_suffix == '_2':
+    # baseline_gcrs = dset.site_pos_2.gcrs - dset.site_pos_1.gcrs
+    # delta_t = (dset.src_dir.unit_vector[:, None, :] @ baseline_gcrs[:, :, None])[:, 0, 0] / constant.c
+    # t -= timedelta(seconds=delta_t)
+    ah = vmf1["ah"](dset.time, lon, lat) * 1e-8
+    aw = vmf1["aw"](dset.time, lon, lat) * 1e-8
 
-    for obs, _ in enumerate(dset.values()):
-        lat, lon, height = dset.site_pos.llh[obs]
-        # Interpolation in time and space in VMF1 grid
-        t = dset.time[obs]
-        # TODO vlbi t_2
-        # if dset._default_field_suffix == '_2':
-        # baseline_gcrs = dset.site_pos_2.gcrs - dset.site_pos_1.gcrs
-        # delta_t = (dset.src_dir.unit_vector[:, None, :] @ baseline_gcrs[:, :, None])[:, 0, 0] / constant.c
-
-        # t -= timedelta(seconds=delta_t[obs])
-        mh[obs], mw[obs] = iers.vmf1_ht(
-            vmf1["ah"](t, lon, lat) * 1e-8,
-            vmf1["aw"](t, lon, lat) * 1e-8,
-            dset.time.utc.mjd_int[obs],
-            lat,
-            height,
-            dset.site_pos.zenith_distance[obs],
-        )
+    return vmf1_ht_mapping_function(ah, aw, dset.time.utc.mjd_int, lat, height, dset.site_pos.zenith_distance)
+
+
+def vmf1_ht_mapping_function(ah, aw, mjd, latitude, height, zenith_distance):
+    """Calculates VMF1 hydrostatic and wet mapping functions for given coefficients
+
+    Vectorized port of the 'vmf1_ht.f' routine from the IERS software library :cite:`iers2010`. The hydrostatic
+    mapping function includes the height correction by Niell (1996). The same continued fraction form is
+    used by the GMF, GPT2 and GPT2w models, which only differ in how the coefficients 'ah' and 'aw' are determined.
+
+    Args:
+        ah (numpy.ndarray):               Hydrostatic mapping function coefficient for each observation
+        aw (numpy.ndarray):               Wet mapping function coefficient for each observation
+        mjd (numpy.ndarray):              Modified Julian date for each observation
+        latitude (numpy.ndarray):         Geodetic latitude for each observation in [rad]
+        height (numpy.ndarray):           Ellipsoidal height for each observation in [m]
+        zenith_distance (numpy.ndarray):  Zenith distance for each observation in [rad]
+
+    Returns:
+        tuple of Numpy Arrays: Hydrostatic and wet mapping function values for each observation
+    """
+    sine = np.sin(np.pi / 2 - zenith_distance)
+    bh, ch = _vmf1_hydrostatic_bc(mjd, latitude)
+
+    mh = _continued_fraction(ah, bh, ch, sine) + _height_correction(sine, height)
+    mw = _continued_fraction(aw, _VMF1_BW, _VMF1_CW, sine)
 
     return mh, mw
 
 
+def _vmf1_coefficients(mh, mw, mjd, latitude, height, zenith_distance):
+    """Calculates the VMF1 coefficients 'ah' and 'aw' reproducing given mapping function values
+
+    This is the inverse of :func:`vmf1_ht_mapping_function`. Solving the continued fraction for the coefficient
+    :math:`a` gives :math:`a = (1 - m s) / (m g - k)`, with :math:`s` the sine of the elevation, :math:`g = 1 / (s +
+    b / (s + c))` and :math:`k = 1 / (1 + b / (1 + c))`.
+
+    Args:
+        mh (numpy.ndarray):               Hydrostatic mapping function value for each observation
+        mw (numpy.ndarray):               Wet mapping function value for each observation
+        mjd (numpy.ndarray):              Modified Julian date for each observation
+        latitude (numpy.ndarray):         Geodetic latitude for each observation in [rad]
+        height (numpy.ndarray):           Ellipsoidal height for each observation in [m]
+        zenith_distance (numpy.ndarray):  Zenith distance for each observation in [rad]
+
+    Returns:
+        tuple of Numpy Arrays: Hydrostatic and wet mapping function coefficients for each observation
+    """
+    sine = np.sin(np.pi / 2 - zenith_distance)
+    bh, ch = _vmf1_hydrostatic_bc(mjd, latitude)
+
+    def coefficient(m, b, c):
+        return (1 - m * sine) / (m / (sine + b / (sine + c)) - 1 / (1 + b / (1 + c)))
+
+    ah = coefficient(mh - _height_correction(sine, height), bh, ch)
+    aw = coefficient(mw, _VMF1_BW, _VMF1_CW)
+
+    return ah, aw
+
+
+def _vmf1_hydrostatic_bc(mjd, latitude):
+    """Coefficients 'bh' and 'ch' of the VMF1 hydrostatic mapping function, see 'vmf1_ht.f'
+
+    Args:
+        mjd (numpy.ndarray):       Modified Julian date for each observation
+        latitude (numpy.ndarray):  Geodetic latitude for each observation in [rad]
+
+    Returns:
+        tuple: Coefficient 'bh' and array with coefficient 'ch' for each observation
+    """
+    doy = mjd - 44239 + 1 - 28  # Reference day is 28 January
+    southern = np.asarray(latitude) < 0
+    phh = np.where(southern, np.pi, 0)
+    c11h = np.where(southern, 0.007, 0.005)
+    c10h = np.where(southern, 0.002, 0.001)
+    ch = 0.062 + ((np.cos(doy / 365.25 * 2 * np.pi + phh) + 1) * c11h / 2 + c10h) * (1 - np.cos(latitude))
+
+    return 0.0029, ch
+
+
+def _continued_fraction(a, b, c, sine):
+    """Continued fraction form of the mapping functions normalized to unity at zenith"""
+    topcon = 1 + a / (1 + b / (1 + c))
+    return topcon / (sine + a / (sine + b / (sine + c)))
+
+
+def _height_correction(sine, height):
+    """Height correction of the hydrostatic mapping function after Niell, see 'vmf1_ht.f'"""
+    a_ht, b_ht, c_ht = 2.53e-5, 5.49e-3, 1.14e-3
+    return (1 / sine - _continued_fraction(a_ht, b_ht, c_ht, sine)) * height * unit.m2km
+
+
 def vmf1_zenith_wet_delay(dset):
     """Calculates zenith wet delay based on gridded zenith wet delays from VMF1
 
@@ -1084,17 +1162,15 @@ def vmf1_zenith_wet_delay(dset):
     return zwd
 
 
-def _rounded_dates(datetimes):
-    """Calculate days including the given datetimes
+def _unique_rows(*columns):
+    """Find unique rows of the given columns
 
     Args:
-        datetimes (numpy.float64):   np.array with datetimes as floats
+        columns (numpy.ndarray):   Arrays of equal length.
 
     Returns:
-        numpy.ndarray:  Unique days representing the datetimes.
-
-    Example:
-        >>> _rounded_dates(np.array([54001.2, 54001.4, 54001.8, 54002, 54005.5, 54006.]))
-        array([ 54001.,  54002.,  54003.,  54005.,  54006.,  54007.])
+        tuple of Numpy Arrays: Index of the first occurrence of each unique row, and the index of the unique row for
+                               each element in the columns.
     """
-    return np.unique(np.hstack((np.floor(datetimes), np.floor(datetimes) + 1)))
+    _, idx, inverse = np.unique(np.column_stack(columns), axis=0, return_index=True, return_inverse=True)
+    return idx, inverse.reshape(-1)
@@ -15,8 +15,11 @@ clock break.
 """
 # External library imports
 import numpy as np
+import scipy.sparse
 
 # Where imports
+from where.estimation.normal_equations import NormalEquations
+from where.lib import cache
 from where.lib import config
 from where.lib import log
 from where.lib import plugins
@@ -62,28 +65,16 @@ def clock_correction(dset):
     ]
     dset.meta["num_clock_coeff"] = num_coefficients
 
-    # Set up matrices for estimation
-    A = np.zeros((dset.num_obs, num_coefficients, 1))
+    # Set up the normal equations, only the non-zero part of the normal matrix is inverted
+    if config.tech.get("incremental", section=MODEL, default=False).bool:
+        A, neq = incremental_normal_equations(dset, stations, time_intervals, terms)
+    else:
+        A = design_matrix(dset, stations, time_intervals, terms)
+        neq = NormalEquations(num_coefficients)
+        neq.add(A, dset.residual)
+    N = neq.N
+    idx = A.getnnz(axis=0) > 0
 
-    # Time coefficients, used when setting up A
-    t = dset.time.utc.mjd - dset.time.utc[0].mjd
-    poly = np.array([t ** n for n in range(terms)]).T
-
-    # Set up the A matrix with time coefficients
-    for idx, (station, (t_start, t_end)) in enumerate(zip(stations, time_intervals)):
-        filter_time = np.logical_and(t_start.utc.mjd <= dset.time.utc.mjd, dset.time.utc.mjd < t_end.utc.mjd)
-        filter_1 = np.logical_and(dset.filter(station_1=station), filter_time)
-        A[filter_1, idx * terms : (idx + 1) * terms, 0] = poly[filter_1]
-        filter_2 = np.logical_and(dset.filter(station_2=station), filter_time)
-        A[filter_2, idx * terms : (idx + 1) * terms, 0] = -poly[filter_2]
-
-    # Calculate normal matrix N and the moment vector U
-    U = np.sum(A @ dset.residual[:, None, None], axis=0)
-    N = np.sum(A @ A.transpose(0, 2, 1), axis=0)
-
-    # Invert the normal matrix to find corrections, only the non-zero part of the matrix is inverted
-    idx = np.logical_not(U == 0)[:, 0]
-    X = np.zeros((num_coefficients, 1))
     det = np.linalg.det(N[idx, :][:, idx])
     threshold = 1e-12
     if np.abs(det) < threshold:
@@ -97,15 +88,132 @@ def clock_correction(dset):
             if np.max(np.abs(row)) < threshold * 10 ** 3:
                 log.error("{} linearly dependent (max_row = {})".format(param_names[i], np.max(np.abs(row))))
     try:
-        X[idx] = np.linalg.inv(N[idx, :][:, idx]) @ U[idx]
+        X = neq.solve(idx)
     except np.linalg.LinAlgError:
         log.fatal("Singular matrix in vlbi_clock_correction")
 
     # Calculate final corrections
-    output += (A.transpose(0, 2, 1) @ X)[:, 0, 0]
+    output += A @ X
     return output
 
 
+def incremental_normal_equations(dset, stations, time_intervals, terms):
+    """Set up the normal equations by downdating the normal equations of the previous call
+
+    In the calculate stage the clock polynomials are fitted again after outliers are removed from the dataset. Instead
+    of setting up the normal equations from scratch, the contribution of the removed observations is subtracted from
+    the normal matrix of the previous fit. The rows of the observations in the design matrix of the first fit are kept
+    track of in the dataset field `clock_fit_obs`. The previous fit is looked up by the dataset and the clock
+    parameters, and is stored in the cache after each fit so that it is cleared when a new session starts. The normal
+    equations are set up from scratch if there is no previous fit.
+
+    Args:
+        dset (Dataset):          A Dataset containing model data.
+        stations (List):         Names of stations, one for each time interval.
+        time_intervals (List):   Tuples with start and end time of each clock polynomial.
+        terms (Int):             Number of terms in each clock polynomial.
+
+    Returns:
+        Tuple: Design matrix of the current observations and the normal equations.
+    """
+    # The first and last time interval boundaries follow the observations, the others are clock breaks
+    boundaries = sorted({t.utc.mjd for interval in time_intervals for t in interval})
+    key = (
+        dset.rundate,
+        dset.vars.get("session"),
+        dset.vars.get("stage"),
+        dset.dataset_name,
+        tuple(stations),
+        tuple(boundaries[1:-1]),
+        terms,
+    )
+    clock_fit = _clock_fit(*key)
+    if clock_fit is not None and "clock_fit_obs" in dset.fields:
+        obs = dset.clock_fit_obs.astype(int)
+        in_fit = np.zeros(len(clock_fit["in_fit"]), dtype=bool)
+        in_fit[obs] = True
+        removed = clock_fit["in_fit"] & ~in_fit
+
+        A_fit = clock_fit["A"]
+        A = A_fit[obs]
+        neq = clock_fit["neq"]
+        neq.remove(A_fit[removed], np.zeros(np.sum(removed)))
+        neq.set_observations(A, dset.residual)
+        log.debug("Downdated clock normal equations with {} removed observations", np.sum(removed))
+    else:
+        A = A_fit = design_matrix(dset, stations, time_intervals, terms)
+        neq = NormalEquations(A.shape[1])
+        neq.add(A, dset.residual)
+        in_fit = np.ones(dset.num_obs, dtype=bool)
+        if "clock_fit_obs" in dset.fields:
+            dset.clock_fit_obs[:] = np.arange(dset.num_obs)
+        else:
+            dset.add_float("clock_fit_obs", val=np.arange(dset.num_obs), write_level="detail")
+
+    # Store the finished fit, so that the cache knows the size of the design matrix and normal equations
+    _clock_fit.cache_set(dict(A=A_fit, neq=neq, in_fit=in_fit), *key)
+    return A, neq
+
+
+@cache.function
+def _clock_fit(rundate, session, stage, dataset_name, stations, clock_breaks, terms):
+    """Look up the previous clock fit of a dataset, used in incremental mode
+
+    Returns None the first time a dataset is fitted. The fits are stored with `_clock_fit.cache_set` by
+    :func:`incremental_normal_equations`.
+
+    Args:
+        rundate (Date):          The model run date.
+        session (String):        Name of session.
+        stage (String):          Name of stage.
+        dataset_name (String):   Name of dataset.
+        stations (Tuple):        Names of stations, one for each time interval.
+        clock_breaks (Tuple):    Times of the clock breaks as MJD.
+        terms (Int):             Number of terms in each clock polynomial.
+
+    Returns:
+        Dict: Design matrix, normal equations and observations of the previous fit, or None.
+    """
+    return None
+
+
+def design_matrix(dset, stations, time_intervals, terms):
+    """Set up the design matrix of the clock polynomials
+
+    Each observation depends on the clock polynomial of station 1 and station 2 in the time interval containing the
+    observation, so the design matrix is stored as a sparse matrix with at most 2 * terms non-zero elements per row.
+
+    Args:
+        dset (Dataset):          A Dataset containing model data.
+        stations (List):         Names of stations, one for each time interval.
+        time_intervals (List):   Tuples with start and end time of each clock polynomial.
+        terms (Int):             Number of terms in each clock polynomial.
+
+    Returns:
+        Sparse matrix: Partial derivatives of the observations with respect to the clock coefficients.
+    """
+    # Time coefficients, used when setting up A
+    mjd = dset.time.utc.mjd
+    t = mjd - dset.time.utc[0].mjd
+    poly = np.array([t ** n for n in range(terms)]).T
+
+    rows, cols, values = list(), list(), list()
+    for idx, (station, (t_start, t_end)) in enumerate(zip(stations, time_intervals)):
+        filter_time = np.logical_and(t_start.utc.mjd <= mjd, mjd < t_end.utc.mjd)
+        for field, sign in (("station_1", 1), ("station_2", -1)):
+            obs = np.flatnonzero(np.logical_and(dset.filter(**{field: station}), filter_time))
+            rows.append(np.repeat(obs, terms))
+            cols.append(np.tile(np.arange(idx * terms, (idx + 1) * terms), len(obs)))
+            values.append(sign * poly[obs].ravel())
+
+    # Partials that are zero, like the time of the first observation, are not stored, so that parameters without any
+    # non-zero partials can be found by counting the non-zero elements of each column
+    shape = (dset.num_obs, len(stations) * terms)
+    A = scipy.sparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=shape)
+    A.eliminate_zeros()
+    return A
+
+
 def parse_clock_breaks(dset, clock_breaks):
     """Parses the clock breaks string from the edit file
 
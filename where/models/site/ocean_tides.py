@@ -28,8 +28,12 @@ References:
 
 
 """
+# Standard library imports
+from datetime import datetime, timedelta
+
 # External library imports
 import numpy as np
+from scipy import interpolate
 
 # Where imports
 from where import apriori
@@ -38,6 +42,16 @@ from where.lib import config
 from where.lib import log
 from where.lib import plugins
 
+# Sampling interval in seconds of the HARDISP time grid, and number of samples before and after the epochs
+HARDISP_SAMPLING = 300
+HARDISP_MARGIN = 3
+
+# Maximal number of samples returned by HARDISP in one call
+HARDISP_MAX_SAMPLES = 600
+
+# Zero point of Modified Julian Dates
+MJD_ZERO = datetime(1858, 11, 17)
+
 
 @plugins.register
 def ocean_tides(dset):
@@ -85,27 +99,82 @@ def ocean_tides_station(dset, amplitudes, phases):
     denu = np.zeros((dset.num_obs, 3))
     use_cmc = config.tech.ocean_tides_cmc.bool
 
-    # Calculate correction
-    for obs, (site_id,) in enumerate(dset.values("site_id")):
+    # Calculate correction in topocentric (east, north, up) coordinates for all observations of each site
+    for site_id in dset.unique("site_id"):
         if site_id not in amplitudes:
             continue
 
-        epoch = [float(t) for t in dset.time.utc[obs].yday.split(":")]
-        dup, dsouth, dwest = iers.hardisp(epoch, amplitudes[site_id], phases[site_id], 1, 1.0)
-
-        # Correction in topocentric (east, north, up) coordinates
-        denu[obs] = np.array([-dwest[0], -dsouth[0], dup[0]])
+        idx = dset.filter(site_id=site_id)
+        denu[idx] = hardisp_displacement(dset.time.utc.mjd[idx], amplitudes[site_id], phases[site_id])
 
     dxyz = dset.site_pos.convert_enu_to_itrs(denu)
 
     # Center of mass corrections
     if use_cmc:
         coeff_cmc = apriori.get("ocean_tides_cmc")
-        in_phase = coeff_cmc["in_phase"]
-        cross_phase = coeff_cmc["cross_phase"]
-        for obs, time in enumerate(dset.time.utc):
-            year, doy = time.datetime.year, float(time.datetime.strftime("%j")) + time.mjd_frac
-            angle = iers.arg2(year, doy)[:, None]
-            dxyz[obs] += np.sum(in_phase * np.cos(angle) + cross_phase * np.sin(angle), axis=0)
+        angle = tidal_arguments(dset.time.utc.mjd)
+        dxyz += np.cos(angle) @ coeff_cmc["in_phase"] + np.sin(angle) @ coeff_cmc["cross_phase"]
 
     return dset.site_pos.convert_itrs_to_gcrs(dxyz)
+
+
+def hardisp_displacement(mjd, amplitudes, phases):
+    """Calculate the ocean tidal loading displacement of a site for many epochs
+
+    The HARDISP routine interpolates the admittance of the 11 given constituents to 342 tidal harmonics and sums the
+    harmonics recursively on a regular time grid. Instead of calling HARDISP for every epoch, it is called once for a
+    time grid with spacing `HARDISP_SAMPLING` covering all epochs, and the displacements are interpolated to the epochs
+    with a cubic spline. The tidal periods are longer than 12 hours, so the interpolation error is well below 1 micron.
+
+    Args:
+        mjd (numpy.ndarray):         Epochs as Modified Julian Dates in UTC.
+        amplitudes (numpy.ndarray):  Amplitudes of the 11 constituents in BLQ-format, shape (3, 11).
+        phases (numpy.ndarray):      Phases of the 11 constituents in BLQ-format, shape (3, 11).
+
+    Returns:
+        Numpy array with displacements in topocentric (east, north, up) coordinates in meters, shape (len(mjd), 3).
+    """
+    # Start the time grid at a whole second before the first epoch, since HARDISP only accepts whole seconds
+    start_seconds = np.floor(np.min(mjd) * 86400) - HARDISP_MARGIN * HARDISP_SAMPLING
+    seconds = mjd * 86400 - start_seconds
+    num_samples = int(np.ceil(np.max(seconds) / HARDISP_SAMPLING)) + HARDISP_MARGIN + 1
+    start = MJD_ZERO + timedelta(seconds=start_seconds)
+
+    # HARDISP returns at most HARDISP_MAX_SAMPLES samples in each call
+    samples = np.empty((num_samples, 3))
+    for first in range(0, num_samples, HARDISP_MAX_SAMPLES):
+        num = min(HARDISP_MAX_SAMPLES, num_samples - first)
+        dt = start + timedelta(seconds=first * HARDISP_SAMPLING)
+        epoch = [dt.year, dt.timetuple().tm_yday, dt.hour, dt.minute, dt.second]
+        dup, dsouth, dwest = iers.hardisp(epoch, amplitudes, phases, num, float(HARDISP_SAMPLING))
+        samples[first : first + num] = np.column_stack((-dwest[:num], -dsouth[:num], dup[:num]))
+
+    return interpolate.CubicSpline(np.arange(num_samples) * HARDISP_SAMPLING, samples)(seconds)
+
+
+def tidal_arguments(mjd):
+    """Calculate the angular arguments of the 11 main tidal constituents for many epochs
+
+    Within a day the arguments from the IERS ARG2 routine increase linearly with the time of day. ARG2 is therefore
+    only called at the start of each unique day and six hours later, giving the argument and angular speed of each
+    constituent for that day.
+
+    Args:
+        mjd (numpy.ndarray):   Epochs as Modified Julian Dates in UTC.
+
+    Returns:
+        Numpy array with tidal arguments in radians, shape (len(mjd), 11).
+    """
+    mjd_int, mjd_frac = np.divmod(mjd, 1)
+    days, day_idx = np.unique(mjd_int, return_inverse=True)
+
+    start_angle = np.empty((len(days), 11))
+    speed = np.empty((len(days), 11))
+    for row, day in enumerate(days):
+        dt = MJD_ZERO + timedelta(days=day)
+        year, doy = dt.year, float(dt.timetuple().tm_yday)
+        start_angle[row] = iers.arg2(year, doy)
+        speed[row] = np.mod(iers.arg2(year, doy + 0.25) - start_angle[row], 2 * np.pi) / 0.25
+
+    day_idx = day_idx.reshape(-1)
+    return start_angle[day_idx] + speed[day_idx] * mjd_frac[:, None]
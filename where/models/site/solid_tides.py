@@ -15,13 +15,74 @@ References:
 
 
 """
+# Standard library imports
+from collections import namedtuple
+
 # External library imports
 import numpy as np
 
 # Where imports
 from where import apriori
-from where.ext import iers_2010 as iers
 from where.lib import plugins
+from where.lib.unit import unit
+
+# Equatorial radius of the Earth in meters, as used by DEHANTTIDEINEL
+RE = 6378136.6
+
+# Geocentric latitude and longitude of a station, see _site_geometry
+SiteGeometry = namedtuple("SiteGeometry", ["rsta", "sinphi", "cosphi", "sinla", "cosla"])
+
+# Diurnal band corrections, Table 7.3a in the IERS Conventions. Columns are the multipliers of the fundamental
+# arguments s, h, p, N' and ps, followed by the in-phase and out-of-phase radial and the in-phase and out-of-phase
+# transverse corrections in millimeters.
+STEP2_DIURNAL = np.array(
+    [
+        [-3, 0, 2, 0, 0, -0.01, 0, 0, 0],
+        [-3, 2, 0, 0, 0, -0.01, 0, 0, 0],
+        [-2, 0, 1, -1, 0, -0.02, 0, 0, 0],
+        [-2, 0, 1, 0, 0, -0.08, 0, -0.01, 0.01],
+        [-2, 2, -1, 0, 0, -0.02, 0, 0, 0],
+        [-1, 0, 0, -1, 0, -0.10, 0, 0, 0],
+        [-1, 0, 0, 0, 0, -0.51, 0, -0.02, 0.03],
+        [-1, 2, 0, 0, 0, 0.01, 0, 0, 0],
+        [0, -2, 1, 0, 0, 0.01, 0, 0, 0],
+        [0, 0, -1, 0, 0, 0.02, 0, 0, 0],
+        [0, 0, 1, 0, 0, 0.06, 0, 0, 0],
+        [0, 0, 1, 1, 0, 0.01, 0, 0, 0],
+        [0, 2, -1, 0, 0, 0.01, 0, 0, 0],
+        [1, -3, 0, 0, 1, -0.06, 0, 0, 0],
+        [1, -2, 0, -1, 0, 0.01, 0, 0, 0],
+        [1, -2, 0, 0, 0, -1.23, -0.07, 0.06, 0.01],
+        [1, -1, 0, 0, -1, 0.02, 0, 0, 0],
+        [1, -1, 0, 0, 1, 0.04, 0, 0, 0],
+        [1, 0, 0, -1, 0, -0.22, 0.01, 0.01, 0],
+        [1, 0, 0, 0, 0, 12.00, -0.78, -0.67, -0.03],
+        [1, 0, 0, 1, 0, 1.73, -0.12, -0.10, 0],
+        [1, 0, 0, 2, 0, -0.04, 0, 0, 0],
+        [1, 1, 0, 0, -1, -0.50, -0.01, 0.03, 0],
+        [1, 1, 0, 0, 1, 0.01, 0, 0, 0],
+        [0, 1, 0, 1, -1, -0.01, 0, 0, 0],
+        [1, 2, -2, 0, 0, -0.01, 0, 0, 0],
+        [1, 2, 0, 0, 0, -0.11, 0.01, 0.01, 0],
+        [2, -2, 1, 0, 0, -0.01, 0, 0, 0],
+        [2, 0, -1, 0, 0, -0.02, 0, 0, 0],
+        [3, 0, 0, 0, 0, 0, 0, 0, 0],
+        [3, 0, 0, 1, 0, 0, 0, 0, 0],
+    ]
+)
+
+# Long-period band corrections, Table 7.3b in the IERS Conventions. Columns are the multipliers of the fundamental
+# arguments s, h, p, N' and ps, followed by the in-phase radial and transverse and the out-of-phase radial and
+# transverse corrections in millimeters.
+STEP2_LONG_PERIOD = np.array(
+    [
+        [0, 0, 0, 1, 0, 0.47, 0.23, 0.16, 0.07],
+        [0, 2, 0, 0, 0, -0.20, -0.12, -0.11, -0.05],
+        [1, 0, -1, 0, 0, -0.11, -0.08, -0.09, -0.04],
+        [2, 0, 0, 0, 0, -0.13, -0.11, -0.15, -0.07],
+        [2, 0, 0, 1, 0, -0.05, -0.05, -0.06, -0.03],
+    ]
+)
 
 
 @plugins.register
@@ -60,24 +121,231 @@ def solid_tides_station(dset):
         Numpy array with solid tide corrections in meters.
     """
     eph = apriori.get("ephemerides", time=dset.time)
-    dxyz = np.zeros((dset.num_obs, 3))
-    obs_dt = dset.time.utc.datetime
-    hour_of_day = dset.time.utc.jd_frac * 24
-
     sun_itrs = eph.pos_itrs("sun")
     moon_itrs = eph.pos_itrs("moon")
 
+    # Time in Julian centuries since J2000 in TT
+    t_tt = (dset.time.tt.jd1 - 2451545.0 + dset.time.tt.jd2) / 36525
+
     # Calculate correction
-    for obs, _ in enumerate(dset.values()):
-        dxyz[obs] = iers.dehanttideinel(
-            dset.site_pos.itrs_pos[obs],
-            obs_dt[obs].year,
-            obs_dt[obs].month,
-            obs_dt[obs].day,
-            hour_of_day[obs],
-            sun_itrs[obs],
-            moon_itrs[obs],
-        )
+    dxyz = dehant_tide_inel(dset.site_pos.itrs_pos, t_tt, sun_itrs, moon_itrs)
 
     # Transform from terrestial to celestial
     return dset.site_pos.convert_itrs_to_gcrs(dxyz)
+
+
+def dehant_tide_inel(xsta, t_tt, xsun, xmon):
+    """Calculate the station displacement due to solid Earth tides
+
+    Vectorized port of the DEHANTTIDEINEL routine from the IERS Conventions software collection, see Section 7.1.1 in
+    the IERS Conventions [1]_. Includes the in-phase and out-of-phase corrections of step 1 and the frequency dependent
+    corrections of step 2. The permanent tide is not removed.
+
+    Args:
+        xsta (numpy.ndarray):   Station positions in ITRS in meters, shape (num_obs, 3).
+        t_tt (numpy.ndarray):   Time in Julian centuries since J2000 in TT, shape (num_obs, ).
+        xsun (numpy.ndarray):   Position of the Sun in ITRS in meters, shape (num_obs, 3).
+        xmon (numpy.ndarray):   Position of the Moon in ITRS in meters, shape (num_obs, 3).
+
+    Returns:
+        Numpy array with displacements in ITRS in meters, shape (num_obs, 3).
+    """
+    xsta, xsun, xmon = (np.atleast_2d(v) for v in (xsta, xsun, xmon))
+    site = _site_geometry(xsta)
+
+    # Nominal second degree and third degree Love numbers, with latitude dependence of h2 and l2
+    h2 = 0.6078 - 0.0006 * (1 - 3 / 2 * site.cosphi ** 2)
+    l2 = 0.0847 + 0.0002 * (1 - 3 / 2 * site.cosphi ** 2)
+    h3, l3 = 0.292, 0.015
+
+    # Step 1: In-phase degree 2 and degree 3 terms for Sun and Moon
+    dxtide = np.zeros(xsta.shape)
+    fac2 = dict()
+    for body, xbody, mass_ratio in (("sun", xsun, 332946.0482), ("moon", xmon, 0.0123000371)):
+        rbody = np.linalg.norm(xbody, axis=1)
+        scalar = np.sum(xsta * xbody, axis=1) / site.rsta / rbody
+        fac2[body] = mass_ratio * RE * (RE / rbody) ** 3
+        fac3 = fac2[body] * (RE / rbody)
+
+        p2 = 3 * (h2 / 2 - l2) * scalar ** 2 - h2 / 2
+        p3 = 5 / 2 * (h3 - 3 * l3) * scalar ** 3 + 3 / 2 * (l3 - h3) * scalar
+        x2 = 3 * l2 * scalar
+        x3 = 3 * l3 / 2 * (5 * scalar ** 2 - 1)
+        unit_body = xbody / rbody[:, None]
+        unit_sta = xsta / site.rsta[:, None]
+        dxtide += fac2[body][:, None] * (x2[:, None] * unit_body + p2[:, None] * unit_sta)
+        dxtide += fac3[:, None] * (x3[:, None] * unit_body + p3[:, None] * unit_sta)
+
+    # Step 1: Out-of-phase corrections and latitude dependence of the Love numbers
+    dxtide += _step1_out_of_phase(site, xsun, xmon, fac2["sun"], fac2["moon"])
+
+    # Step 2: Frequency dependence of the Love numbers in the diurnal and long-period bands
+    dxtide += _step2_diurnal(site, np.atleast_1d(t_tt))
+    dxtide += _step2_long_period(site, np.atleast_1d(t_tt))
+
+    return dxtide
+
+
+def _site_geometry(xsta):
+    """Geocentric distance, latitude and longitude of the stations
+
+    Args:
+        xsta (numpy.ndarray):   Station positions in ITRS in meters, shape (num_obs, 3).
+
+    Returns:
+        SiteGeometry: Distance in meters and sine and cosine of geocentric latitude and longitude for each station.
+    """
+    rsta = np.linalg.norm(xsta, axis=1)
+    rxy = np.hypot(xsta[:, 0], xsta[:, 1])
+    return SiteGeometry(
+        rsta=rsta, sinphi=xsta[:, 2] / rsta, cosphi=rxy / rsta, sinla=xsta[:, 1] / rxy, cosla=xsta[:, 0] / rxy
+    )
+
+
+def _to_itrs(site, dr, dn, de):
+    """Convert radial, north and east displacements to ITRS
+
+    Args:
+        site (SiteGeometry):    Geometry of the stations.
+        dr (numpy.ndarray):     Radial displacement for each station.
+        dn (numpy.ndarray):     North displacement for each station.
+        de (numpy.ndarray):     East displacement for each station.
+
+    Returns:
+        Numpy array with displacements in ITRS, shape (num_obs, 3).
+    """
+    return np.column_stack(
+        (
+            dr * site.cosla * site.cosphi - de * site.sinla - dn * site.sinphi * site.cosla,
+            dr * site.sinla * site.cosphi + de * site.cosla - dn * site.sinphi * site.sinla,
+            dr * site.sinphi + dn * site.cosphi,
+        )
+    )
+
+
+def _step1_out_of_phase(site, xsun, xmon, fac2sun, fac2mon):
+    """Out-of-phase corrections and corrections for the latitude dependence of the Love numbers
+
+    Corresponds to the subroutines ST1IDIU, ST1ISEM and ST1L1 in DEHANTTIDEINEL, see Section 7.1.1 in the IERS
+    Conventions [1]_.
+
+    Args:
+        site (SiteGeometry):      Geometry of the stations.
+        xsun (numpy.ndarray):     Position of the Sun in ITRS in meters, shape (num_obs, 3).
+        xmon (numpy.ndarray):     Position of the Moon in ITRS in meters, shape (num_obs, 3).
+        fac2sun (numpy.ndarray):  Degree 2 factor for the Sun.
+        fac2mon (numpy.ndarray):  Degree 2 factor for the Moon.
+
+    Returns:
+        Numpy array with displacements in ITRS in meters, shape (num_obs, 3).
+    """
+    sinphi, cosphi, sinla, cosla = site.sinphi, site.cosphi, site.sinla, site.cosla
+    cos2phi = cosphi ** 2 - sinphi ** 2
+    costwola = cosla ** 2 - sinla ** 2
+    sintwola = 2 * cosla * sinla
+
+    dxcor = np.zeros((len(sinphi), 3))
+    dr_diu = dn_diu = de_diu = dr_sem = dn_sem = de_sem = dn_l1 = de_l1 = 0
+    for xbody, fac2 in ((xsun, fac2sun), (xmon, fac2mon)):
+        x, y, z = xbody.T
+        fac = fac2 / np.sum(xbody ** 2, axis=1)
+        diurnal_sin = fac * z * (x * sinla - y * cosla)
+        diurnal_cos = fac * z * (x * cosla + y * sinla)
+        semidiurnal_sin = fac * ((x ** 2 - y ** 2) * sintwola - 2 * x * y * costwola)
+        semidiurnal_cos = fac * ((x ** 2 - y ** 2) * costwola + 2 * x * y * sintwola)
+
+        # Out-of-phase corrections in the diurnal band (ST1IDIU)
+        dr_diu = dr_diu - 3 * -0.0025 * sinphi * cosphi * diurnal_sin
+        dn_diu = dn_diu - 3 * -0.0007 * cos2phi * diurnal_sin
+        de_diu = de_diu - 3 * -0.0007 * sinphi * diurnal_cos
+
+        # Out-of-phase corrections in the semidiurnal band (ST1ISEM)
+        dr_sem = dr_sem - 3 / 4 * -0.0022 * cosphi ** 2 * semidiurnal_sin
+        dn_sem = dn_sem + 3 / 2 * -0.0007 * sinphi * cosphi * semidiurnal_sin
+        de_sem = de_sem - 3 / 2 * -0.0007 * cosphi * semidiurnal_cos
+
+        # Latitude dependence of the Love number l in the diurnal and semidiurnal bands (ST1L1)
+        dn_l1 = dn_l1 + 3 * (
+            -0.0012 * sinphi ** 2 * diurnal_cos - 0.0024 / 2 * sinphi * cosphi * semidiurnal_cos
+        )
+        de_l1 = de_l1 + 3 * (
+            0.0012 * sinphi * cos2phi * diurnal_sin - 0.0024 / 2 * sinphi ** 2 * cosphi * semidiurnal_sin
+        )
+
+    dxcor += _to_itrs(site, dr_diu, dn_diu, de_diu)
+    dxcor += _to_itrs(site, dr_sem, dn_sem, de_sem)
+    dxcor += _to_itrs(site, 0, dn_l1, de_l1)
+
+    return dxcor
+
+
+def _fundamental_arguments(t_tt):
+    """Fundamental arguments used by the step 2 corrections, in degrees
+
+    Args:
+        t_tt (numpy.ndarray):   Time in Julian centuries since J2000 in TT.
+
+    Returns:
+        Tuple with the arguments s, tau, h, p, N' and ps for each epoch.
+    """
+    t = t_tt
+    s = 218.31664563 + (481267.88194 + (-0.0014663889 + 0.00000185139 * t) * t) * t
+    tau = (67310.54841 + (876600 * 3600 + 8640184.812866 + (0.093104 + -0.0000062 * t) * t) * t) * 15 / 3600 + 180 - s
+    pr = (1.396971278 + (0.000308889 + (0.000000021 + 0.000000007 * t) * t) * t) * t
+    s = s + pr
+    h = 280.46645 + (36000.7697489 + (0.00030322222 + (0.000000020 + -0.00000000654 * t) * t) * t) * t
+    p = 83.35324312 + (4069.01363525 + (-0.01032172222 + (-0.0000124991 + 0.00000005263 * t) * t) * t) * t
+    zns = 234.95544499 + (1934.13626197 + (-0.00207561111 + (-0.00000213944 + 0.00000001650 * t) * t) * t) * t
+    ps = 282.93734098 + (1.71945766667 + (0.00045688889 + (-0.00000001778 + -0.00000000334 * t) * t) * t) * t
+
+    return tuple(np.mod(arg, 360) for arg in (s, tau, h, p, zns, ps))
+
+
+def _step2_diurnal(site, t_tt):
+    """Frequency dependent corrections in the diurnal band (STEP2DIU)
+
+    Args:
+        site (SiteGeometry):    Geometry of the stations.
+        t_tt (numpy.ndarray):   Time in Julian centuries since J2000 in TT.
+
+    Returns:
+        Numpy array with displacements in ITRS in meters, shape (num_obs, 3).
+    """
+    s, tau, h, p, zns, ps = _fundamental_arguments(t_tt)
+    zla = np.arctan2(site.sinla, site.cosla)
+    table = STEP2_DIURNAL
+
+    # Argument of each tidal constituent, shape (num_obs, num_constituents)
+    thetaf = np.radians(tau[:, None] + np.column_stack((s, h, p, zns, ps)) @ table[:, :5].T) + zla[:, None]
+    sin_theta, cos_theta = np.sin(thetaf), np.cos(thetaf)
+
+    sin2phi = 2 * site.sinphi * site.cosphi
+    cos2phi = site.cosphi ** 2 - site.sinphi ** 2
+    dr = sin2phi * (sin_theta @ table[:, 5] + cos_theta @ table[:, 6])
+    dn = cos2phi * (sin_theta @ table[:, 7] + cos_theta @ table[:, 8])
+    de = site.sinphi * (cos_theta @ table[:, 7] - sin_theta @ table[:, 8])
+
+    return _to_itrs(site, dr, dn, de) * unit.mm2m
+
+
+def _step2_long_period(site, t_tt):
+    """Frequency dependent corrections in the long-period band (STEP2LON)
+
+    Args:
+        site (SiteGeometry):    Geometry of the stations.
+        t_tt (numpy.ndarray):   Time in Julian centuries since J2000 in TT.
+
+    Returns:
+        Numpy array with displacements in ITRS in meters, shape (num_obs, 3).
+    """
+    s, _, h, p, zns, ps = _fundamental_arguments(t_tt)
+    table = STEP2_LONG_PERIOD
+
+    # Argument of each tidal constituent, shape (num_obs, num_constituents)
+    thetaf = np.radians(np.column_stack((s, h, p, zns, ps)) @ table[:, :5].T)
+    sin_theta, cos_theta = np.sin(thetaf), np.cos(thetaf)
+
+    dr = (3 * site.sinphi ** 2 - 1) / 2 * (cos_theta @ table[:, 5] + sin_theta @ table[:, 7])
+    dn = 2 * site.cosphi * site.sinphi * (cos_theta @ table[:, 6] + sin_theta @ table[:, 8])
+
+    return _to_itrs(site, dr, dn, 0) * unit.mm2m
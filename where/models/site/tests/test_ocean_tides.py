@@ -0,0 +1,65 @@
+""" Test :mod:`where.models.site.ocean_tides`.
+
+The displacements interpolated from the HARDISP time grid and the tidal arguments calculated from the daily ARG2
+speeds are compared against calling the 'HARDISP.F' and 'ARG2.F' routines from the IERS software library for each
+epoch.
+
+"""
+
+# Standard library imports
+from datetime import timedelta
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.ext import iers_2010 as iers
+from where.models.site import ocean_tides
+
+
+def _yday(mjd):
+    """Year, day of year, hour, minute and second of an epoch given as MJD with whole seconds"""
+    dt = ocean_tides.MJD_ZERO + timedelta(seconds=int(round(mjd * 86400)))
+    return [dt.year, dt.timetuple().tm_yday, dt.hour, dt.minute, dt.second]
+
+
+class TestOceanTides(unittest.TestCase):
+    def setUp(self):
+        # Epochs with whole seconds over more than one day, crossing midnight and a year boundary
+        rng = np.random.RandomState(2018)
+        seconds = np.sort(rng.choice(int(1.5 * 86400), 50, replace=False))
+        self.mjd = 58118.75 + seconds / 86400
+
+        # Amplitudes in meters and phases in degrees of the 11 constituents for up, west and south
+        self.amplitudes = rng.rand(3, 11) * 0.02
+        self.phases = rng.rand(3, 11) * 360 - 180
+
+    def test_hardisp_displacement(self):
+        denu = ocean_tides.hardisp_displacement(self.mjd, self.amplitudes, self.phases)
+        self.assertEqual(denu.shape, (len(self.mjd), 3))
+        for obs, mjd in enumerate(self.mjd):
+            dup, dsouth, dwest = iers.hardisp(_yday(mjd), self.amplitudes, self.phases, 1, 1.0)
+            expected = np.array([-dwest[0], -dsouth[0], dup[0]])
+            np.testing.assert_allclose(denu[obs], expected, rtol=0, atol=1e-7, err_msg=str(mjd))
+
+    def test_hardisp_long_time_grid(self):
+        # More than one call to HARDISP is needed for the time grid
+        mjd = self.mjd[0] + np.array([0, 2.5, 4.1])
+        denu = ocean_tides.hardisp_displacement(mjd, self.amplitudes, self.phases)
+        for obs, epoch in enumerate(mjd):
+            dup, dsouth, dwest = iers.hardisp(_yday(epoch), self.amplitudes, self.phases, 1, 1.0)
+            np.testing.assert_allclose(denu[obs], [-dwest[0], -dsouth[0], dup[0]], rtol=0, atol=1e-7)
+
+    def test_tidal_arguments(self):
+        angles = ocean_tides.tidal_arguments(self.mjd)
+        self.assertEqual(angles.shape, (len(self.mjd), 11))
+        for obs, mjd in enumerate(self.mjd):
+            year, doy, hour, minute, second = _yday(mjd)
+            expected = iers.arg2(year, doy + (hour * 3600 + minute * 60 + second) / 86400)
+            difference = np.angle(np.exp(1j * (angles[obs] - expected)))
+            np.testing.assert_allclose(difference, 0, rtol=0, atol=1e-9, err_msg=str(mjd))
+
+
+if __name__ == "__main__":
+    unittest.main()
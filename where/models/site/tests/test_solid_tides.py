@@ -0,0 +1,62 @@
+""" Test :mod:`where.models.site.solid_tides`.
+
+The vectorized solid tide model is compared against the 'DEHANTTIDEINEL.F' routine from the IERS software library.
+
+"""
+
+# Standard library imports
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.ext import iers_2010 as iers
+from where.models.site import solid_tides
+
+# TT - UTC in seconds for the test epochs, TAI - UTC is 34 seconds between 2009 and July 2012
+TT_MINUS_UTC = 34 + 32.184
+
+
+class TestDehantTideInel(unittest.TestCase):
+    def setUp(self):
+        self.xsta = np.array(
+            [
+                [4075578.385, 931852.890, 4801570.154],
+                [-2354890.967, -4646751.805, 3668871.658],
+                [1130794.766, -4831233.781, 3994217.092],
+            ]
+        )
+        self.xsun = np.array(
+            [
+                [137859926952.015, 54228127881.4350, 23509422341.6960],
+                [-64119370484.3201, -125044547946.524, -54207563062.5693],
+                [-147112458316.745, 17632283478.4716, 7642924939.93216],
+            ]
+        )
+        self.xmon = np.array(
+            [
+                [-179996231.920342, -312468450.131567, -169288918.592160],
+                [370014138.932451, 41987452.4713287, 32811214.9138342],
+                [-239151385.119245, 273408926.584172, 85711402.4716839],
+            ]
+        )
+        self.dates = [(2009, 4, 13, 0.0), (2010, 7, 2, 7.5), (2011, 12, 28, 21.25)]
+
+    def test_dehant_tide_inel(self):
+        jd_utc = np.array([2454934.5, 2455379.5, 2455923.5]) + np.array([d[3] for d in self.dates]) / 24
+        t_tt = (jd_utc - 2451545.0 + TT_MINUS_UTC / 86400) / 36525
+
+        dxtide = solid_tides.dehant_tide_inel(self.xsta, t_tt, self.xsun, self.xmon)
+        for obs, (year, month, day, fhr) in enumerate(self.dates):
+            expected = iers.dehanttideinel(self.xsta[obs], year, month, day, fhr, self.xsun[obs], self.xmon[obs])
+            np.testing.assert_allclose(dxtide[obs], expected, rtol=0, atol=1e-7)
+
+    def test_single_observation(self):
+        t_tt = (2454934.5 - 2451545.0 + TT_MINUS_UTC / 86400) / 36525
+        dxtide = solid_tides.dehant_tide_inel(self.xsta[0], t_tt, self.xsun[0], self.xmon[0])
+        self.assertEqual(dxtide.shape, (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -53,7 +53,7 @@ def _write_to_dataset(parser, dset, rundate, session):
     for field, values in data.items():
         values = np.array(values)
         if values.dtype.kind in {"U", "S"}:
-            dset.add_text(field, val=values, write_level="operational")
+            dset.add_categorical(field, val=values, write_level="operational")
         elif values.dtype.kind in {"f", "i"}:
             dset.add_float(field, val=values, write_level="operational")
         elif values.dtype.kind in {"O"}:
@@ -72,7 +72,7 @@ def _write_to_dataset(parser, dset, rundate, session):
     log.info("Found stations: {}", ", ".join(dset.unique("station")))
     trf = apriori.get("trf", time=dset.time)
     station_codes = apriori.get("vlbi_station_codes")
-    dset.add_text(
+    dset.add_categorical(
         "baseline",
         val=np.array([f"{s1}/{s2}" for s1, s2 in zip(data["station_1"], data["station_2"])]),
         write_level="operational",
@@ -120,10 +120,10 @@ def _write_to_dataset(parser, dset, rundate, session):
     # Station data
     sta_fields = set().union(*[v.keys() for k, v in data.items() if k.startswith("sta_")])
     for field in sta_fields:
-        dset.add_text(
+        dset.add_categorical(
             field + "_1", val=[data["sta_" + s][field] for s in data["station_1"]]
         )  # write_level='analysis')
-        dset.add_text(
+        dset.add_categorical(
             field + "_2", val=[data["sta_" + s][field] for s in data["station_2"]]
         )  # write_level='analysis')
 
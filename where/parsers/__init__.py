@@ -21,14 +21,28 @@ To use a parser, you will typically use the :func:`parse_key`- or :func:`parse_f
 
 The name used in `parse_file` to call the parser is the name of the module (file) containing the parser.
 
+Parsed data from the parsers listed in the `parser_cache` option in the files section of the Where configuration are
+stored in a persistent cache on disk. The cache is keyed on the checksum of the parsed file, the source code of the
+parser and the parser arguments, so that the same file is only parsed once, even across processes. Only the newest
+cache entry for each parser, file and set of parser arguments is kept.
+
 """
 
+# Standard library imports
+import hashlib
+import os
+import pathlib
+import pickle
+import sys
+
 # Midgard imports
-from midgard.parsers import names, parse_file  # noqa
+from midgard.parsers import names  # noqa
 from midgard import parsers as mg_parsers
 from midgard.dev import plugins
+from midgard.dev.timer import Timer
 
 # Where imports
+from where.lib import cache
 from where.lib import config
 from where.lib import dependencies
 from where.lib import files
@@ -124,7 +138,146 @@ def parse_key(file_key, file_vars=None, parser_name=None, use_cache=True, logger
     dependencies.add(file_path)
     parser_args.setdefault("encoding", files.encoding(file_key))
 
-    # Use the Midgard parser function to create parser and parse data
+    # Create parser and parse data
     return parse_file(
         parser_name, file_path, use_cache=use_cache, parser_logger=logger, timer_logger=log.time, **parser_args
     )
+
+
+def parse_file(
+    parser_name, file_path, encoding=None, parser_logger=log.info, timer_logger=None, use_cache=True, **parser_args
+):
+    """Use the given parser on a file and return parsed data
+
+    Works like the Midgard parse_file-function, but if the parser is listed in the `parser_cache` option in the files
+    section of the Where configuration and `use_cache` is True, the parsed data are read from the persistent parser
+    cache if possible, and stored there otherwise.
+
+    Args:
+        parser_name (String):      Name of parser.
+        file_path (String/Path):   Path to file that should be parsed.
+        encoding (String):         Encoding in file that is parsed.
+        parser_logger (Function):  Logging function that will be used by parser.
+        timer_logger (Function):   Logging function that will be used to log timing information.
+        use_cache (Boolean):       Whether to use the persistent parser cache.
+        parser_args:               Input arguments to the parser.
+
+    Returns:
+        Parser:  Parser with the parsed data
+    """
+    parser = plugins.call(
+        package_name=mg_parsers.__name__,
+        plugin_name=parser_name,
+        file_path=file_path,
+        encoding=encoding,
+        logger=parser_logger,
+        **parser_args,
+    )
+
+    cache_path = None
+    if use_cache and parser_name in config.where.files.get("parser_cache", default="").list:
+        cache_path = _cache_path(parser, encoding=encoding, **parser_args)
+        if _read_cache(parser, cache_path):
+            return parser
+
+    with Timer(f"Finish {parser_name} ({__name__}) - {file_path} in", logger=timer_logger):
+        parser.parse()
+
+    if cache_path is not None and parser.data_available:
+        _write_cache(parser, cache_path)
+    return parser
+
+
+def _cache_path(parser, **parser_args):
+    """Path to the persistent cache of the data parsed by the given parser
+
+    Args:
+        parser (Parser):   Parser that has not yet parsed the data.
+        parser_args:       Input arguments to the parser.
+
+    Returns:
+        Path:  Path to cache file, None if the file to parse does not exist.
+    """
+    if not parser.file_path.exists():
+        return None
+
+    # The file key identifies the file and parser arguments, the cache key the contents of the file and the parser
+    file_key = hashlib.md5(str(parser.file_path.resolve()).encode())
+    file_key.update(repr(sorted(parser_args.items())).encode())
+    cache_key = hashlib.md5(files.get_md5(parser.file_path).encode())
+    cache_key.update(_parser_version(type(parser)).encode())
+    file_vars = dict(parser_name=parser.parser_name, file_key=file_key.hexdigest(), cache_key=cache_key.hexdigest())
+    return files.path("parser_cache", file_vars=file_vars)
+
+
+@cache.function
+def _parser_version(parser_cls):
+    """Checksum of the source code of a parser class and its base classes
+
+    Args:
+        parser_cls (Class):   Parser class.
+
+    Returns:
+        String:  Checksum that changes whenever the parser is changed.
+    """
+    version = hashlib.md5()
+    for cls in parser_cls.__mro__:
+        module_file = getattr(sys.modules.get(cls.__module__), "__file__", None)
+        if module_file:
+            version.update(pathlib.Path(module_file).read_bytes())
+    return version.hexdigest()
+
+
+def _read_cache(parser, cache_path):
+    """Update parser with data and meta information from the persistent cache
+
+    Args:
+        parser (Parser):    Parser that has not yet parsed the data.
+        cache_path (Path):  Path to cache file.
+
+    Returns:
+        Boolean:  True if parser was updated from the cache, False otherwise.
+    """
+    if cache_path is None or not cache_path.exists():
+        return False
+
+    try:
+        with open(cache_path, mode="rb") as fid:
+            cached = pickle.load(fid)
+    except Exception as err:  # Do not fail because of a corrupt cache, simply parse the file again
+        log.warn(f"Could not read parser cache {cache_path}: {err}")
+        return False
+
+    log.debug(f"Read data parsed by {parser.parser_name} from {cache_path}")
+    parser.data = cached["data"]
+    parser.meta.update(cached["meta"])
+    dependencies.add(parser.file_path)
+    return True
+
+
+def _write_cache(parser, cache_path):
+    """Store data and meta information from a parser in the persistent cache
+
+    The file is written to a temporary path and renamed, so that other processes never see half-written cache files.
+    Older cache files for the same parser, file and parser arguments are deleted.
+
+    Args:
+        parser (Parser):    Parser with parsed data.
+        cache_path (Path):  Path to cache file.
+    """
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, mode="wb") as fid:
+            pickle.dump(dict(data=parser.data, meta=parser.meta), fid, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as err:  # Not all parsed data can be pickled, the data are then simply not cached
+        log.debug(f"Could not write parser cache {cache_path}: {err}")
+        if tmp_path.exists():
+            files.delete_file(tmp_path)
+    else:
+        log.debug(f"Stored data parsed by {parser.parser_name} in {cache_path}")
+        file_prefix = cache_path.name.rsplit("-", 1)[0]
+        for old_path in cache_path.parent.glob(f"{file_prefix}-*{cache_path.suffix}"):
+            if old_path != cache_path:
+                files.delete_file(old_path)
@@ -0,0 +1,65 @@
+"""A parser for reading the GPT2 and GPT2w grid files
+
+Description:
+------------
+
+Reads the grid files ``gpt2_5.grd`` of the GPT2 model :cite:`lagler2013` and ``gpt2_1wA.grd`` of the GPT2w model
+:cite:`boehm2015`. The first line is a header starting with '%'. Each following line contains the parameters for one
+grid point, in latitude bands going from north to south, and from west to east within each band. The grid spacing is 5
+degrees for GPT2 and 1 degree for GPT2w.
+
+Each parameter is given by a mean value and the amplitudes of the annual and semiannual terms (A1, B1, A2, B2), which
+are stored as columns in arrays with shape (num_points, 5). The units are converted as in the Fortran routines
+``gpt2.f`` and ``gpt2_1w.f``.
+
+References:
+-----------
+http://ggosatm.hg.tuwien.ac.at/DELAY/SOURCE/GPT2w
+
+"""
+# External library imports
+import numpy as np
+
+# Midgard imports
+from midgard.dev import plugins
+
+# Where imports
+from where.parsers._parser import Parser
+
+# Columns (0-based) in the grid file, and the factor converting each parameter to the units used by the GPT2 model
+GRID_COLUMNS = dict(
+    p=(slice(2, 7), 1),  # Pressure in [Pa]
+    T=(slice(7, 12), 1),  # Temperature in [K]
+    Q=(slice(12, 17), 1e-3),  # Specific humidity in [kg/kg]
+    dT=(slice(17, 22), 1e-3),  # Temperature lapse rate in [K/m]
+    undu=(22, 1),  # Geoid undulation in [m]
+    Hs=(23, 1),  # Orthometric grid height in [m]
+    ah=(slice(24, 29), 1e-3),  # Hydrostatic mapping function coefficient
+    aw=(slice(29, 34), 1e-3),  # Wet mapping function coefficient
+)
+
+# Additional columns in the GPT2w grid file
+GRID_COLUMNS_GPT2W = dict(
+    la=(slice(34, 39), 1),  # Water vapor decrease factor
+    Tm=(slice(39, 44), 1),  # Mean temperature of the water vapor in [K]
+)
+
+
+@plugins.register
+class Gpt2GridParser(Parser):
+    """A parser for reading GPT2 and GPT2w grid files
+    """
+
+    def read_data(self):
+        grid = np.loadtxt(self.file_path, comments="%")
+
+        columns = dict(GRID_COLUMNS)
+        if grid.shape[1] >= 44:
+            columns.update(GRID_COLUMNS_GPT2W)
+
+        self.data = {name: grid[:, column] * factor for name, (column, factor) in columns.items()}
+        self.data["lat"] = grid[:, 0]
+        self.data["lon"] = grid[:, 1]
+
+        # Grid points are placed in the middle of each grid cell, starting half a spacing from the north pole
+        self.data["spacing"] = 2 * (90 - grid[0, 0])
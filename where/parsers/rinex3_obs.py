@@ -17,7 +17,6 @@ Reads data from files in the RINEX file format version 3.03 (see :cite:`rinex3`)
 # Standard library imports
 from datetime import timedelta
 import dateutil.parser
-import itertools
 
 # External library imports
 import numpy as np
@@ -34,6 +33,12 @@ from where.lib.unit import unit
 
 SYSTEM_TIME_OFFSET_TO_GPS_TIME = dict(BDT=14, GAL=0, IRN=0, QZS=0)
 
+# Number of characters of an observation field (value, loss of lock indicator and signal strength)
+FIELD_LENGTH = 16
+
+# Number of observation lines converted to character columns at a time
+CHUNK_SIZE = 10000
+
 
 @plugins.register
 class Rinex3Parser(parser.ParserDict):
@@ -89,9 +94,9 @@ class Rinex3Parser(parser.ParserDict):
     # PARSERS
     #
     def setup_parsers(self):
-        """Parsers defined for reading RINEX observation file line by line.
+        """Parser defined for reading the RINEX observation file header line by line.
 
-           First the RINEX header information are read and afterwards the RINEX observation.
+           The RINEX observation records following the header are read in bulk by `parse_observations`.
         """
         # Parser for RINEX header
         header_parser = parser.define_parser(
@@ -292,49 +297,7 @@ class Rinex3Parser(parser.ParserDict):
             },
         )
 
-        # Parser for RINEX observation blocks
-
-        # ----+----1----+----2----+----3----+----4----+----5----+----6----+----7----+----8----+----9
-        # > 2006 03 24 13 10 36.0000000  0  5      -0.123456789012
-        # G06  23629347.915            .300 8         -.353 4  23629347.158          24.158
-        # G09  20891534.648           -.120 9         -.358 6  20891545.292          38.123
-        # E11          .324 8          .178 7
-        # S20  38137559.506      335849.135 9
-        obs_parser = parser.define_parser(
-            end_marker=lambda _l, _ln, next_line: next_line.startswith(">"),
-            label=lambda line, _ln: (
-                line[0:1].isalpha()  # Obs line start with sat. system identifier
-                and not line.startswith(">")  # Observation epoch line starts with '>'
-                and not line[60:61].isalpha()
-            ),  # Comment line
-            parser_def={
-                False: {
-                    "parser": self.parse_observation_epoch,
-                    "fields": {
-                        "year": (2, 6),
-                        "month": (7, 9),
-                        "day": (10, 12),
-                        "hour": (13, 15),
-                        "minute": (16, 18),
-                        "second": (18, 29),
-                        "epoch_flag": (31, 32),
-                        "num_sat": (32, 35),
-                        "rcv_clk_offset": (41, 56),
-                        "comment": (60, 80),
-                    },
-                },
-                True: {
-                    "parser": self.parse_observation,
-                    "strip": "\n",  # Remove only newline '\n' leading and trailing characters from line.
-                    "fields": {
-                        "sat": (0, 3),
-                        "obs": (3, None),  # 'None' indicates, that line is sliced until the end of line.
-                    },
-                },
-            },
-        )
-
-        return itertools.chain([header_parser], itertools.repeat(obs_parser))
+        return [header_parser]
 
     #
     # HEADER PARSERS
@@ -550,100 +513,143 @@ class Rinex3Parser(parser.ParserDict):
     #
     # OBSERVATION PARSERS
     #
-    def parse_observation_epoch(self, line, cache):
-        """Parse observation epoch information of RINEX observation record
+    def parse_file(self, fid):
+        """Read the RINEX header line by line and the RINEX observation records in bulk
+        """
+        header_parser, = self.setup_parsers()
+        cache = dict(line_num=0)
+        for line in iter(fid.readline, ""):
+            cache["line_num"] += 1
+            self.parse_line(line.rstrip(), cache, header_parser)
+            if header_parser["end_marker"](line.rstrip(), cache["line_num"], None):
+                break
+
+        self.parse_observations(fid.read())
+
+    def parse_observations(self, text):
+        """Parse observation records of RINEX file
+
+        The observation records are handled as a byte buffer, where the start and length of each line is determined.
+        Epoch and observation lines are sliced in fixed-width character columns, which are converted to numbers with
+        NumPy for one GNSS at a time. Each observation line belongs to the epoch line before it.
 
         In addition the RINEX observation are decimated based on the given sampling rate.
+
+        Args:
+            text (str):   RINEX observation records following the RINEX header.
         """
-        # Reject empty line -> TODO: Better solution?
-        if not line["year"].isnumeric():
-            return
-
-        # Reject comment line
-        if line["comment"][0:1].isalpha():
-            return
-
-        cache["obs_time"] = "{year}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:010.7f}" "".format(
-            year=int(line["year"]),
-            month=int(line["month"]),
-            day=int(line["day"]),
-            hour=int(line["hour"]),
-            minute=int(line["minute"]),
-            second=float(line["second"]),
+        buffer = np.frombuffer(text.encode("ascii", errors="replace"), dtype=np.uint8)
+        line_ends = np.flatnonzero(buffer == ord("\n"))
+        starts = np.hstack((0, line_ends + 1))
+        lengths = np.hstack((line_ends, len(buffer))) - starts
+
+        # Epoch lines start with '>', observation lines with the satellite system identifier. Comment lines are
+        # recognized by their label starting in column 61.
+        first_char = _columns(buffer, starts, lengths, 0, 1)[:, 0]
+        label_char = _columns(buffer, starts, lengths, 60, 61)[:, 0]
+        epoch_lines = np.flatnonzero(first_char == ord(">"))
+        obs_lines = np.flatnonzero(_isalpha(first_char) & ~_isalpha(label_char))
+
+        # ----+----1----+----2----+----3----+----4----+----5----+----6----+----7----+----8----+----9
+        # > 2006 03 24 13 10 36.0000000  0  5      -0.123456789012
+        # G06  23629347.915            .300 8         -.353 4  23629347.158          24.158
+        # G09  20891534.648           -.120 9         -.358 6  20891545.292          38.123
+        # E11          .324 8          .178 7
+        # S20  38137559.506      335849.135 9
+        epoch = _columns(buffer, starts[epoch_lines], lengths[epoch_lines], 0, 61)
+        year = epoch[:, 2:6]
+        is_valid = (
+            np.all((year == ord(" ")) | _isdigit(year), axis=1)  # Reject empty lines
+            & np.any(_isdigit(year), axis=1)
+            & ~_isalpha(epoch[:, 60])  # Reject comment lines
         )
-        cache["obs_sec"] = (
-            int(line["hour"]) * unit.hour2second + int(line["minute"]) * unit.minute2second + float(line["second"])
+        epoch = epoch[is_valid]
+        year = _to_int(year[is_valid])
+        month = _to_int(epoch[:, 7:9])
+        day = _to_int(epoch[:, 10:12])
+        hour = _to_int(epoch[:, 13:15])
+        minute = _to_int(epoch[:, 16:18])
+        second = _to_float(epoch[:, 18:29])
+        epoch_flag = _to_int(epoch[:, 31:32])
+        rcv_clk_offset = _to_float(epoch[:, 41:56])
+        obs_time = np.array(
+            [
+                "{:d}-{:02d}-{:02d}T{:02d}:{:02d}:{:010.7f}".format(*t)
+                for t in zip(year, month, day, hour, minute, second)
+            ]
         )
-        cache["epoch_flag"] = int(line["epoch_flag"])
-        cache["rcv_clk_offset"] = _float(line["rcv_clk_offset"])
 
-        if line["epoch_flag"].strip() != "0":
+        if np.any(epoch_flag != 0):
+            flagged = np.flatnonzero(epoch_flag != 0)[0]
             log.fatal(
                 "Epoch {} is not ok, which is indicated by epoch flag {}. How it should be handled in Where?",
-                cache["obs_time"],
-                line["epoch_flag"],
+                obs_time[flagged],
+                epoch_flag[flagged],
             )  # TODO: Handle flagged epochs
 
         # Decimate RINEX observation defined by sampling rate [seconds]
-        if cache["obs_sec"] % self.sampling_rate != 0:
-            cache["obs_sec"] = None  # Ignore epoch
-
-    def parse_observation(self, line, cache):
-        """Parse observation record of RINEX file
-
-        In addition the RINEX observation are rejected from satellites not given in configuration file.
-        """
-        # Ignore epochs based on sampling rate
         # TODO: This should be done in 'edit' step!!!
-        sec = cache["obs_sec"]
-        if sec is None:
-            return
+        obs_sec = hour * unit.hour2second + minute * unit.minute2second + second
+        is_sampled = obs_sec % self.sampling_rate == 0
+
+        # Attach observation lines to epochs, and ignore rejected epochs and epochs based on sampling rate
+        epoch_idx = np.searchsorted(epoch_lines, obs_lines, side="right") - 1
+        keep = epoch_idx >= 0
+        keep[keep] = is_valid[epoch_idx[keep]]
+        obs_lines, epoch_idx = obs_lines[keep], np.cumsum(is_valid)[epoch_idx[keep]] - 1
+        keep = is_sampled[epoch_idx]
+        obs_lines, epoch_idx = obs_lines[keep], epoch_idx[keep]
+
+        sat_chars = _columns(buffer, starts[obs_lines], lengths[obs_lines], 0, 3)
+        satellite = sat_chars.view("S3")[:, 0].astype(str)
+        system = satellite.astype("U1")
+
+        unknown_systems = set(system) - set(self.meta["obstypes"])
+        if unknown_systems:
+            log.warn(
+                "Observations of GNSS {} are ignored, because no observation types are given in RINEX header.",
+                ", ".join(sorted(unknown_systems)),
+            )
+            keep = np.isin(system, list(self.meta["obstypes"]))
+            obs_lines, epoch_idx, sat_chars = obs_lines[keep], epoch_idx[keep], sat_chars[keep]
+            satellite, system = satellite[keep], system[keep]
 
-        # Fit length of observation line against definition (16 characters * number of observation types)
-        #
-        # NOTE: This is necessary, because missing observations are written as 0.0 or BLANK in RINEX format. Therefore
-        #       the last observation can be BLANK. In this case the length of observation line does not fit the
-        #       definition (16 characters * number of observation types), which is assumed by reading the observation
-        #       line in the following.
-        sys = line["sat"][0]
-        num_obstypes = len(self.meta["obstypes"][sys])
-        field_length = 16
-        line_length = field_length * num_obstypes
-        line["obs"] = line["obs"].ljust(line_length)
-
-        # Parse observation line in fields
-        for idx, obs_type in zip(range(0, line_length, field_length), self.meta["obstypes"][sys]):
-            value = line["obs"][idx : idx + field_length]
-            self.data["obs"][obs_type].append(_float(value[0:14]))
-            self.data["cycle_slip"][obs_type].append(_int(value[14:15]))
-            self.data["signal_strength"][obs_type].append(_int(value[15:16]))
-
-        # Fill unused observation types with zero values
+        # Parse observation lines in fields of 16 characters per observation type
         #
         # NOTE: Each observation type is saved in a Dataset field. The observation type fields have the same length
         #       to be consistent with the time, system or satellite Dataset field. The problem is that some observation
         #       types are not observed for a certain satellite system, but these observation are included with zero
-        #       values in the observation type field, which is done in the following.
-        unused_obstypes = set(self.obstypes_all) - set(self.meta["obstypes"][sys])
-        for obs_type in unused_obstypes:
-            self.data["obs"][obs_type].append(0.0)
-            self.data["cycle_slip"][obs_type].append(0)
-            self.data["signal_strength"][obs_type].append(0)
-
-        self.data.setdefault("time", list()).append(cache["obs_time"])
-        self.data.setdefault("epoch_flag", list()).append(cache["epoch_flag"])
-        self.data.setdefault("rcv_clk_offset", list()).append(cache["rcv_clk_offset"])
-
-        obs = {
-            "station": self.meta["marker_name"].lower(),  # vars['station'],
-            "site_id": self.meta["marker_name"].upper(),
-            "system": sys,
-            "satellite": line["sat"],
-            "satnum": line["sat"][1:3],
-        }
-
-        for field, value in obs.items():
-            self.data.setdefault("text", dict()).setdefault(field, list()).append(value)
+        #       values in the observation type field. Missing observations are written as 0.0 or BLANK in RINEX format,
+        #       and are also given as zero values.
+        num_obs = len(obs_lines)
+        for obs_type in self.data["obs"]:
+            self.data["obs"][obs_type] = np.zeros(num_obs)
+            self.data["cycle_slip"][obs_type] = np.zeros(num_obs, dtype=int)
+            self.data["signal_strength"][obs_type] = np.zeros(num_obs, dtype=int)
+
+        for sys, obstypes in self.meta["obstypes"].items():
+            sys_idx = np.flatnonzero(system == sys)
+            for chunk in range(0, len(sys_idx), CHUNK_SIZE):
+                idx = sys_idx[chunk : chunk + CHUNK_SIZE]
+                fields = _columns(
+                    buffer, starts[obs_lines[idx]], lengths[obs_lines[idx]], 3, 3 + FIELD_LENGTH * len(obstypes)
+                ).reshape(len(idx), len(obstypes), FIELD_LENGTH)
+                values = _to_float(fields[:, :, 0:14].reshape(-1, 14)).reshape(len(idx), len(obstypes))
+                for type_idx, obs_type in enumerate(obstypes):
+                    self.data["obs"][obs_type][idx] = values[:, type_idx]
+                    self.data["cycle_slip"][obs_type][idx] = _to_digit(fields[:, type_idx, 14])
+                    self.data["signal_strength"][obs_type][idx] = _to_digit(fields[:, type_idx, 15])
+
+        self.data["time"] = obs_time[epoch_idx]
+        self.data["epoch_flag"] = epoch_flag[epoch_idx]
+        self.data["rcv_clk_offset"] = rcv_clk_offset[epoch_idx]
+        self.data["text"] = dict(
+            station=np.full(num_obs, self.meta["marker_name"].lower()),  # vars['station'],
+            site_id=np.full(num_obs, self.meta["marker_name"].upper()),
+            system=system,
+            satellite=satellite,
+            satnum=sat_chars[:, 1:3].copy().view("S2")[:, 0].astype(str),
+        )
 
     #
     # SETUP CALCULATION
@@ -679,16 +685,17 @@ class Rinex3Parser(parser.ParserDict):
         remove_obstype = []  # List with observation types, which should be removed from Dataset.
         remove_obstype_sys = {}  # Dictionary with observation types given for each GNSS, which should be removed from
         # meta['obstypes'].
+
+        # Filter observations depending on GNSS
+        system_idx = {sys: self.data["text"]["system"] == sys for sys in np.unique(self.data["text"]["system"])}
+
         for obstype, obs in self.data["obs"].items():
-            if not obs or np.all(np.array(obs) == 0.0):
+            is_empty = obs == 0.0
+            if np.all(is_empty):
                 remove_obstype.append(obstype)
-            systems = set(self.data["text"]["system"])
-            for sys in systems:
-
-                # Filter observations depending on GNSS
-                idx = np.array(self.data["text"]["system"]) == sys
 
-                if np.all(np.array(obs)[idx] == 0.0):
+            for sys, idx in system_idx.items():
+                if np.all(is_empty[idx]):
                     remove_obstype_sys.setdefault(sys, list()).append(obstype)
 
         log.debug(
@@ -853,35 +860,70 @@ class Rinex3Parser(parser.ParserDict):
         dset.add_to_meta(dset.vars["station"], "site_id", dset.meta["marker_name"].upper())
 
 
-def _float(value):
-    """Convert string to float value
+def _columns(buffer, starts, lengths, first, last):
+    """Get fixed-width character columns of lines in a byte buffer
+
+    Columns beyond the end of a line are filled with blanks.
+
+    Args:
+        buffer (numpy.ndarray):   Bytes of the file as unsigned integers.
+        starts (numpy.ndarray):   Index of the first character of each line in buffer.
+        lengths (numpy.ndarray):  Number of characters in each line.
+        first (int):              First column.
+        last (int):               Column after the last column.
+
+    Returns:
+        numpy.ndarray: Characters as unsigned integers, (num_lines x last - first)
+    """
+    columns = np.arange(first, last)
+    chars = np.full((len(starts), len(columns)), ord(" "), dtype=np.uint8)
+    in_line = columns < lengths[:, None]
+    chars[in_line] = buffer[(starts[:, None] + columns)[in_line]]
+    return chars
+
+
+def _isalpha(chars):
+    """Check which characters are letters"""
+    return ((chars >= ord("A")) & (chars <= ord("Z"))) | ((chars >= ord("a")) & (chars <= ord("z")))
+
+
+def _isdigit(chars):
+    """Check which characters are digits"""
+    return (chars >= ord("0")) & (chars <= ord("9"))
+
+
+def _to_digit(chars):
+    """Convert single characters to int values, whitespace is set to 0"""
+    return np.where(chars == ord(" "), 0, chars.astype(int) - ord("0"))
+
+
+def _to_float(chars):
+    """Convert fixed-width character columns to float values
 
-    Whitespace or empty value is set to 0.0.
+    Whitespace or empty values are set to 0.0.
 
     Args:
-        value (str):   string value
+        chars (numpy.ndarray):   Characters as unsigned integers, (num_values x field_width)
 
     Returns:
-        float: float value
+        numpy.ndarray: float values
     """
-    if value.isspace() or not value:
-        return 0.0
-    else:
-        return float(value)
+    chars = np.array(chars)
+    chars[np.all(chars == ord(" "), axis=1), -1] = ord("0")
+    return chars.view("S{}".format(chars.shape[1]))[:, 0].astype(float)
 
 
-def _int(value):
-    """Convert string to int value
+def _to_int(chars):
+    """Convert fixed-width character columns to int values
 
-    Whitespace or empty value is set to 0.
+    Whitespace or empty values are set to 0.
 
     Args:
-        value (str): string value
+        chars (numpy.ndarray):   Characters as unsigned integers, (num_values x field_width)
 
     Returns:
-        int: integer value
+        numpy.ndarray: int values
     """
-    if value.isspace() or not value:
-        return 0
-    else:
-        return int(value)
+    chars = np.array(chars)
+    chars[np.all(chars == ord(" "), axis=1), -1] = ord("0")
+    return chars.view("S{}".format(chars.shape[1]))[:, 0].astype(int)
@@ -0,0 +1,69 @@
+""" Test the persistent parser cache in :mod:`where.parsers`.
+
+A small EOP C04 file is parsed with the cache enabled in a temporary work directory.
+
+"""
+
+# Standard library imports
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+# Where imports
+from where import parsers
+from where.lib import config
+
+EOP_C04 = """\
+ EARTH ORIENTATION PARAMETER (EOP) PRODUCT CENTER CENTER (PARIS OBSERVATORY)
+ EOP (IERS) 14 C04 TIME SERIES  consistent with ITRF 2014 - sampled at 0h UTC
+ Description: see http://hpiers.obspm.fr/eoppc/eop/eopc04/C04.guide.pdf
+
+ Date      MJD      x          y        UT1-UTC       LOD         dX        dY
+ (0h UTC)           "          "          s           s           "         "
+
+2018   1   1  58119   0.058432   0.276385  0.2177474   0.0008010   0.000107   0.000035
+2018   1   2  58120   0.057023   0.275942  0.2169219   0.0008484   0.000115   0.000042
+"""
+
+
+class TestParserCache(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        config.files.update_vars(dict(path_work=self.work_dir))
+        config.where.update("files", "parser_cache", "eop_c04", source=__name__)
+        self.file_path = pathlib.Path(self.work_dir) / "eopc04_14_IAU2000.18"
+        self.file_path.write_text(EOP_C04)
+        self.cache_dir = pathlib.Path(self.work_dir) / "cache" / "parsers"
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+        config.reset_config()
+
+    def _parse(self, encoding=None):
+        return parsers.parse_file("eop_c04", self.file_path, encoding=encoding, parser_logger=None)
+
+    def test_old_entries_are_deleted(self):
+        self._parse()
+        first_paths = list(self.cache_dir.glob("*"))
+        self.assertEqual(len(first_paths), 1)
+
+        # The cached data are read, and the cache entry is kept
+        self.assertEqual(self._parse().data[58120]["x"], 0.057023)
+        self.assertEqual(list(self.cache_dir.glob("*")), first_paths)
+
+        # A new cache entry replaces the old one when the file changes
+        self.file_path.write_text(EOP_C04.replace("0.057023", "0.057123"))
+        self.assertEqual(self._parse().data[58120]["x"], 0.057123)
+        cache_paths = list(self.cache_dir.glob("*"))
+        self.assertEqual(len(cache_paths), 1)
+        self.assertNotEqual(cache_paths, first_paths)
+
+    def test_other_parser_arguments_are_kept(self):
+        self._parse()
+        self._parse(encoding="ascii")
+        self.assertEqual(len(list(self.cache_dir.glob("*"))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
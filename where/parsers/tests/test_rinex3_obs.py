@@ -0,0 +1,89 @@
+""" Test :mod:`where.parsers.rinex3_obs`.
+
+A small RINEX 3 observation file is parsed. The file contains comment and empty lines between the epochs, observation
+lines with blank trailing fields, an epoch which is removed by the sampling rate, and observations of a GNSS without
+observation types in the header.
+
+"""
+
+# Standard library imports
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+# External library imports
+import numpy as np
+
+# Where imports
+from where.parsers.rinex3_obs import Rinex3Parser
+
+# ----+----1----+----2----+----3----+----4----+----5----+----6----+----7----+----8
+RINEX3_OBS = """\
+     3.03           OBSERVATION DATA    M (MIXED)           RINEX VERSION / TYPE
+TEST                                                        MARKER NAME
+G    3 C1C L1C S1C                                          SYS / # / OBS TYPES
+E    2 C1X L1X                                              SYS / # / OBS TYPES
+    30.000                                                  INTERVAL
+  2016     3     1     0     0    0.0000000     GPS         TIME OF FIRST OBS
+                                                            END OF HEADER
+> 2016 03 01 00 00  0.0000000  0  4      -0.123456789012
+G06  23629347.915 7 120800432.12315        45.250
+G09  20891534.648
+E11  25000001.500   131375000.250 8
+R01  19000000.000   101600000.000
+THIS IS A COMMENT BETWEEN TWO EPOCHS                        COMMENT
+
+> 2016 03 01 00 00 15.0000000  0  1
+G06  23629351.000   120800450.000          45.000
+> 2016 03 01 00 00 30.0000000  0  2       0.000000000100
+G06  23629355.250  1120800470.500 6        44.750
+E11  25000009.000   131375041.000
+"""
+
+
+class TestRinex3Parser(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        file_path = pathlib.Path(self.work_dir) / "test00nor_r_20160610000_01d_30s_mo.rnx"
+        file_path.write_text(RINEX3_OBS)
+        self.parser = Rinex3Parser(file_path=file_path, sampling_rate=30).parse()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_text(self):
+        text = self.parser.data["text"]
+        np.testing.assert_equal(text["satellite"], ["G06", "G09", "E11", "G06", "E11"])
+        np.testing.assert_equal(text["system"], ["G", "G", "E", "G", "E"])
+        np.testing.assert_equal(text["satnum"], ["06", "09", "11", "06", "11"])
+        np.testing.assert_equal(text["station"], ["test"] * 5)
+        np.testing.assert_equal(text["site_id"], ["TEST"] * 5)
+
+    def test_time(self):
+        expected = ["2016-03-01T00:00:00.0000000"] * 3 + ["2016-03-01T00:00:30.0000000"] * 2
+        np.testing.assert_equal(self.parser.data["time"], expected)
+        np.testing.assert_equal(self.parser.data["epoch_flag"], [0] * 5)
+        np.testing.assert_allclose(self.parser.data["rcv_clk_offset"], [-0.123456789012] * 3 + [1e-10] * 2)
+
+    def test_obs(self):
+        obs = self.parser.data["obs"]
+        self.assertEqual(set(obs), {"C1C", "L1C", "S1C", "C1X", "L1X"})
+        np.testing.assert_equal(obs["C1C"], [23629347.915, 20891534.648, 0, 23629355.250, 0])
+        np.testing.assert_equal(obs["L1C"], [120800432.123, 0, 0, 1120800470.5, 0])
+        np.testing.assert_equal(obs["S1C"], [45.250, 0, 0, 44.750, 0])
+        np.testing.assert_equal(obs["C1X"], [0, 0, 25000001.5, 0, 25000009.0])
+        np.testing.assert_equal(obs["L1X"], [0, 0, 131375000.25, 0, 131375041.0])
+        self.assertEqual(self.parser.meta["obstypes"], {"G": ["C1C", "L1C", "S1C"], "E": ["C1X", "L1X"]})
+
+    def test_cycle_slip_and_signal_strength(self):
+        cycle_slip, signal_strength = self.parser.data["cycle_slip"], self.parser.data["signal_strength"]
+        np.testing.assert_equal(cycle_slip["C1C"], [0, 0, 0, 0, 0])
+        np.testing.assert_equal(signal_strength["C1C"], [7, 0, 0, 0, 0])
+        np.testing.assert_equal(cycle_slip["L1C"], [1, 0, 0, 0, 0])
+        np.testing.assert_equal(signal_strength["L1C"], [5, 0, 0, 6, 0])
+        np.testing.assert_equal(signal_strength["L1X"], [0, 0, 8, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -206,13 +206,16 @@ def run(rundate, pipeline, session=""):
     config.init(rundate=rundate, tech_name=pipeline, session=session)
     log.file_init(log_path=files.path("log"))
 
+    # Do not keep cached data from previous sessions, except shared data like ephemerides, TRF and EOP data
+    cache.clear()
+    cache.set_max_memory(config.where.cache.max_memory.float * 2 ** 20)
+
     # Read which stages to skip from technique configuration file.
     skip_stages = config.tech.get("skip_stages", default="").list
 
-    # Register filekey suffix
+    # Register filekey suffix, also when empty to reset profiles from previous sessions
     filekey_suffix = config.tech.filekey_suffix.list
-    if filekey_suffix:
-        files.use_filelist_profiles(*filekey_suffix)
+    files.use_filelist_profiles(*filekey_suffix)
 
     # Find which stages we will run analysis for
     stage_list = [s for s in stages(pipeline) if s not in skip_stages]
@@ -267,6 +270,8 @@ def run(rundate, pipeline, session=""):
     # Publish files for session
     files.publish_files()
     session_timer.end()
+    if config.where.cache.report.bool:
+        cache.report()
 
     # Store configuration to library
     setup.store_config_to_library(rundate, pipeline, session)
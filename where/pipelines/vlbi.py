@@ -244,6 +244,7 @@ def calculate(rundate, session, prev_stage, stage):
     max_iterations = config.tech.calculate_max_iterations.int
     outlier_limit = config.tech.calculate_outlier_limit.float
     store_outliers = config.tech.store_outliers.bool
+    write_iterations = config.tech.get("write_iterations", default=True).bool
 
     for iter_num in itertools.count(start=1):
         models.calculate_delay("correction_models", dset, dset)
@@ -253,7 +254,8 @@ def calculate(rundate, session, prev_stage, stage):
         log.info("{}: {} observations, residual = {:.4f}", session, dset.num_obs, rms)
 
         # Store results
-        dset.write_as(stage=stage, dataset_id=iter_num - 1)
+        if write_iterations:
+            dset.write_as(stage=stage, dataset_id=iter_num - 1)
 
         # Detect and remove extreme outliers
         idx = np.abs(dset.residual) < outlier_limit * rms
@@ -275,6 +277,10 @@ def calculate(rundate, session, prev_stage, stage):
         )
         log.blank()
 
+    # Store results of the last iteration
+    if not write_iterations:
+        dset.write_as(stage=stage, dataset_id=iter_num - 1)
+
     # Try to detect clock breaks
     if config.tech.detect_clockbreaks.bool:
         writers.write_one("vlbi_detect_clockbreaks", dset)
@@ -297,6 +303,7 @@ def estimate(rundate, session, prev_stage, stage):
 
     max_iterations = config.tech.estimate_max_iterations.int
     outlier_limit = config.tech.estimate_outlier_limit.float
+    write_iterations = config.tech.get("write_iterations", default=True).bool
 
     for iter_num in itertools.count(start=1):
         log.info("Estimating parameters for {} (iteration {})", session, iter_num)
@@ -308,18 +315,24 @@ def estimate(rundate, session, prev_stage, stage):
         )
         rms = dset.rms("residual")
         log.info("{}: {} observations, postfit residual = {:.4f}", session, dset.num_obs, rms)
-        dset.write_as(stage=stage, dataset_id=iter_num - 1)
+        if write_iterations:
+            dset.write_as(stage=stage, dataset_id=iter_num - 1)
 
         # Detect and remove outliers
         idx = np.abs(dset.residual) < outlier_limit * rms
         if iter_num >= max_iterations or idx.all():
             break
         dset.subset(idx)
+        partial_vectors.subset(idx)
         log.info(
             "Removing {} observations with residuals bigger than {:.4f}", sum(np.logical_not(idx)), outlier_limit * rms
         )
         log.blank()
 
+    # Store results of the last iteration
+    if not write_iterations:
+        dset.write_as(stage=stage, dataset_id=iter_num - 1)
+
 
 @plugins.register
 def write_result(rundate, session, prev_stage, stage):
@@ -19,6 +19,8 @@ Option               Description
 {pipelines_doc:Run}
 
 --doy                Specify from- and to-dates as Day-Of-Year
+--jobs=N             Run up to N analyses in parallel.
+--in-process         Run analyses inside the runner instead of as new programs.
 --stop-on-error      Stop runner if one analysis crashes.
 --continue-on-error  Continue runner even if one analysis crashes.
 --version            Show version information and exit.
@@ -36,6 +38,15 @@ Description:
 
 This program is used to run several Where analyses.
 
+By default, the analyses are run one at a time. Use `--jobs=N` (or the `jobs` option in the runner section of the Where
+configuration) to run up to N analyses in parallel. The output of each parallel analysis is captured, and the logs of
+the analyses are collected in the same order as when running sequentially.
+
+Each analysis is by default run as a separate Where program. With `--in-process` (or the `in_process` option in the
+runner section of the Where configuration) the analyses are instead run inside the runner process, or inside long lived
+worker processes when combined with `--jobs`. This avoids importing Where and reading apriori data like ephemerides
+again for every analysis. Configuration, dependencies and reports are reset when each session starts.
+
 
 Examples:
 ---------
@@ -44,6 +55,10 @@ Run a VLBI analysis for all of 2015::
 
     {exe:runner} 2015 1 1 2015 12 31 -v
 
+Run the same analysis using 8 parallel processes::
+
+    {exe:runner} 2015 1 1 2015 12 31 --jobs=8
+
 
 Current Maintainers:
 --------------------
@@ -55,9 +70,13 @@ Version: {version}
 """
 # Standard library imports
 import atexit
+from concurrent import futures
+import contextlib
 from datetime import datetime, timedelta
+import io
 import subprocess
 import sys
+import traceback
 
 
 # Where imports
@@ -68,12 +87,16 @@ from where.lib import config
 from where.lib import files
 from where.lib import log
 from where import pipelines
+from where import setup
 from where.lib.timer import timer
 from where.lib import util
 
 
 _STATISTICS = {"Number of analyses": 0, "Successful analyses": 0, "Failed analyses": 0}
 
+# Log file of the runner, restored after running analyses in-process
+_RUNNER_LOG = dict()
+
 
 @timer(f"Finish {util.get_program_name()} in")
 def main():
@@ -93,12 +116,17 @@ def main():
 
     # Handle list of sessions
     session_list = set(util.read_option_value("--session", default="").replace(",", " ").split())
-    sys.argv = [o for o in sys.argv if not o.startswith("--session=")]
+    jobs_opt = util.read_option_value("--jobs", default=None)
+    in_process_opt = True if util.check_options("--in-process") else None
+    sys.argv = [o for o in sys.argv if not o.startswith(("--session=", "--jobs=", "--in-process"))]
 
     # Start logging
     log.init()
     file_vars = dict(timestamp=datetime.now().strftime(config.FMT_dt_file), **util.get_user_info())
-    log.file_init(files.path("log_runner", file_vars=file_vars), config.where.runner.filelog_level.str)
+    _RUNNER_LOG.update(
+        log_path=files.path("log_runner", file_vars=file_vars), log_level=config.where.runner.filelog_level.str
+    )
+    log.file_init(**_RUNNER_LOG)
     atexit.register(log_statistics)
 
     # Should where_runner crash if Where crashes?
@@ -110,10 +138,15 @@ def main():
     stop_on_error = config.where.get("stop_on_error", section="runner", value=stop_on_error_opts).bool
     error_logger = log.fatal if stop_on_error else log.error
 
+    # How many analyses should be run in parallel, and should they run inside the runner?
+    jobs = max(config.where.get("jobs", section="runner", value=jobs_opt, default=1).int, 1)
+    in_process = config.where.get("in_process", section="runner", value=in_process_opt, default=False).bool
+
     # The remaining options are passed onwhere to Where
     where_args = sys.argv[1:]
 
-    # Loop over dates
+    # List all analyses, loop over dates and sessions
+    analyses = list()
     rundate = from_date
     while rundate <= to_date:
         available_sessions = set(pipelines.list_sessions(rundate, tech))
@@ -121,29 +154,141 @@ def main():
 
         for session in sorted(sessions):
             cmd = f"{where.__executable__} {rundate:%Y %m %d} --session={session}".split() + where_args
-            log.blank()
-            log.blank(log_to_file=True)
-            log.info(f"Running '{' '.join(cmd)}'")
-            count("Number of analyses")
-            try:
-                subprocess.run(cmd, check=True, stderr=subprocess.PIPE)
-            except subprocess.CalledProcessError as err:
-                count("Failed analyses")
-
-                # Attempt to recover errors and traceback from stderr
-                stderr = err.stderr.decode()
-                stderr, *tb_exc = stderr.partition("\nTraceback")  # Regular Python traceback
-                stderr, *tb_fatal = stderr.partition("\nFATAL:")  # Where log.fatal traceback
-                stderr, *tb_error = stderr.partition("\nERROR:")  # Where log.error traceback
-                traceback = indent("".join(tb_exc + tb_fatal + tb_error).strip(), 4)
-                print(stderr, file=sys.stderr)
-                error_logger(f"Command '{' '.join(cmd)}' failed with\n{traceback}")
-            else:
-                count("Successful analyses")
-            copy_log_from_where(rundate, tech, session)
+            analyses.append((rundate, session, cmd))
 
         rundate += timedelta(days=1)
 
+    # Run the analyses
+    run_analysis = run_where_in_process if in_process else run_where
+    if jobs == 1:
+        for rundate, session, cmd in analyses:
+            log_start(cmd)
+            process = run_analysis(rundate, tech, session, cmd)
+            log_result(rundate, tech, session, cmd, process, error_logger)
+    else:
+        log.info(f"Running {len(analyses)} analyses using {jobs} parallel jobs")
+        if in_process:
+            log.file_flush()  # Worker processes should not inherit unwritten log messages
+            executor = futures.ProcessPoolExecutor(max_workers=jobs, initializer=init_worker)
+        else:
+            executor = futures.ThreadPoolExecutor(max_workers=jobs)
+        analyses_futures = [
+            executor.submit(run_analysis, rundate, tech, session, cmd, capture_output=True)
+            for rundate, session, cmd in analyses
+        ]
+        try:
+            # Report in the same order as the analyses were started, waiting for each one to finish
+            for (rundate, session, cmd), future in zip(analyses, analyses_futures):
+                log_start(cmd)
+                log_result(rundate, tech, session, cmd, future.result(), error_logger)
+        finally:
+            for future in analyses_futures:
+                future.cancel()  # Do not start more analyses if the runner stops
+            executor.shutdown(wait=False)
+
+
+def run_where(rundate, tech, session, cmd, capture_output=False):
+    """Run one Where analysis in a subprocess
+
+    Args:
+        rundate (Date):             Rundate of the analysis.
+        tech (String):              Pipeline of the analysis.
+        session (String):           Session of the analysis.
+        cmd (List):                 The Where command with arguments.
+        capture_output (Boolean):   Whether to capture the console output instead of printing it.
+
+    Returns:
+        CompletedProcess: Information about the finished process, including the captured stderr.
+    """
+    stdout = subprocess.DEVNULL if capture_output else None  # The log of the analysis is collected by the runner
+    return subprocess.run(cmd, stdout=stdout, stderr=subprocess.PIPE)
+
+
+def run_where_in_process(rundate, tech, session, cmd, capture_output=False):
+    """Run one Where analysis in the running process
+
+    Imported modules and shared caches, like opened ephemerides, are reused between analyses. The rest of the state
+    from the previous session is reset by pipelines.run. Command line options are read from `cmd`, just like when Where
+    is run as a separate program.
+
+    Args:
+        rundate (Date):             Rundate of the analysis.
+        tech (String):              Pipeline of the analysis.
+        session (String):           Session of the analysis.
+        cmd (List):                 The Where command with arguments.
+        capture_output (Boolean):   Whether to capture the console output instead of printing it.
+
+    Returns:
+        CompletedProcess: Information about the finished analysis, including any errors written to stderr.
+    """
+    runner_argv = sys.argv
+    sys.argv = cmd
+    stderr = io.StringIO()
+    returncode = 0
+    try:
+        with contextlib.ExitStack() as stack:
+            if capture_output:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                stack.enter_context(contextlib.redirect_stderr(stderr))
+            try:
+                setup.setup_config(rundate, tech, session)
+                setup.add_timestamp(rundate, tech, session, "last run")
+                pipelines.run(rundate, tech, session)
+            except (Exception, SystemExit):
+                returncode = 1
+                stderr.write(f"\n{traceback.format_exc()}")
+    finally:
+        sys.argv = runner_argv
+        config.analysis.clear()  # Do not mark log messages from the runner with the finished session
+        if capture_output:
+            log.file_end()
+        else:
+            log.file_init(**_RUNNER_LOG, append=True)
+
+    return subprocess.CompletedProcess(cmd, returncode, stderr=stderr.getvalue().encode())
+
+
+def init_worker():
+    """Set up a worker process running analyses in-process
+
+    The log file of the runner is only written by the main process.
+    """
+    log.file_end()
+
+
+def log_start(cmd):
+    log.blank()
+    log.blank(log_to_file=True)
+    log.info(f"Running '{' '.join(cmd)}'")
+    count("Number of analyses")
+
+
+def log_result(rundate, tech, session, cmd, process, error_logger):
+    """Update statistics and collect the log of one finished Where analysis
+
+    Args:
+        rundate (Date):              Rundate of the analysis.
+        tech (String):               Pipeline of the analysis.
+        session (String):            Session of the analysis.
+        cmd (List):                  The Where command with arguments.
+        process (CompletedProcess):  The finished process.
+        error_logger (Function):     Function used to log failed analyses.
+    """
+    if process.returncode:
+        count("Failed analyses")
+
+        # Attempt to recover errors and traceback from stderr
+        stderr = process.stderr.decode()
+        stderr, *tb_exc = stderr.partition("\nTraceback")  # Regular Python traceback
+        stderr, *tb_fatal = stderr.partition("\nFATAL:")  # Where log.fatal traceback
+        stderr, *tb_error = stderr.partition("\nERROR:")  # Where log.error traceback
+        tb = indent("".join(tb_exc + tb_fatal + tb_error).strip(), 4)
+        print(stderr, file=sys.stderr)
+        error_logger(f"Command '{' '.join(cmd)}' failed with\n{tb}")
+    else:
+        count("Successful analyses")
+    copy_log_from_where(rundate, tech, session)
+
 
 def copy_log_from_where(rundate, tech, session):
     levels_to_log = config.where.runner.levels_to_log.list
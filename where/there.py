@@ -82,6 +82,7 @@ from midgard.dev import console
 import where
 from where.lib import config
 from where import data
+from where.data import timeseries
 from where.lib import exceptions
 from where.lib import files
 from where.lib import log
@@ -751,7 +752,17 @@ class Plot(FigureCanvasTkAgg, UpdateMixin):
             return
 
         # Read dataset from disk
-        self.dataset = data.Dataset(use_options=False, **self.vars)
+        if self.vars.get("stage") == timeseries.STAGE:
+            self.dataset = timeseries.read(
+                self.vars["tech"],
+                self.vars["dataset_name"],
+                self.vars["dataset_id"],
+                user=self.vars["user"],
+                id=self.vars.get("id", ""),
+                use_options=False,
+            )
+        else:
+            self.dataset = data.Dataset(use_options=False, **self.vars)
 
         # Add event interval field
         events = self.dataset.get_events()
@@ -1570,7 +1581,7 @@ class DD_Session(DropdownPicker):
         A session in this case is given by a date and a session name.
         """
         file_vars = dict(user=self.vars["user"], tech=self.vars["tech"])
-        paths = files.glob_paths("dataset_hdf5", file_vars=file_vars)
+        paths = files.glob_paths("dataset_json", file_vars=file_vars)
         dirs = [p.parent.name for p in paths]
         sessions = set()
         for dirname in dirs:
@@ -1625,7 +1636,7 @@ class DD_Id(DropdownPicker):
 
         """
         file_vars = {k: v for k, v in self.vars.items() if k not in ("id", "stage", "dataset_name", "dataset_id")}
-        ids = files.glob_variable("dataset_hdf5", "id", r"|_[_\w]+", file_vars=file_vars)
+        ids = files.glob_variable("dataset_json", "id", r"|_[_\w]+", file_vars=file_vars)
         return sorted(i.lstrip("_") for i in ids)
 
     def parse_vars(self):
@@ -1645,7 +1656,11 @@ class DD_Stage(DropdownPicker):
         """Read pipeline and stage from filenames
         """
         file_vars = {k: v for k, v in self.vars.items() if k not in ("stage",)}
-        stages = files.glob_variable("dataset_hdf5", "stage", r"[a-z_]+", file_vars=file_vars)
+        stages = files.glob_variable("dataset_json", "stage", r"[a-z_]+", file_vars=file_vars)
+        if self.vars["rundate"] == timeseries.RUNDATE:
+            ts_vars = dict(user=self.vars["user"], id=self.vars.get("id", ""), use_options=False)
+            if timeseries.years(self.vars["tech"], **ts_vars):
+                stages.add(timeseries.STAGE)  # Timeseries stored partitioned by year
         return sorted(stages, key=self._sorter)
 
     def _sorter(self, stage):
@@ -1679,7 +1694,11 @@ class DD_Dataset(DropdownPicker):
 
         """Read dataset name and id
         """
-        return sorted(data.list_datasets(use_options=False, **self.vars), reverse=True)
+        datasets = set(data.list_datasets(use_options=False, **self.vars))
+        if self.vars["stage"] == timeseries.STAGE:
+            ts_vars = dict(user=self.vars["user"], id=self.vars.get("id", ""), use_options=False)
+            datasets |= set(timeseries.list_datasets(self.vars["tech"], **ts_vars))
+        return sorted(datasets, reverse=True)
 
     def parse_vars(self):
         dataset_name, _, dataset_id = self.choice.get().partition("/")
@@ -49,7 +49,7 @@ def interactive(rundate, tech, session=""):
         files.use_filelist_profiles(*filekey_suffix)
 
     # Read data for all available sessions and stages, add them to the global namespace
-    stages = files.glob_variable("dataset_hdf5", "stage", ".+")
+    stages = files.glob_variable("dataset_json", "stage", ".+")
     for stage in sorted(stages):
         names, dset_ids = data.list_dataset_names_and_ids(rundate, stage=stage, **vars_dict[tech])
         for name, dset_id in zip(names, dset_ids):
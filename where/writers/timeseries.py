@@ -4,12 +4,14 @@ Description:
 ------------
 
 We store some indicators from a daily analysis to a common dataset with a dummy-date of January 1st 1970. This is
-called the timeseries dataset and can be used to look at results across different datasets.
+called the timeseries dataset and can be used to look at results across different datasets. The timeseries is stored
+partitioned by year and session, see :mod:`where.data.timeseries`, so that only the data of the current session are
+written.
 
 """
 
 # Standard library imports
-from datetime import date, datetime
+from datetime import datetime
 import itertools
 import re
 import sys
@@ -20,6 +22,7 @@ import numpy as np
 # Where imports
 from where.lib import config
 from where import data
+from where.data import timeseries
 from where.lib import log
 from where.lib import plugins
 
@@ -36,7 +39,6 @@ def add_to_full_timeseries(dset):
     """
     dset_id = int(config.tech.timeseries.dataset_id.str.format(**dset.vars))
     dset_name = config.tech.timeseries.dataset_name.str.format(**dset.vars)
-    dset_ts = data.Dataset(date(1970, 1, 1), dset.vars["tech"], "timeseries", dset_name, dset_id, session="")
     dset_session = data.Dataset.anonymous()
 
     # Add data to dset_session
@@ -102,18 +104,9 @@ def add_to_full_timeseries(dset):
     if "normal equation" in dset.meta:
         _add_solved_neq_fields(dset, dset_session, idx_values)
 
-    # Filter timeseries dataset to remove any previous data for this rundate and session
-    keep_idx = np.logical_not(dset_ts.filter(rundate=rundate_str, session=session))
-    dset_ts.subset(keep_idx)
-
-    # Extend timeseries dataset with dset_session and write to disk
-    if dset_ts.num_obs:
-        dset_ts.extend(dset_session)
-    else:
-        dset_ts.copy_from(dset_session)
-
-    log.info("Updating timeseries dataset '{}'", dset_ts.description)
-    dset_ts.write()
+    # Replace any previous data for this rundate and session in the timeseries
+    log.info("Updating timeseries dataset '{}/{:04d}' for {} {}", dset_name, dset_id, rundate_str, session)
+    timeseries.upsert(dset_session, dset.rundate, session, dset.vars["tech"], dset_name, dset_id)
 
 
 def _add_solved_neq_fields(dset, dset_session, idx_values):